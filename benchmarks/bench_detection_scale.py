@@ -0,0 +1,133 @@
+"""
+Benchmark of face detection speed against recall at reduced detection widths.
+
+Detections at full resolution are the reference: recall is the fraction of
+reference boxes matched (IoU >= --iou) by the boxes found on the downscaled
+copy and mapped back to full resolution.
+
+Usage:
+    python benchmarks/bench_detection_scale.py [videos...] \
+        --widths 0 1280 960 640 480 --frames 200
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import cv2
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.infra.config import HAARCASCADE_PATH, VIDEOS_DIR
+from src.services.face_detection import detect_faces
+from src.services.face_tracking import box_iou
+
+VIDEO_EXTENSIONS: set[str] = {".mp4", ".avi", ".mov", ".mkv", ".webm"}
+
+
+def load_frames(video_path: Path, max_frames: int, step: int) -> list:
+    """Read up to max_frames grayscale frames, one every step frames."""
+    cap = cv2.VideoCapture(str(video_path))
+    frames: list = []
+    frame_count: int = 0
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frame_count += 1
+        if frame_count % step == 0:
+            frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+    cap.release()
+    return frames
+
+
+def run_detection(detector, frames: list, detection_width: int | None, args):
+    """Detect faces on every frame, returning the boxes and the elapsed time."""
+    start: float = time.perf_counter()
+    boxes = [
+        detect_faces(
+            detector,
+            frame,
+            detection_width,
+            scale_factor=args.scale_factor,
+            min_neighbors=args.min_neighbors,
+            min_size=(args.min_size, args.min_size),
+        )
+        for frame in frames
+    ]
+    return boxes, time.perf_counter() - start
+
+
+def count_matches(reference: list, candidates: list, iou_threshold: float) -> int:
+    """Count reference boxes matched by a candidate box."""
+    matched: int = 0
+    remaining = list(candidates)
+    for box in reference:
+        best = max(remaining, key=lambda other: box_iou(box, other), default=None)
+        if best is not None and box_iou(box, best) >= iou_threshold:
+            remaining.remove(best)
+            matched += 1
+    return matched
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("videos", nargs="*", type=Path)
+    parser.add_argument("--widths", nargs="+", type=int, default=[1280, 960, 640, 480])
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--step", type=int, default=1)
+    parser.add_argument("--iou", type=float, default=0.5)
+    parser.add_argument("--scale-factor", type=float, default=1.1)
+    parser.add_argument("--min-neighbors", type=int, default=5)
+    parser.add_argument("--min-size", type=int, default=60)
+    args = parser.parse_args()
+
+    videos: list[Path] = args.videos or sorted(
+        path for path in VIDEOS_DIR.iterdir() if path.suffix.lower() in VIDEO_EXTENSIONS
+    )
+    if not videos:
+        print(f"No videos found in {VIDEOS_DIR}")
+        return
+
+    detector = cv2.CascadeClassifier(str(HAARCASCADE_PATH))
+
+    for video_path in videos:
+        frames = load_frames(video_path, args.frames, args.step)
+        if not frames:
+            print(f"{video_path.name}: no frames")
+            continue
+
+        frame_height, frame_width = frames[0].shape
+        reference, elapsed = run_detection(detector, frames, None, args)
+        total_reference: int = sum(len(boxes) for boxes in reference)
+
+        print(
+            f"\n{video_path.name} ({frame_width}x{frame_height}, {len(frames)} frames,"
+            f" {total_reference} reference faces)"
+        )
+        print(f"{'width':>8} {'fps':>8} {'speedup':>8} {'faces':>7} {'recall':>7}")
+        print(f"{'full':>8} {len(frames) / elapsed:8.1f} {1:8.2f} {total_reference:7d}")
+
+        for detection_width in args.widths:
+            if detection_width <= 0 or detection_width >= frame_width:
+                continue
+            boxes, scaled_elapsed = run_detection(
+                detector, frames, detection_width, args
+            )
+            matched: int = sum(
+                count_matches(expected, found, args.iou)
+                for expected, found in zip(reference, boxes)
+            )
+            recall: float = matched / total_reference if total_reference else 1.0
+            print(
+                f"{detection_width:8d} {len(frames) / scaled_elapsed:8.1f}"
+                f" {elapsed / scaled_elapsed:8.2f}"
+                f" {sum(len(found) for found in boxes):7d} {recall:7.1%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
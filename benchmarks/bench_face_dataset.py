@@ -0,0 +1,104 @@
+"""
+Benchmark of loading training faces from JPEG pictures and from the dataset.
+
+Writes the same synthetic 220x220 faces as loose person.{id}.{sample}.jpg
+pictures and into a packed FaceDataset in a temporary directory, then times
+how long each layout takes to load into the list of gray faces and labels
+that LBPHFaceRecognizer.train receives.
+
+Usage:
+    python benchmarks/bench_face_dataset.py --faces 1000 10000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.face_dataset import FaceDataset
+
+
+def make_face(seed: int) -> np.ndarray:
+    """Create a smooth random 220x220 grayscale face."""
+    rng = np.random.default_rng(seed)
+    image = cv2.resize(rng.integers(0, 255, (55, 55), dtype=np.uint8), (220, 220))
+    return cv2.GaussianBlur(image, (3, 3), 0)
+
+
+def load_pictures(directory: Path) -> tuple[np.ndarray, list[np.ndarray]]:
+    """Load faces like trainLBPH did before the packed dataset."""
+    faces: list[np.ndarray] = []
+    ids: list[int] = []
+    for imagePath in directory.glob("person.*.*.jpg"):
+        person_id = int(imagePath.stem.split(".")[1])
+        face_image = cv2.imread(str(imagePath))
+        faces.append(cv2.cvtColor(face_image, cv2.COLOR_BGR2GRAY))
+        ids.append(person_id)
+    return np.array(ids), faces
+
+
+def load_dataset(dataset: FaceDataset) -> tuple[np.ndarray, list[np.ndarray]]:
+    """Load faces like trainLBPH does from the packed dataset."""
+    faces, records = dataset.load()
+    return records["person_id"].astype(np.int32), list(faces)
+
+
+def run(count: int, samples_per_person: int) -> None:
+    """Benchmark both layouts for one number of faces."""
+    with tempfile.TemporaryDirectory() as directory:
+        root = Path(directory)
+        dataset = FaceDataset(root / "faces.u8", root / "faces.labels")
+        faces = [make_face(i) for i in range(count)]
+        for i, face in enumerate(faces):
+            person_id, sample = divmod(i, samples_per_person)
+            cv2.imwrite(str(root / f"person.{person_id}.{sample + 1}.jpg"), face)
+        dataset.extend(
+            [i // samples_per_person for i in range(count)],
+            [i % samples_per_person + 1 for i in range(count)],
+            faces,
+        )
+
+        start: float = time.perf_counter()
+        ids, loaded = load_pictures(root)
+        pictures_seconds: float = time.perf_counter() - start
+
+        start = time.perf_counter()
+        ids, loaded = load_dataset(dataset)
+        # Touch every face, as training does
+        checksum: int = sum(int(face[110, 110]) for face in loaded)
+        dataset_seconds: float = time.perf_counter() - start
+
+        start = time.perf_counter()
+        FaceDataset(root / "import.u8", root / "import.labels").import_pictures(root)
+        import_seconds: float = time.perf_counter() - start
+
+    assert len(ids) == count and checksum >= 0
+    print(
+        f"{count:>8d} {pictures_seconds:>10.3f} {dataset_seconds:>10.3f}"
+        f" {pictures_seconds / dataset_seconds:>8.1f} {import_seconds:>9.3f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--faces", nargs="+", type=int, default=[1000, 10000])
+    parser.add_argument("--samples-per-person", type=int, default=20)
+    args = parser.parse_args()
+
+    print(
+        f"{'faces':>8} {'jpeg_s':>10} {'dataset_s':>10} {'speedup':>8} {'import_s':>9}"
+    )
+    for count in args.faces:
+        run(count, args.samples_per_person)
+
+
+if __name__ == "__main__":
+    main()
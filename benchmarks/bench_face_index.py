@@ -0,0 +1,113 @@
+"""
+Benchmark of the approximate face index against the exhaustive LBPH search.
+
+Synthesizes persons whose samples are noisy variations of one face, builds
+the index for each enrolment size and reports query latency of both searches,
+recall (queries whose label matches the exhaustive search) and candidates
+compared per query, for every nprobe value.
+
+Usage:
+    python benchmarks/bench_face_index.py --samples 5000 20000 \
+        --samples-per-person 20 --nprobe 4 16 64 --rerank 64
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.face_index import FaceIndex
+from src.services.lbph_matcher import LBPHMatcher
+
+
+def make_face(seed: int) -> np.ndarray:
+    """Create a smooth random 220x220 grayscale face."""
+    rng = np.random.default_rng(seed)
+    image = cv2.resize(rng.integers(0, 255, (55, 55), dtype=np.uint8), (220, 220))
+    return cv2.GaussianBlur(image, (3, 3), 0)
+
+
+def make_sample(base: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Create a noisy, slightly shifted variation of a face."""
+    shift = np.float32([[1, 0, rng.integers(-2, 3)], [0, 1, rng.integers(-2, 3)]])
+    moved = cv2.warpAffine(base, shift, (220, 220), borderMode=cv2.BORDER_REFLECT)
+    return cv2.add(moved, rng.integers(0, 16, (220, 220), dtype=np.uint8))
+
+
+def run(samples: int, samples_per_person: int, args: argparse.Namespace) -> None:
+    """Benchmark one enrolment size."""
+    rng = np.random.default_rng(0)
+    persons: int = max(1, samples // samples_per_person)
+    bases = [make_face(i) for i in range(persons)]
+    labels = np.repeat(np.arange(persons, dtype=np.int32), samples_per_person)
+    empty = LBPHMatcher(np.zeros((0, 16384), np.float32), np.zeros(0))
+    histograms = np.concatenate(
+        [
+            empty.histogram(
+                np.stack(
+                    [make_sample(bases[label], rng) for label in labels[i : i + 256]]
+                )
+            )
+            for i in range(0, len(labels), 256)
+        ]
+    )
+    matcher = LBPHMatcher(histograms, labels)
+    del histograms
+
+    start: float = time.perf_counter()
+    index = FaceIndex.build(matcher.blocks)
+    build_seconds: float = time.perf_counter() - start
+
+    queries = empty.histogram(
+        np.stack(
+            [
+                make_sample(bases[int(rng.integers(persons))], rng)
+                for _ in range(args.queries)
+            ]
+        )
+    )
+    start = time.perf_counter()
+    expected = matcher.predict_histograms(queries)
+    exact_ms: float = (time.perf_counter() - start) / args.queries * 1000
+
+    print(
+        f"\n{len(labels)} samples, {persons} persons, {len(index.centroids)} lists,"
+        f" build {build_seconds:.1f} s, exhaustive {exact_ms:.2f} ms/query"
+    )
+    print(f"{'nprobe':>8} {'ms/query':>10} {'speedup':>8} {'recall':>8} {'cands':>7}")
+    matcher.index = index
+    index.rerank = args.rerank
+    for nprobe in args.nprobe:
+        index.nprobe = nprobe
+        candidates: int = sum(len(index.search(query)) for query in queries)
+        start = time.perf_counter()
+        results = matcher.predict_histograms(queries)
+        index_ms: float = (time.perf_counter() - start) / args.queries * 1000
+        recall: float = np.mean([a[0] == b[0] for a, b in zip(expected, results)])
+        print(
+            f"{nprobe:>8d} {index_ms:>10.2f} {exact_ms / index_ms:>8.1f}"
+            f" {recall:>8.1%} {candidates / args.queries:>7.0f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--samples", nargs="+", type=int, default=[5000, 20000])
+    parser.add_argument("--samples-per-person", type=int, default=20)
+    parser.add_argument("--nprobe", nargs="+", type=int, default=[4, 16, 64])
+    parser.add_argument("--rerank", type=int, default=64)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    for samples in args.samples:
+        run(samples, args.samples_per_person, args)
+
+
+if __name__ == "__main__":
+    main()
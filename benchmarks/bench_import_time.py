@@ -0,0 +1,59 @@
+"""
+Benchmark of the import time of the API and the first use of the detector.
+
+Imports src.api.routes (everything main.py imports besides the database
+setup) in fresh interpreters and reports the median time, then the time and
+resident memory taken by loading the Haar cascade on first use.
+
+Usage:
+    python benchmarks/bench_import_time.py --runs 5
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+# Add parent directory to path
+ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+IMPORT_SCRIPT: str = (
+    "import time; start = time.perf_counter(); import src.api.routes; "
+    "print(time.perf_counter() - start)"
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    seconds: list[float] = []
+    for _ in range(args.runs):
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_SCRIPT],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        seconds.append(float(output.strip().splitlines()[-1]))
+    print(
+        f"import src.api.routes: mediana {statistics.median(seconds) * 1000:.0f} ms"
+        f" (min {min(seconds) * 1000:.0f} ms, {args.runs} execuções)"
+    )
+
+    from src.services.model_registry import model_registry
+
+    model_registry.face_detector()
+    memory = model_registry.get_memory()
+    print(
+        f"primeiro uso do detector: {memory['detector_load_ms']:.0f} ms,"
+        f" {memory['detector_bytes'] / 1e6:.1f} MB residentes"
+    )
+
+
+if __name__ == "__main__":
+    main()
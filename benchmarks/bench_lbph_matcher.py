@@ -0,0 +1,95 @@
+"""
+Benchmark of the NumPy LBPH matcher against OpenCV's recognizer.predict.
+
+Trains an OpenCV LBPH model on synthetic faces for each enrolled population,
+then recognizes the same batch of queries with both engines and reports the
+time per face and whether every label and distance matched.
+
+Usage:
+    python benchmarks/bench_lbph_matcher.py --persons 100 1000 10000 \
+        --samples-per-person 1 --queries 16
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.lbph_matcher import LBPHMatcher
+
+
+def make_face(seed: int) -> np.ndarray:
+    """Create a smooth random 220x220 grayscale face."""
+    rng = np.random.default_rng(seed)
+    image = cv2.resize(rng.integers(0, 255, (55, 55), dtype=np.uint8), (220, 220))
+    return cv2.GaussianBlur(image, (3, 3), 0)
+
+
+def run(persons: int, samples_per_person: int, queries: int, workers: int) -> None:
+    """Benchmark both engines for one enrolled population."""
+    samples: int = persons * samples_per_person
+    recognizer = cv2.face.LBPHFaceRecognizer_create()
+    labels = np.repeat(np.arange(persons, dtype=np.int32), samples_per_person)
+    start: float = time.perf_counter()
+    recognizer.train([make_face(i) for i in range(samples)], labels)
+    train_seconds: float = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matcher = LBPHMatcher.from_recognizer(recognizer, workers=workers)
+    build_seconds: float = time.perf_counter() - start
+
+    rng = np.random.default_rng(0)
+    faces = [
+        cv2.add(
+            make_face(int(rng.integers(samples))),
+            rng.integers(0, 12, (220, 220), dtype=np.uint8),
+        )
+        for _ in range(queries)
+    ]
+
+    start = time.perf_counter()
+    expected = [recognizer.predict(face) for face in faces]
+    opencv_seconds: float = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = matcher.predict_batch(faces)
+    numpy_seconds: float = time.perf_counter() - start
+
+    same_labels: int = sum(a[0] == b[0] for a, b in zip(expected, results))
+    max_error: float = max(
+        abs(a[1] - b[1]) / max(abs(a[1]), 1e-12) for a, b in zip(expected, results)
+    )
+    print(
+        f"{persons:>8d} {samples:>8d} {train_seconds:>8.1f} {build_seconds:>7.2f}"
+        f" {opencv_seconds / queries * 1000:>10.2f}"
+        f" {numpy_seconds / queries * 1000:>10.2f}"
+        f" {opencv_seconds / numpy_seconds:>8.2f}"
+        f" {same_labels:>4d}/{queries:<4d} {max_error:>9.1e}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--persons", nargs="+", type=int, default=[100, 1000, 10000])
+    parser.add_argument("--samples-per-person", type=int, default=1)
+    parser.add_argument("--queries", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    print(
+        f"{'persons':>8} {'samples':>8} {'train_s':>8} {'build_s':>7}"
+        f" {'opencv_ms':>10} {'numpy_ms':>10} {'speedup':>8} {'labels':>9}"
+        f" {'max_rel':>9}"
+    )
+    for persons in args.persons:
+        run(persons, args.samples_per_person, args.queries, args.workers)
+
+
+if __name__ == "__main__":
+    main()
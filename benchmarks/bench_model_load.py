@@ -0,0 +1,86 @@
+"""
+Benchmark of loading the LBPH model from YAML and from the binary format.
+
+Trains an OpenCV LBPH model on synthetic faces for each number of samples,
+writes it both with LBPHFaceRecognizer.write and as a binary model file,
+then reports the file sizes and how long each takes to load into a matcher.
+
+Usage:
+    python benchmarks/bench_model_load.py --samples 100 1000 5000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.lbph_matcher import LBPHMatcher
+from src.services.model_store import load_model, save_model
+
+
+def make_face(seed: int) -> np.ndarray:
+    """Create a smooth random 220x220 grayscale face."""
+    rng = np.random.default_rng(seed)
+    image = cv2.resize(rng.integers(0, 255, (55, 55), dtype=np.uint8), (220, 220))
+    return cv2.GaussianBlur(image, (3, 3), 0)
+
+
+def run(samples: int, directory: Path) -> None:
+    """Benchmark both formats for one number of samples."""
+    recognizer = cv2.face.LBPHFaceRecognizer_create()
+    recognizer.train(
+        [make_face(i) for i in range(samples)], np.arange(samples, dtype=np.int32)
+    )
+    yaml_path = directory / f"model.{samples}.yml"
+    binary_path = directory / f"model.{samples}.bin"
+
+    start: float = time.perf_counter()
+    recognizer.write(str(yaml_path))
+    yaml_write: float = time.perf_counter() - start
+    start = time.perf_counter()
+    save_model(LBPHMatcher.from_recognizer(recognizer, workers=1), binary_path)
+    binary_write: float = time.perf_counter() - start
+
+    start = time.perf_counter()
+    loaded = cv2.face.LBPHFaceRecognizer_create()
+    loaded.read(str(yaml_path))
+    LBPHMatcher.from_recognizer(loaded, workers=1)
+    yaml_load: float = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matcher = load_model(binary_path, workers=1)
+    binary_load: float = time.perf_counter() - start
+
+    assert len(matcher) == samples
+    print(
+        f"{samples:>8d} {yaml_path.stat().st_size / 1e6:>8.1f}"
+        f" {binary_path.stat().st_size / 1e6:>8.1f}"
+        f" {yaml_write:>8.2f} {binary_write:>8.2f}"
+        f" {yaml_load * 1000:>12.1f} {binary_load * 1000:>12.2f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--samples", nargs="+", type=int, default=[100, 1000, 5000])
+    args = parser.parse_args()
+
+    print(
+        f"{'samples':>8} {'yaml_mb':>8} {'bin_mb':>8} {'yaml_w_s':>8}"
+        f" {'bin_w_s':>8} {'yaml_load_ms':>12} {'bin_load_ms':>12}"
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        for samples in args.samples:
+            run(samples, Path(directory))
+
+
+if __name__ == "__main__":
+    main()
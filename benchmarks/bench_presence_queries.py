@@ -0,0 +1,173 @@
+"""
+Benchmark of the presence queries on millions of synthetic sightings.
+
+Fills a database with random sightings of --persons people on --cameras
+cameras over --days days, written in batches together with their hourly
+rollups like the sighting writer does. Then times the person and camera
+time range queries and the weekly occupancy of a camera, read from the
+rollup and, for comparison, aggregated from the raw sightings.
+
+Uses a temporary SQLite file unless --database-url points to another
+database (e.g. the MySQL of the API, whose tables must not hold real data).
+
+Usage:
+    python benchmarks/bench_presence_queries.py --sightings 1000000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import and_, create_engine, func
+from sqlalchemy.orm import Session, sessionmaker
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.entities.models import CameraHour, PresenceHour, Sighting
+from src.infra.database import Base
+from src.repositories.presence_repository import (
+    get_camera_occupancy,
+    get_camera_presence,
+    get_person_presence,
+    update_presence_rollups,
+)
+
+BATCH: int = 10000
+START: datetime = datetime(2026, 1, 1)
+
+
+def fill(session_factory, args: argparse.Namespace) -> float:
+    """Write the synthetic sightings and rollups, returning the seconds taken."""
+    rng = np.random.default_rng(0)
+    seconds: float = args.days * 86400
+    started: float = time.perf_counter()
+    for first in range(0, args.sightings, BATCH):
+        count: int = min(BATCH, args.sightings - first)
+        offsets = np.sort(rng.uniform(0, seconds, count))
+        persons = rng.integers(1, args.persons + 1, count)
+        cameras = rng.integers(1, args.cameras + 1, count)
+        frames = rng.integers(1, 30, count)
+        rows = [
+            {
+                "person_id": int(persons[i]),
+                "camera_id": int(cameras[i]),
+                "timestamp": START + timedelta(seconds=float(offsets[i])),
+                "last_seen": START + timedelta(seconds=float(offsets[i]) + 5),
+                "frames": int(frames[i]),
+                "confidence": 50.0,
+                "box_x": 0,
+                "box_y": 0,
+                "box_width": 80,
+                "box_height": 80,
+            }
+            for i in range(count)
+        ]
+        session: Session = session_factory()
+        try:
+            session.execute(Sighting.__table__.insert(), rows)
+            update_presence_rollups(session, rows)
+            session.commit()
+        finally:
+            session.close()
+    return time.perf_counter() - started
+
+
+def raw_occupancy(session: Session, camera_id: int, start: datetime, end: datetime):
+    """Aggregate the hourly occupancy from the raw sightings."""
+    if session.get_bind().dialect.name == "sqlite":
+        hour = func.strftime("%Y-%m-%d %H", Sighting.timestamp)
+    else:
+        hour = func.date_format(Sighting.timestamp, "%Y-%m-%d %H")
+    return (
+        session.query(hour, func.count(func.distinct(Sighting.person_id)), func.count())
+        .filter(
+            and_(
+                Sighting.camera_id == camera_id,
+                Sighting.timestamp >= start,
+                Sighting.timestamp < end,
+            )
+        )
+        .group_by(hour)
+        .all()
+    )
+
+
+def time_query(session_factory, query, repeats: int) -> list[float]:
+    """Run a query with random arguments, returning each latency in ms."""
+    rng = np.random.default_rng(1)
+    latencies: list[float] = []
+    for _ in range(repeats):
+        session: Session = session_factory()
+        try:
+            started: float = time.perf_counter()
+            query(session, rng)
+            latencies.append((time.perf_counter() - started) * 1000)
+        finally:
+            session.close()
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sightings", type=int, default=1000000)
+    parser.add_argument("--persons", type=int, default=500)
+    parser.add_argument("--cameras", type=int, default=20)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--target-ms", type=float, default=50.0)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        url: str = args.database_url or f"sqlite:///{directory}/presence.db"
+        engine = create_engine(url)
+        tables = [Sighting.__table__, PresenceHour.__table__, CameraHour.__table__]
+        Base.metadata.drop_all(engine, tables=tables)
+        Base.metadata.create_all(engine, tables=tables)
+        session_factory = sessionmaker(bind=engine)
+
+        fill_seconds: float = fill(session_factory, args)
+        print(
+            f"{args.sightings} aparições gravadas em {fill_seconds:.1f} s"
+            f" ({args.sightings / fill_seconds:,.0f}/s, com rollups)"
+        )
+
+        def window(rng, hours: int) -> tuple[datetime, datetime]:
+            start = START + timedelta(
+                hours=int(rng.integers(0, args.days * 24 - hours))
+            )
+            return start, start + timedelta(hours=hours)
+
+        queries = {
+            "pessoa, 2 h": lambda session, rng: get_person_presence(
+                session, int(rng.integers(1, args.persons + 1)), *window(rng, 2), 1000
+            ),
+            "câmera, 2 h": lambda session, rng: get_camera_presence(
+                session, int(rng.integers(1, args.cameras + 1)), *window(rng, 2), 1000
+            ),
+            "ocupação 7 dias (rollup)": lambda session, rng: get_camera_occupancy(
+                session, int(rng.integers(1, args.cameras + 1)), *window(rng, 168)
+            ),
+            "ocupação 7 dias (bruto)": lambda session, rng: raw_occupancy(
+                session, int(rng.integers(1, args.cameras + 1)), *window(rng, 168)
+            ),
+        }
+        print(f"{'consulta':<26} {'p50_ms':>8} {'p95_ms':>8} {'meta':>6}")
+        for name, query in queries.items():
+            latencies = sorted(time_query(session_factory, query, args.repeats))
+            p95: float = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+            print(
+                f"{name:<26} {statistics.median(latencies):>8.2f} {p95:>8.2f}"
+                f" {'ok' if p95 <= args.target_ms else 'acima':>6}"
+            )
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark of the parallel training stages for several numbers of workers.
+
+Writes synthetic 220x220 faces as person.{id}.{sample}.jpg pictures in a
+temporary directory, then for each number of workers times the JPEG import
+into a packed dataset (decode) and the chunked LBPH training (histograms),
+reporting the speedup of each stage over one worker.
+
+Usage:
+    python benchmarks/bench_training_workers.py --faces 4000 --workers 1 2 4 8
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.face_dataset import FaceDataset
+from src.services.training import train_in_chunks
+
+
+def make_face(seed: int) -> np.ndarray:
+    """Create a smooth random 220x220 grayscale face."""
+    rng = np.random.default_rng(seed)
+    image = cv2.resize(rng.integers(0, 255, (55, 55), dtype=np.uint8), (220, 220))
+    return cv2.GaussianBlur(image, (3, 3), 0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--faces", type=int, default=4000)
+    parser.add_argument("--samples-per-person", type=int, default=20)
+    parser.add_argument(
+        "--workers", nargs="+", type=int, default=[1, 2, 4, os.cpu_count() or 1]
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        root = Path(directory)
+        for i in range(args.faces):
+            person_id, sample = divmod(i, args.samples_per_person)
+            path = root / f"person.{person_id}.{sample + 1}.jpg"
+            cv2.imwrite(str(path), make_face(i))
+
+        print(
+            f"{'workers':>8} {'decode_s':>9} {'speedup':>8}"
+            f" {'train_s':>9} {'speedup':>8} {'busy/wall':>10}"
+        )
+        baseline: tuple[float, float] | None = None
+        for workers in args.workers:
+            dataset = FaceDataset(
+                root / f"faces.{workers}.u8", root / f"faces.{workers}.labels"
+            )
+            start: float = time.perf_counter()
+            dataset.import_pictures(root, workers=workers)
+            decode_seconds: float = time.perf_counter() - start
+
+            faces, records = dataset.load()
+            ids = records["person_id"].astype(np.int32)
+            start = time.perf_counter()
+            _, busy = train_in_chunks(list(faces), ids, workers)
+            train_seconds: float = time.perf_counter() - start
+
+            baseline = baseline or (decode_seconds, train_seconds)
+            print(
+                f"{workers:>8d} {decode_seconds:>9.2f}"
+                f" {baseline[0] / decode_seconds:>8.2f}"
+                f" {train_seconds:>9.2f} {baseline[1] / train_seconds:>8.2f}"
+                f" {busy / train_seconds:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
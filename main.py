@@ -2,11 +2,29 @@ from fastapi import FastAPI
 
 from src.infra.database import init_db
 from src.api import routes
+from src.infra.config import MONITOR_AUTOSTART
+from src.repositories.sighting_repository import sighting_writer
+from src.services.model_store import convert_legacy_model
+from src.services.recognition_monitor import recognition_monitor
 
 app = FastAPI()
 
 # Initialize database tables using SQLAlchemy
 init_db()
 
+# Convert the YAML model of older versions to the binary format
+convert_legacy_model()
+
+# Recognize faces on every camera that is on, without any client attached
+if MONITOR_AUTOSTART:
+    recognition_monitor.start()
+
+
+# Write the sightings still buffered before the process exits
+@app.on_event("shutdown")
+def flush_sightings() -> None:
+    sighting_writer.stop()
+
+
 # include routes from api
 app.include_router(routes.app)
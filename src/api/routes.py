@@ -1,7 +1,6 @@
+from datetime import datetime, timedelta
 from pathlib import Path
-from time import sleep
 
-from cv2 import VideoCapture
 from fastapi import APIRouter, BackgroundTasks, Depends, File, Query, UploadFile
 from fastapi.responses import HTMLResponse
 from sqlalchemy.orm import Session
@@ -30,10 +29,24 @@ from src.repositories.person_repository import (
     remove_person,
     update_person,
 )
+from src.repositories.presence_repository import (
+    get_camera_occupancy,
+    get_camera_presence,
+    get_person_presence,
+)
+from src.repositories.sighting_repository import sighting_writer
+from src.services.capture_hub import WEBCAM_CAMERA_ID, get_hub_stats, is_capturing
+from src.services.face_dataset import face_dataset, sample_names
+from src.services.face_tracking import get_tracker_stats
 from src.services.facial_recognition import (
     stream_facial_recognition,
     stream_recognition_only,
 )
+from src.services.frame_cache import frame_cache
+from src.services.metadata_stream import stream_detection_metadata
+from src.services.model_registry import model_registry
+from src.services.motion_gate import get_motion_stats
+from src.services.passthrough_stream import camera_stream_url, stream_plain_video
 from src.services.pictures_capture import (
     get_capture_state,
     reset_capture_state,
@@ -43,7 +56,10 @@ from src.services.pictures_capture import (
     stream_video_only,
     trigger_capture,
 )
-from src.services.training import trainLBPH
+from src.services.recognition_monitor import camera_opener, recognition_monitor
+from src.services.recognition_service import recognition_service
+from src.services.training import remove_person_from_model
+from src.services.training_jobs import training_jobs
 from src.services.video_analysis import analyze_video_file, analyze_video_file_sync
 
 # Directory for uploaded videos
@@ -61,16 +77,18 @@ app = APIRouter()
 def verificar_status():
     """Check system status and available resources."""
     # Check webcam availability
-    webcam_available = False
-    try:
-        cap = get_webcam_capture()
-        webcam_available = cap.isOpened()
-        cap.release()
-    except Exception:
-        pass
+    # A webcam already shared by the capture hub is available by definition
+    webcam_available = is_capturing(WEBCAM_CAMERA_ID)
+    if not webcam_available:
+        try:
+            cap = get_webcam_capture()
+            webcam_available = cap.isOpened()
+            cap.release()
+        except Exception:
+            pass
 
-    # Check pictures directory
-    pictures_count = len(list(PICTURES_DIR.glob("person.*.*.jpg")))
+    # Count the captured faces in the packed dataset
+    pictures_count = len(face_dataset)
 
     return {
         "status": "online",
@@ -198,22 +216,31 @@ def deletar_pessoa(
 ):
     try:
         background_tasks.add_task(remove_person, session, person_id)
+        background_tasks.add_task(remove_person_from_model, person_id)
         return 200, "Requisição recebida"
     except Exception as e:
         raise e
 
 
-# API endpoint to train a new file of facial recognition
+# API endpoint to train a new file of facial recognition from every picture
 @app.get("/treinamento")
 def treinar_reconhecimento():
-    try:
-        success, message = trainLBPH()
-        if success:
-            return {"status": "success", "message": message}
-        else:
-            return {"status": "error", "message": message}
-    except Exception as e:
-        return {"status": "error", "message": str(e)}
+    """Agenda um treinamento completo; acompanhe em /treinamento/{job_id}."""
+    job = training_jobs.submit()
+    return {
+        "status": "accepted",
+        "message": "Treinamento agendado",
+        "job": job.to_dict(),
+    }
+
+
+@app.get("/treinamento/{job_id}")
+def estado_treinamento(job_id: str):
+    """Fase e progresso de um treinamento agendado."""
+    job = training_jobs.get(job_id)
+    if job is None:
+        return {"status": "error", "message": "Treinamento não encontrado"}
+    return job.to_dict()
 
 
 # API endpoint to facial recognition stream
@@ -225,6 +252,27 @@ def reconhecimento_facial(camera_id: int, session: Session = Depends(get_db)):
     )
 
 
+# API endpoint to stream the recognition results without video
+@app.get("/video/{camera_id}/metadados")
+def metadados_reconhecimento(camera_id: int, session: Session = Depends(get_db)):
+    """Eventos (SSE) com as faces de cada quadro: caixas, nomes, confiança e horário.
+
+    Use camera_id=0 para a webcam local.
+    """
+    if camera_id == WEBCAM_CAMERA_ID:
+        open_capture = get_webcam_capture
+    else:
+        camera = get_camera_by_id(session, camera_id)
+        if camera is None:
+            return {"status": "error", "message": "Camera não encontrada"}
+        open_capture = camera_opener(camera)
+    return StreamingResponse(
+        stream_detection_metadata(camera_id, open_capture),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # API endpoint to stream and catch pictures
 @app.get("/fotos/{camera_id}&{nome_pessoa}")
 def capturar_fotos(
@@ -251,20 +299,85 @@ def capturar(session: Session = Depends(get_db)):
         raise e
 
 
-# API endpoint to start background cameras
+def _periodo(
+    inicio: datetime | None, fim: datetime | None, dias: int
+) -> tuple[datetime, datetime]:
+    """Default a time range to the last days up to now."""
+    fim = fim or datetime.now()
+    return inicio or fim - timedelta(days=dias), fim
+
+
+# API endpoint to know where a person was seen in a time range
+@app.get("/presenca/pessoa/{person_id}")
+def presenca_pessoa(
+    person_id: int,
+    inicio: datetime | None = None,
+    fim: datetime | None = None,
+    limite: int = Query(default=1000, ge=1, le=10000),
+    session: Session = Depends(get_db),
+):
+    """Câmeras em que a pessoa foi reconhecida entre inicio e fim (padrão: último dia)."""
+    inicio, fim = _periodo(inicio, fim, 1)
+    return get_person_presence(session, person_id, inicio, fim, limite)
+
+
+# API endpoint to know who a camera saw in a time range
+@app.get("/presenca/camera/{camera_id}")
+def presenca_camera(
+    camera_id: int,
+    inicio: datetime | None = None,
+    fim: datetime | None = None,
+    limite: int = Query(default=1000, ge=1, le=10000),
+    session: Session = Depends(get_db),
+):
+    """Pessoas reconhecidas pela câmera entre inicio e fim (padrão: último dia)."""
+    inicio, fim = _periodo(inicio, fim, 1)
+    return get_camera_presence(session, camera_id, inicio, fim, limite)
+
+
+# API endpoint to count the people per hour of a camera
+@app.get("/ocupacao/camera/{camera_id}")
+def ocupacao_camera(
+    camera_id: int,
+    inicio: datetime | None = None,
+    fim: datetime | None = None,
+    session: Session = Depends(get_db),
+):
+    """Pessoas distintas e aparições por hora na câmera (padrão: últimos 7 dias)."""
+    inicio, fim = _periodo(inicio, fim, 7)
+    return get_camera_occupancy(session, camera_id, inicio, fim)
+
+
+# API endpoints of the headless recognition monitor
+@app.post("/monitoramento")
+def iniciar_monitoramento(camera_id: int | None = None, fps: float | None = None):
+    """Reconhece faces em segundo plano em todas as câmeras ligadas.
+
+    Com camera_id e fps, limita os quadros por segundo processados da câmera.
+    """
+    if camera_id is not None and fps is not None:
+        recognition_monitor.set_fps(camera_id, fps)
+    cameras = recognition_monitor.start()
+    return {"status": "success", "cameras": cameras}
+
+
+@app.get("/monitoramento")
+def listar_monitoramento():
+    """Câmeras monitoradas, contadores e as últimas faces reconhecidas."""
+    return recognition_monitor.get_stats()
+
+
+@app.delete("/monitoramento")
+def parar_monitoramento():
+    """Para o reconhecimento em segundo plano de todas as câmeras."""
+    recognition_monitor.stop()
+    return {"status": "success", "message": "Monitoramento parado"}
+
+
+# Former endpoint of the background cameras, kept for existing clients
 @app.get("/background_cameras")
-def iniciar_cameras_background(session: Session = Depends(get_db)):
-    camera = get_camera_by_id(session, 1)
-    if camera is None:
-        return {"status": "error", "message": "Camera não encontrada"}
-    camera_ip = VideoCapture(
-        f"rtsp://{camera.user}:{camera.password}@{camera.camera_ip}/"
-    )
-    while True:
-        image_ok, frame = camera_ip.read()
-        if image_ok:
-            print("running on background")
-        sleep(30)
+def iniciar_cameras_background():
+    return iniciar_monitoramento()
 
 
 # API endpoint for webcam-only photo capture (uses camera_id=0 as convention for webcam)
@@ -302,16 +415,18 @@ def reconhecimento_facial_webcam(session: Session = Depends(get_db)):
 @app.get("/fotos")
 def listar_fotos():
     """List all captured pictures."""
-    pictures = list(PICTURES_DIR.glob("person.*.*.jpg"))
-    return {"count": len(pictures), "pictures": [p.name for p in pictures]}
+    _, records = face_dataset.load()
+    return {"count": len(records), "pictures": sample_names(records)}
 
 
 # API endpoint to delete all pictures (for retraining)
 @app.delete("/fotos")
 def deletar_fotos():
     """Delete all captured pictures."""
+    deleted = len(face_dataset)
+    face_dataset.clear()
+    # Loose JPEG pictures saved by older versions
     pictures = list(PICTURES_DIR.glob("person.*.*.jpg"))
-    deleted = 0
     for p in pictures:
         try:
             p.unlink()
@@ -814,8 +929,13 @@ def pagina_captura(session: Session = Depends(get_db)):
                 showStatus('Treinando modelo...', 'info');
                 try {
                     const resp = await fetch('/treinamento');
-                    const data = await resp.json();
-                    showStatus(data.message, data.status === 'success' ? 'success' : 'error');
+                    let job = (await resp.json()).job;
+                    while (job.status === 'queued' || job.status === 'running') {
+                        showStatus('Treinando modelo... ' + job.phase + ' (' + job.progress + '%)', 'info');
+                        await new Promise(r => setTimeout(r, 1000));
+                        job = await (await fetch('/treinamento/' + job.job_id)).json();
+                    }
+                    showStatus(job.message, job.status === 'success' ? 'success' : 'error');
                 } catch(e) {
                     showStatus('Erro: ' + e.message, 'error');
                 }
@@ -859,10 +979,30 @@ def pagina_captura(session: Session = Depends(get_db)):
 
 
 @app.get("/stream/video/{camera_id}")
-def stream_video(camera_id: int):
-    """Stream de vídeo com detecção facial (sem captura automática)."""
+def stream_video(
+    camera_id: int, anotacoes: bool = True, session: Session = Depends(get_db)
+):
+    """Stream de vídeo com detecção facial (sem captura automática).
+
+    Com anotacoes=false o vídeo é enviado sem detecção: o JPEG das câmeras
+    MJPEG é repassado sem decodificar nem recodificar.
+    """
+    if anotacoes:
+        return StreamingResponse(
+            stream_video_only(camera_id=camera_id),
+            media_type="multipart/x-mixed-replace;boundary=frame",
+        )
+    url: str | None = None
+    if camera_id == WEBCAM_CAMERA_ID:
+        open_capture = get_webcam_capture
+    else:
+        camera = get_camera_by_id(session, camera_id)
+        if camera is None:
+            return {"status": "error", "message": "Camera não encontrada"}
+        open_capture = camera_opener(camera)
+        url = camera_stream_url(camera)
     return StreamingResponse(
-        stream_video_only(camera_id=camera_id),
+        stream_plain_video(camera_id, open_capture, url),
         media_type="multipart/x-mixed-replace;boundary=frame",
     )
 
@@ -876,6 +1016,20 @@ def stream_reconhecimento():
     )
 
 
+@app.get("/stream/estatisticas")
+def estatisticas_stream():
+    """Contadores das câmeras, do cache de quadros, da detecção e do reconhecimento."""
+    return {
+        "cameras": get_hub_stats(),
+        "frame_cache": frame_cache.get_stats(),
+        "trackers": get_tracker_stats(),
+        "motion": get_motion_stats(),
+        "recognition": recognition_service.get_stats(),
+        "model": model_registry.get_stats(),
+        "sightings": sighting_writer.get_stats(),
+    }
+
+
 @app.post("/captura/iniciar/{nome_pessoa}")
 def iniciar_sessao_captura(nome_pessoa: str, session: Session = Depends(get_db)):
     """Inicia uma sessão de captura para uma pessoa e registra no banco."""
@@ -937,7 +1091,10 @@ def resetar_captura():
 
 @app.post("/captura/finalizar")
 def finalizar_captura():
-    """Finaliza a sessão de captura (pessoa já foi registrada ao iniciar)."""
+    """Finaliza a sessão de captura e adiciona as fotos ao modelo.
+
+    A pessoa já foi registrada ao iniciar; só as fotos novas são treinadas.
+    """
     state = get_capture_state()
     if not state["is_active"]:
         return {"status": "error", "message": "Nenhuma sessão ativa"}
@@ -946,10 +1103,16 @@ def finalizar_captura():
     person_name = state["person_name"]
     reset_capture_state()
 
+    # Added in the background; follow it in /treinamento/{job_id}
+    job = None
+    if samples > 0:
+        job = training_jobs.submit_enrollment(state["person_id"])
+
     return {
         "status": "success",
         "message": f"Sessão finalizada para {person_name} com {samples} fotos",
         "samples_captured": samples,
+        "job": job.to_dict() if job is not None else None,
     }
 
 
@@ -1,7 +1,8 @@
 import enum
+from datetime import datetime
 
-from sqlalchemy.schema import Column
-from sqlalchemy.types import Enum, Integer, String
+from sqlalchemy.schema import Column, Index
+from sqlalchemy.types import BigInteger, DateTime, Enum, Float, Integer, String
 
 from src.infra.database import Base
 
@@ -30,3 +31,48 @@ class Controller(Base):
     __tablename__ = "controller"
     capture_id: int = Column(Integer, primary_key=True, index=True, autoincrement=True)
     save_picture: int = Column(Integer)
+
+
+class Sighting(Base):
+    __tablename__ = "sighting"
+    sighting_id: int = Column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        primary_key=True,
+        autoincrement=True,
+    )
+    person_id: int = Column(Integer, nullable=False)
+    camera_id: int = Column(Integer, nullable=False)
+    timestamp: datetime = Column(DateTime, nullable=False)
+    last_seen: datetime = Column(DateTime, nullable=False)
+    frames: int = Column(Integer, nullable=False, default=1)
+    confidence: float = Column(Float, nullable=False)
+    box_x: int = Column(Integer)
+    box_y: int = Column(Integer)
+    box_width: int = Column(Integer)
+    box_height: int = Column(Integer)
+
+    # Time range queries by person and by camera
+    __table_args__ = (
+        Index("ix_sighting_person_timestamp", "person_id", "timestamp"),
+        Index("ix_sighting_camera_timestamp", "camera_id", "timestamp"),
+    )
+
+
+# Rollup of the sightings of each person per camera and hour
+class PresenceHour(Base):
+    __tablename__ = "presence_hour"
+    camera_id: int = Column(Integer, primary_key=True, autoincrement=False)
+    hour: datetime = Column(DateTime, primary_key=True)
+    person_id: int = Column(Integer, primary_key=True, autoincrement=False)
+    sightings: int = Column(Integer, nullable=False, default=0)
+    frames: int = Column(Integer, nullable=False, default=0)
+
+
+# Rollup of the distinct people and sightings per camera and hour
+class CameraHour(Base):
+    __tablename__ = "camera_hour"
+    camera_id: int = Column(Integer, primary_key=True, autoincrement=False)
+    hour: datetime = Column(DateTime, primary_key=True)
+    people: int = Column(Integer, nullable=False, default=0)
+    sightings: int = Column(Integer, nullable=False, default=0)
+    frames: int = Column(Integer, nullable=False, default=0)
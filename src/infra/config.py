@@ -1,5 +1,6 @@
 """Configuration module for cross-platform path handling and application settings."""
 
+import os
 import platform
 from pathlib import Path
 
@@ -11,10 +12,16 @@ BASE_DIR: Path = Path(__file__).resolve().parent.parent.parent
 
 # Asset paths
 HAARCASCADE_PATH: Path = BASE_DIR / "src/recognizer/haarcascade_frontalface_default.xml"
-CLASSIFIER_PATH: Path = BASE_DIR / "src/recognizer/classifierLBPH.yml"
+CLASSIFIER_PATH: Path = BASE_DIR / "src/recognizer/classifierLBPH.bin"
+# Model written by LBPHFaceRecognizer.write in older versions
+LEGACY_CLASSIFIER_PATH: Path = BASE_DIR / "src/recognizer/classifierLBPH.yml"
+FACE_INDEX_PATH: Path = BASE_DIR / "src/recognizer/classifierLBPH.ann.npz"
+ENROLLED_PICTURES_PATH: Path = BASE_DIR / "src/recognizer/classifierLBPH.enrolled.json"
 CAMERA_NOT_FOUND_IMAGE: Path = BASE_DIR / "templates/assets/camera_nao_encontrada.jpg"
 CAMERA_OFF_IMAGE: Path = BASE_DIR / "templates/assets/camera_desligada.jpg"
 PICTURES_DIR: Path = BASE_DIR / "pictures"
+FACE_DATASET_PATH: Path = PICTURES_DIR / "faces.u8"
+FACE_DATASET_INDEX_PATH: Path = PICTURES_DIR / "faces.labels"
 VIDEOS_DIR: Path = BASE_DIR / "videos"
 
 # Ensure directories exist
@@ -31,6 +38,150 @@ if platform.system() == "Darwin":
     WEBCAM_BACKEND = cv2.CAP_AVFOUNDATION
 
 
+# Stream capture settings
+# When enabled, camera readers grab() continuously and only decode the newest
+# frame on demand, so slow consumers never build up lag in the RTSP buffer.
+CAPTURE_LATEST_FRAME_ONLY: bool = (
+    os.getenv("CAPTURE_LATEST_FRAME_ONLY", "true").lower() == "true"
+)
+
+# Frame processing settings
+# Detection, recognition and JPEG encoding run in a bounded thread pool so
+# streams never block the asyncio event loop.
+PROCESSING_WORKERS: int = int(
+    os.getenv("PROCESSING_WORKERS", str(min(4, os.cpu_count() or 1)))
+)
+PROCESSING_MAX_PENDING: int = int(
+    os.getenv("PROCESSING_MAX_PENDING", str(PROCESSING_WORKERS * 2))
+)
+
+# Training settings
+# Decoding imported JPEG pictures and computing the LBPH histograms of the
+# training faces is split in chunks over TRAINING_WORKERS threads.
+TRAINING_WORKERS: int = max(
+    1, int(os.getenv("TRAINING_WORKERS", str(os.cpu_count() or 1)))
+)
+
+# Recognition service settings
+# Face crops from every stream are recognized by one worker in micro-batches of
+# up to RECOGNITION_BATCH_SIZE faces, waiting at most RECOGNITION_BATCH_WAIT_MS
+# for a batch to fill.
+RECOGNITION_BATCH_SIZE: int = max(1, int(os.getenv("RECOGNITION_BATCH_SIZE", "16")))
+RECOGNITION_BATCH_WAIT_MS: float = float(os.getenv("RECOGNITION_BATCH_WAIT_MS", "2"))
+# Faces whose LBPH distance is at least RECOGNITION_MAX_DISTANCE are unknown:
+# the model has no threshold, so every face gets the nearest enrolled label.
+RECOGNITION_MAX_DISTANCE: float = float(os.getenv("RECOGNITION_MAX_DISTANCE", "100"))
+
+# Model registry settings
+# Every worker polls the model file at this interval (seconds) and swaps in a
+# new version written by any worker; 0 disables the watcher.
+MODEL_WATCH_INTERVAL: float = float(os.getenv("MODEL_WATCH_INTERVAL", "2"))
+
+# Approximate face index settings
+# With FACE_INDEX enabled, training also builds an inverted-file index over
+# PCA-reduced histograms once there are FACE_INDEX_MIN_SAMPLES samples.
+# Recognition probes the FACE_INDEX_NPROBE nearest lists and re-ranks the
+# FACE_INDEX_RERANK closest candidates exactly: raise them for recall, lower
+# them for latency. FACE_INDEX_LISTS=0 uses 4 * sqrt(samples) lists.
+FACE_INDEX: bool = os.getenv("FACE_INDEX", "false").lower() == "true"
+FACE_INDEX_MIN_SAMPLES: int = int(os.getenv("FACE_INDEX_MIN_SAMPLES", "10000"))
+FACE_INDEX_DIMENSIONS: int = int(os.getenv("FACE_INDEX_DIMENSIONS", "128"))
+FACE_INDEX_LISTS: int = int(os.getenv("FACE_INDEX_LISTS", "0"))
+FACE_INDEX_NPROBE: int = int(os.getenv("FACE_INDEX_NPROBE", "16"))
+FACE_INDEX_RERANK: int = int(os.getenv("FACE_INDEX_RERANK", "64"))
+
+# Person directory settings
+# Names are cached in memory and invalidated on every person change; the TTL
+# only picks up changes written by other workers.
+PERSON_DIRECTORY_TTL: float = float(os.getenv("PERSON_DIRECTORY_TTL", "60"))
+
+# Camera control settings
+# Camera status and capture flag changes are pushed to running streams; the
+# database is only polled at this interval to catch changes from other workers.
+CONTROL_POLL_INTERVAL: float = float(os.getenv("CONTROL_POLL_INTERVAL", "5"))
+
+# Face tracking settings
+# The Haar cascade runs every DETECTION_INTERVAL frames (or when a track is
+# lost); faces are followed with optical flow in between. 1 disables tracking.
+DETECTION_INTERVAL: int = max(1, int(os.getenv("DETECTION_INTERVAL", "5")))
+# Detection runs on a copy downscaled to this width (0 keeps full resolution);
+# CAMERA_DETECTION_WIDTHS overrides it per camera, e.g. "1:640,3:1280".
+DETECTION_WIDTH: int = int(os.getenv("DETECTION_WIDTH", "960"))
+CAMERA_DETECTION_WIDTHS: dict[int, int] = {
+    int(camera_id): int(detection_width)
+    for camera_id, detection_width in (
+        item.split(":")
+        for item in os.getenv("CAMERA_DETECTION_WIDTHS", "").split(",")
+        if item.strip()
+    )
+}
+# Each tracked face is re-recognized every RECOGNITION_INTERVAL frames (or
+# sooner when its predictions disagree); the shown identity is a vote over the
+# last RECOGNITION_VOTES predictions.
+RECOGNITION_INTERVAL: int = max(1, int(os.getenv("RECOGNITION_INTERVAL", "15")))
+RECOGNITION_VOTES: int = max(1, int(os.getenv("RECOGNITION_VOTES", "5")))
+
+# Motion gate settings
+# A small blurred copy of each frame is compared with a running background;
+# static frames reuse the last output and detection is limited to the region
+# that changed. Pixels count as changed above MOTION_THRESHOLD gray levels, and
+# a frame is static when under MOTION_MIN_AREA of its pixels changed. A static
+# scene is still processed in full every MOTION_REFRESH_SECONDS, so slow
+# changes like the daylight reach the output.
+MOTION_GATE: bool = os.getenv("MOTION_GATE", "true").lower() == "true"
+MOTION_WIDTH: int = int(os.getenv("MOTION_WIDTH", "160"))
+MOTION_THRESHOLD: int = int(os.getenv("MOTION_THRESHOLD", "25"))
+MOTION_MIN_AREA: float = float(os.getenv("MOTION_MIN_AREA", "0.002"))
+MOTION_LEARNING_RATE: float = float(os.getenv("MOTION_LEARNING_RATE", "0.05"))
+MOTION_REFRESH_SECONDS: float = float(os.getenv("MOTION_REFRESH_SECONDS", "1.0"))
+
+# Recognition monitor settings
+# The monitor recognizes faces on every camera that is on, in the background
+# and without encoding frames, at most MONITOR_FPS frames per second per camera
+# (0 is uncapped); CAMERA_MONITOR_FPS overrides it per camera, e.g. "1:2,3:10".
+# The list of cameras that are on is refreshed every MONITOR_RESCAN_INTERVAL
+# seconds, and MONITOR_AUTOSTART starts the monitor with the API.
+MONITOR_FPS: float = float(os.getenv("MONITOR_FPS", "5"))
+CAMERA_MONITOR_FPS: dict[int, float] = {
+    int(camera_id): float(fps)
+    for camera_id, fps in (
+        item.split(":")
+        for item in os.getenv("CAMERA_MONITOR_FPS", "").split(",")
+        if item.strip()
+    )
+}
+MONITOR_RESCAN_INTERVAL: float = float(os.getenv("MONITOR_RESCAN_INTERVAL", "10"))
+MONITOR_AUTOSTART: bool = os.getenv("MONITOR_AUTOSTART", "false").lower() == "true"
+
+# Sightings settings
+# Recognized faces are buffered and written in bulk INSERTs of up to
+# SIGHTING_BATCH_SIZE rows, at least every SIGHTING_FLUSH_INTERVAL seconds.
+# Sightings of a person on a camera within SIGHTING_WINDOW seconds of the first
+# one are stored as a single row; at most SIGHTING_MAX_PENDING rows are kept
+# while the database is unreachable.
+SIGHTINGS: bool = os.getenv("SIGHTINGS", "true").lower() == "true"
+SIGHTING_BATCH_SIZE: int = max(1, int(os.getenv("SIGHTING_BATCH_SIZE", "500")))
+SIGHTING_FLUSH_INTERVAL: float = float(os.getenv("SIGHTING_FLUSH_INTERVAL", "2"))
+SIGHTING_WINDOW: float = float(os.getenv("SIGHTING_WINDOW", "10"))
+SIGHTING_MAX_PENDING: int = int(os.getenv("SIGHTING_MAX_PENDING", "100000"))
+
+# Pass-through streaming settings
+# Viewing streams without overlays relay the JPEG frames of cameras that
+# deliver MJPEG as they arrive, without decoding or re-encoding them; other
+# cameras are decoded and encoded once for every viewer. CAMERA_STREAM_URLS
+# sets the URL relayed for a camera instead of its RTSP one, e.g. its MJPEG
+# endpoint: "1:http://10.0.0.5/video.mjpg".
+PASSTHROUGH: bool = os.getenv("PASSTHROUGH", "true").lower() == "true"
+CAMERA_STREAM_URLS: dict[int, str] = {
+    int(camera_id): url.strip()
+    for camera_id, url in (
+        item.split(":", 1)
+        for item in os.getenv("CAMERA_STREAM_URLS", "").split(",")
+        if item.strip()
+    )
+}
+
+
 def get_webcam_capture(index: int | None = None) -> VideoCapture:
     """Get a VideoCapture object for the local webcam."""
     if index is None:
@@ -41,12 +192,36 @@ def get_webcam_capture(index: int | None = None) -> VideoCapture:
     return cv2.VideoCapture(index)
 
 
+def get_ip_camera_url(user: str, password: str, ip: str) -> str:
+    """Get the RTSP URL of an IP camera."""
+    return f"rtsp://{user}:{password}@{ip}/"
+
+
 def get_ip_camera_capture(user: str, password: str, ip: str) -> VideoCapture:
     """Get a VideoCapture object for an IP camera via RTSP."""
-    rtsp_url: str = f"rtsp://{user}:{password}@{ip}/"
+    rtsp_url: str = get_ip_camera_url(user, password, ip)
     return cv2.VideoCapture(rtsp_url)
 
 
+def get_raw_capture(url: str) -> VideoCapture:
+    """Get a VideoCapture returning compressed packets instead of decoded frames."""
+    capture = cv2.VideoCapture(url, cv2.CAP_FFMPEG)
+    if capture.isOpened():
+        capture.set(cv2.CAP_PROP_FORMAT, -1)
+    return capture
+
+
+def get_detection_width(camera_id: int) -> int | None:
+    """Get the detection width of a camera, or None for full resolution."""
+    detection_width: int = CAMERA_DETECTION_WIDTHS.get(camera_id, DETECTION_WIDTH)
+    return detection_width if detection_width > 0 else None
+
+
+def get_monitor_fps(camera_id: int) -> float:
+    """Get the frame rate cap of a camera in the recognition monitor."""
+    return CAMERA_MONITOR_FPS.get(camera_id, MONITOR_FPS)
+
+
 def classifier_exists() -> bool:
     """Check if the trained classifier file exists."""
     return CLASSIFIER_PATH.exists()
@@ -33,7 +33,14 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=db_engine)
 
 def init_db() -> None:
     """Initialize database tables using SQLAlchemy models."""
-    from src.entities.models import Camera, Controller, Person  # noqa: F401
+    from src.entities.models import (  # noqa: F401
+        Camera,
+        CameraHour,
+        Controller,
+        Person,
+        PresenceHour,
+        Sighting,
+    )
 
     Base.metadata.create_all(bind=db_engine)
 
@@ -0,0 +1,54 @@
+"""Lock shared by the threads of this worker and the other uvicorn workers."""
+
+import threading
+from typing import Any
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the threads of this worker are serialized
+    fcntl = None
+
+
+class FileLock:
+    """Serializes a change of some files, across threads and workers.
+
+    The thread lock is reentrant; the outermost acquisition also takes an
+    exclusive flock on the lock file, which other uvicorn workers wait on for
+    the whole read-modify-write.
+    """
+
+    def __init__(self, path: Any = None) -> None:
+        self.path: Any = path
+        self._lock = threading.RLock()
+        self._depth: int = 0
+        self._file: Any = None
+
+    def lock_path(self) -> str:
+        """Get the path of the lock file."""
+        return str(self.path)
+
+    def __enter__(self) -> "FileLock":
+        self._lock.acquire()
+        self._depth += 1
+        if self._depth == 1 and fcntl is not None:
+            try:
+                self._file = open(self.lock_path(), "a")
+                fcntl.flock(self._file, fcntl.LOCK_EX)
+            except BaseException:
+                self._release_file()
+                self._depth -= 1
+                self._lock.release()
+                raise
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._depth -= 1
+        if self._depth == 0:
+            self._release_file()
+        self._lock.release()
+
+    def _release_file(self) -> None:
+        """Unlock and close the lock file, if open."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -6,11 +6,21 @@ from src.repositories.camera_repository import (
     remove_camera,
     update_camera,
 )
+from src.repositories.control_channel import (
+    get_camera_status,
+    get_capture_flag,
+    publish_camera_status,
+    publish_capture_flag,
+)
 from src.repositories.controller_repository import (
     get_controller_by_id,
     reset_capture_flag,
     set_capture_flag,
 )
+from src.repositories.person_directory import (
+    get_person_name,
+    invalidate_person_directory,
+)
 from src.repositories.person_repository import (
     PersonNotFound,
     create_person,
@@ -28,8 +38,14 @@ __all__ = [
     "get_all_cameras",
     "get_all_persons",
     "get_camera_by_id",
+    "get_camera_status",
+    "get_capture_flag",
     "get_controller_by_id",
     "get_person_by_id",
+    "get_person_name",
+    "invalidate_person_directory",
+    "publish_camera_status",
+    "publish_capture_flag",
     "remove_camera",
     "remove_person",
     "reset_capture_flag",
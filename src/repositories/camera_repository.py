@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 
 from src.entities.models import Camera
 from src.entities.schemas import CreateAndUpdateCamera
+from src.repositories.control_channel import publish_camera_status
 
 
 class CameraNotFound(Exception):
@@ -25,6 +26,7 @@ def create_camera(session: Session, camera_info: CreateAndUpdateCamera) -> Camer
     session.add(new_camera)
     session.commit()
     session.refresh(new_camera)
+    publish_camera_status(new_camera.camera_id, new_camera.status)
     return new_camera
 
 
@@ -43,6 +45,7 @@ def update_camera(
     camera.password = info_update.password
     session.commit()
     session.refresh(camera)
+    publish_camera_status(camera.camera_id, camera.status)
 
     return camera
 
@@ -56,3 +59,4 @@ def remove_camera(session: Session, _id: int) -> None:
 
     session.delete(camera_info)
     session.commit()
+    publish_camera_status(_id, None)
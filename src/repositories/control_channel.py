@@ -0,0 +1,83 @@
+"""Control channel pushing camera status and capture flag changes to streams."""
+
+import threading
+import time
+
+from sqlalchemy.orm import Session
+
+from src.entities.models import Camera, CameraStatus, Controller
+from src.infra.config import CONTROL_POLL_INTERVAL
+
+_camera_status: dict[int, CameraStatus | None] = {}
+_capture_flags: dict[int, int | None] = {}
+_synced_at: dict[tuple[str, int], float] = {}
+_lock = threading.Lock()
+
+
+def _poll(kind: str, _id: int) -> CameraStatus | int | None:
+    """Read the current value straight from the database."""
+    from src.infra.database import SessionLocal
+
+    db: Session = SessionLocal()
+    try:
+        if kind == "camera":
+            return db.query(Camera.status).filter(Camera.camera_id == _id).scalar()
+        return (
+            db.query(Controller.save_picture)
+            .filter(Controller.capture_id == _id)
+            .scalar()
+        )
+    finally:
+        db.close()
+
+
+def _get(kind: str, values: dict, _id: int) -> CameraStatus | int | None:
+    """Get a published value, polling the database when it is stale."""
+    with _lock:
+        synced_at: float | None = _synced_at.get((kind, _id))
+        if (
+            synced_at is not None
+            and time.monotonic() - synced_at < CONTROL_POLL_INTERVAL
+        ):
+            return values.get(_id)
+
+    try:
+        value = _poll(kind, _id)
+    except Exception as e:
+        # Keep the last known value; try the database again later
+        print(f"Error polling {kind} {_id}: {e}")
+        with _lock:
+            _synced_at[(kind, _id)] = time.monotonic()
+            return values.get(_id)
+
+    _publish(kind, values, _id, value)
+    return value
+
+
+def _publish(
+    kind: str, values: dict, _id: int, value: CameraStatus | int | None
+) -> None:
+    """Store a value and mark it as fresh."""
+    with _lock:
+        values[_id] = value
+        _synced_at[(kind, _id)] = time.monotonic()
+
+
+def publish_camera_status(camera_id: int, status: CameraStatus | None) -> None:
+    """Push a camera status change to the running streams."""
+    _publish("camera", _camera_status, camera_id, status)
+
+
+def get_camera_status(camera_id: int) -> CameraStatus | None:
+    """Get the latest known status of a camera."""
+    return _get("camera", _camera_status, camera_id)
+
+
+def publish_capture_flag(controller_id: int, save_picture: int) -> None:
+    """Push a capture flag change to the running capture streams."""
+    _publish("controller", _capture_flags, controller_id, save_picture)
+
+
+def get_capture_flag(controller_id: int) -> int | None:
+    """Get the latest known capture flag of a controller."""
+    return _get("controller", _capture_flags, controller_id)
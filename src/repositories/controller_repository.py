@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 
 from src.entities.models import Controller
+from src.repositories.control_channel import publish_capture_flag
 
 
 class ControllerNotFound(Exception):
@@ -24,6 +25,7 @@ def set_capture_flag(session: Session, _id: int) -> Controller:
 
     session.commit()
     session.refresh(controller)
+    publish_capture_flag(_id, controller.save_picture)
 
     return controller
 
@@ -35,5 +37,6 @@ def reset_capture_flag(session: Session, _id: int) -> Controller:
 
     session.commit()
     session.refresh(controller)
+    publish_capture_flag(_id, controller.save_picture)
 
     return controller
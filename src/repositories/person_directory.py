@@ -0,0 +1,56 @@
+"""Process-wide person name index used by the recognition loops."""
+
+import threading
+import time
+
+from sqlalchemy.orm import Session
+
+from src.entities.models import Person
+from src.infra.config import PERSON_DIRECTORY_TTL
+
+_names: dict[int, str] = {}
+_loaded_at: float | None = None
+_lock = threading.Lock()
+
+
+def _load_names() -> dict[int, str]:
+    """Load the id -> name mapping of every person from the database."""
+    from src.infra.database import SessionLocal
+
+    db: Session = SessionLocal()
+    try:
+        rows = db.query(Person.person_id, Person.name).all()
+        return {person_id: name for person_id, name in rows}
+    finally:
+        db.close()
+
+
+def _get_names() -> dict[int, str]:
+    """Get the cached names, reloading them if invalidated or expired."""
+    global _names, _loaded_at
+
+    with _lock:
+        now: float = time.monotonic()
+        if _loaded_at is not None and now - _loaded_at < PERSON_DIRECTORY_TTL:
+            return _names
+
+        try:
+            _names = _load_names()
+        except Exception as e:
+            # Keep serving the previous names; retry after the TTL
+            print(f"Error loading person directory: {e}")
+        _loaded_at = now
+        return _names
+
+
+def get_person_name(person_id: int) -> str | None:
+    """Get the name of a person by ID, or None if not enrolled."""
+    return _get_names().get(person_id)
+
+
+def invalidate_person_directory() -> None:
+    """Force the next lookup to reload the names from the database."""
+    global _loaded_at
+
+    with _lock:
+        _loaded_at = None
@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 
 from src.entities.models import Person
 from src.entities.schemas import CreateAndUpdatePerson
+from src.repositories.person_directory import invalidate_person_directory
 
 
 class PersonNotFound(Exception):
@@ -28,6 +29,7 @@ def create_person(session: Session, person_info: CreateAndUpdatePerson) -> Perso
     new_person: Person = Person(**person_info.dict())
     session.add(new_person)
     session.commit()
+    invalidate_person_directory()
     session.refresh(new_person)
     return new_person
 
@@ -41,6 +43,7 @@ def update_person(
     person.person_id = info_update.person_id
     person.name = info_update.name
     session.commit()
+    invalidate_person_directory()
     session.refresh(person)
 
     return person
@@ -51,3 +54,4 @@ def remove_person(session: Session, _id: int) -> None:
     person_info: Person = get_person_by_id(session, _id)
     session.delete(person_info)
     session.commit()
+    invalidate_person_directory()
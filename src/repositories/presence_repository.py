@@ -0,0 +1,267 @@
+"""Presence queries over the sightings and their hourly rollups."""
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import and_, bindparam, func, select
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.orm import Session
+
+from src.entities.models import CameraHour, PresenceHour, Sighting
+from src.infra.config import SIGHTING_WINDOW
+
+
+def _hour(moment: datetime) -> datetime:
+    """Truncate a datetime to the start of its hour."""
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def _upsert_adding(
+    session: Session, table: Any, rows: list[dict[str, Any]], columns: list[str]
+) -> None:
+    """Insert rows, adding the given columns to the rows that already exist."""
+    if session.get_bind().dialect.name == "sqlite":
+        statement = sqlite.insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=[column.name for column in table.primary_key],
+            set_={name: table.c[name] + statement.excluded[name] for name in columns},
+        )
+    else:
+        statement = mysql.insert(table)
+        statement = statement.on_duplicate_key_update(
+            {name: table.c[name] + statement.inserted[name] for name in columns}
+        )
+    session.execute(statement, rows)
+
+
+def update_presence_rollups(session: Session, rows: list[dict[str, Any]]) -> None:
+    """Add new sighting rows to the hourly rollups, in the caller's transaction.
+
+    Each write only touches the camera-hours of its rows: the per-person
+    counts are added with upserts and the distinct people of those
+    camera-hours are recounted from the per-person rollup.
+    """
+    presence: dict[tuple[int, datetime, int], list[int]] = defaultdict(lambda: [0, 0])
+    for row in rows:
+        counts = presence[(row["camera_id"], _hour(row["timestamp"]), row["person_id"])]
+        counts[0] += 1
+        counts[1] += row["frames"]
+    if not presence:
+        return
+
+    _upsert_adding(
+        session,
+        PresenceHour.__table__,
+        [
+            {
+                "camera_id": camera_id,
+                "hour": hour,
+                "person_id": person_id,
+                "sightings": sightings,
+                "frames": frames,
+            }
+            for (camera_id, hour, person_id), (sightings, frames) in presence.items()
+        ],
+        ["sightings", "frames"],
+    )
+
+    camera_hours: dict[tuple[int, datetime], list[int]] = defaultdict(lambda: [0, 0])
+    for (camera_id, hour, _), (sightings, frames) in presence.items():
+        counts = camera_hours[(camera_id, hour)]
+        counts[0] += sightings
+        counts[1] += frames
+    _upsert_adding(
+        session,
+        CameraHour.__table__,
+        [
+            {
+                "camera_id": camera_id,
+                "hour": hour,
+                "people": 0,
+                "sightings": sightings,
+                "frames": frames,
+            }
+            for (camera_id, hour), (sightings, frames) in camera_hours.items()
+        ],
+        ["sightings", "frames"],
+    )
+
+    # Distinct people are recounted, so concurrent writers cannot skew them
+    presence_table = PresenceHour.__table__
+    camera_table = CameraHour.__table__
+    people = (
+        select(func.count())
+        .where(
+            presence_table.c.camera_id == bindparam("key_camera_id"),
+            presence_table.c.hour == bindparam("key_hour"),
+        )
+        .scalar_subquery()
+    )
+    session.execute(
+        camera_table.update()
+        .where(
+            camera_table.c.camera_id == bindparam("key_camera_id"),
+            camera_table.c.hour == bindparam("key_hour"),
+        )
+        .values(people=people),
+        [
+            {"key_camera_id": camera_id, "key_hour": hour}
+            for camera_id, hour in camera_hours
+        ],
+    )
+
+
+def rebuild_presence_rollups(session: Session) -> None:
+    """Recompute both rollups from every stored sighting."""
+    session.query(PresenceHour).delete()
+    session.query(CameraHour).delete()
+    session.flush()
+
+    hour = func.date_format(Sighting.timestamp, "%Y-%m-%d %H:00:00")
+    if session.get_bind().dialect.name == "sqlite":
+        hour = func.strftime("%Y-%m-%d %H:00:00.000000", Sighting.timestamp)
+    grouped = select(
+        Sighting.camera_id,
+        hour.label("hour"),
+        Sighting.person_id,
+        func.count().label("sightings"),
+        func.sum(Sighting.frames).label("frames"),
+    ).group_by(Sighting.camera_id, hour, Sighting.person_id)
+    session.execute(
+        PresenceHour.__table__.insert().from_select(
+            ["camera_id", "hour", "person_id", "sightings", "frames"], grouped
+        )
+    )
+    session.execute(
+        CameraHour.__table__.insert().from_select(
+            ["camera_id", "hour", "people", "sightings", "frames"],
+            select(
+                PresenceHour.camera_id,
+                PresenceHour.hour,
+                func.count(),
+                func.sum(PresenceHour.sightings),
+                func.sum(PresenceHour.frames),
+            ).group_by(PresenceHour.camera_id, PresenceHour.hour),
+        )
+    )
+    session.commit()
+
+
+def _sighting_to_dict(sighting: Sighting) -> dict[str, Any]:
+    """Get the API representation of a sighting."""
+    return {
+        "person_id": sighting.person_id,
+        "camera_id": sighting.camera_id,
+        "timestamp": sighting.timestamp,
+        "last_seen": sighting.last_seen,
+        "frames": sighting.frames,
+        "confidence": sighting.confidence,
+        "box": [
+            sighting.box_x,
+            sighting.box_y,
+            sighting.box_width,
+            sighting.box_height,
+        ],
+    }
+
+
+def get_person_presence(
+    session: Session,
+    person_id: int,
+    start: datetime,
+    end: datetime,
+    limit: int,
+    window: float = SIGHTING_WINDOW,
+) -> list[dict[str, Any]]:
+    """Get where a person was seen between start and end, oldest first.
+
+    Sightings still going at start count too; they began less than window
+    seconds (the writer's coalescing window) before it, which keeps the
+    index range bounded.
+    """
+    sightings = (
+        session.query(Sighting)
+        .filter(
+            and_(
+                Sighting.person_id == person_id,
+                Sighting.timestamp >= start - timedelta(seconds=window),
+                Sighting.last_seen >= start,
+                Sighting.timestamp < end,
+            )
+        )
+        .order_by(Sighting.timestamp)
+        .limit(limit)
+        .all()
+    )
+    return [_sighting_to_dict(sighting) for sighting in sightings]
+
+
+def get_camera_presence(
+    session: Session,
+    camera_id: int,
+    start: datetime,
+    end: datetime,
+    limit: int,
+    window: float = SIGHTING_WINDOW,
+) -> list[dict[str, Any]]:
+    """Get who was seen by a camera between start and end, oldest first.
+
+    Sightings still going at start count too; they began less than window
+    seconds (the writer's coalescing window) before it, which keeps the
+    index range bounded.
+    """
+    sightings = (
+        session.query(Sighting)
+        .filter(
+            and_(
+                Sighting.camera_id == camera_id,
+                Sighting.timestamp >= start - timedelta(seconds=window),
+                Sighting.last_seen >= start,
+                Sighting.timestamp < end,
+            )
+        )
+        .order_by(Sighting.timestamp)
+        .limit(limit)
+        .all()
+    )
+    return [_sighting_to_dict(sighting) for sighting in sightings]
+
+
+def get_camera_occupancy(
+    session: Session, camera_id: int, start: datetime, end: datetime
+) -> list[dict[str, Any]]:
+    """Get the distinct people and sightings per hour of a camera."""
+    hours = (
+        session.query(CameraHour)
+        .filter(
+            and_(
+                CameraHour.camera_id == camera_id,
+                CameraHour.hour >= _hour(start),
+                CameraHour.hour < end,
+            )
+        )
+        .order_by(CameraHour.hour)
+        .all()
+    )
+    return [
+        {
+            "hour": hour.hour,
+            "people": hour.people,
+            "sightings": hour.sightings,
+            "frames": hour.frames,
+        }
+        for hour in hours
+    ]
+
+
+if __name__ == "__main__":
+    # python -m src.repositories.presence_repository
+    from src.infra.database import SessionLocal
+
+    db: Session = SessionLocal()
+    try:
+        rebuild_presence_rollups(db)
+    finally:
+        db.close()
+    print("Ocupação por hora recalculada a partir das aparições.")
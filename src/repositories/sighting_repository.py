@@ -0,0 +1,250 @@
+"""Write-behind store of the people recognized by the live recognition loops."""
+
+import threading
+import time
+from collections.abc import Callable
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from src.entities.models import Sighting
+from src.infra.config import (
+    SIGHTING_BATCH_SIZE,
+    SIGHTING_FLUSH_INTERVAL,
+    SIGHTING_MAX_PENDING,
+    SIGHTING_WINDOW,
+    SIGHTINGS,
+)
+from src.repositories.presence_repository import update_presence_rollups
+
+Box = tuple[int, int, int, int]
+
+
+def _session() -> Session:
+    """Open a session on the application database."""
+    from src.infra.database import SessionLocal
+
+    return SessionLocal()
+
+
+class PendingSighting:
+    """Sightings of a person on a camera not written to the database yet."""
+
+    def __init__(
+        self, person_id: int, camera_id: int, at: float, confidence: float, box: Box
+    ) -> None:
+        self.person_id: int = person_id
+        self.camera_id: int = camera_id
+        self.first_seen: float = at
+        self.last_seen: float = at
+        self.frames: int = 1
+        self.confidence: float = confidence
+        self.box: Box = box
+
+    def merge(self, at: float, confidence: float, box: Box) -> None:
+        """Add another sighting, keeping the box of the closest match."""
+        self.last_seen = max(self.last_seen, at)
+        self.frames += 1
+        # LBPH confidence is a distance: lower is a better match
+        if confidence < self.confidence:
+            self.confidence = confidence
+            self.box = box
+
+    def to_row(self) -> dict[str, Any]:
+        """Get the values of the sighting table row."""
+        x, y, w, h = self.box
+        return {
+            "person_id": self.person_id,
+            "camera_id": self.camera_id,
+            "timestamp": datetime.fromtimestamp(self.first_seen),
+            "last_seen": datetime.fromtimestamp(self.last_seen),
+            "frames": self.frames,
+            "confidence": self.confidence,
+            "box_x": x,
+            "box_y": y,
+            "box_width": w,
+            "box_height": h,
+        }
+
+
+class SightingWriter:
+    """Buffers sightings and writes them in bulk INSERTs from a background thread.
+
+    record() only touches an in-memory buffer, so the recognition loops never
+    wait on the database. Sightings of the same person and camera within
+    window seconds of the first one are coalesced into a single row, which is
+    written once its window closed. Rows are flushed every flush_interval
+    seconds, or right away when batch_size of them are ready.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = _session,
+        batch_size: int = SIGHTING_BATCH_SIZE,
+        flush_interval: float = SIGHTING_FLUSH_INTERVAL,
+        window: float = SIGHTING_WINDOW,
+        max_pending: int = SIGHTING_MAX_PENDING,
+        enabled: bool = SIGHTINGS,
+    ) -> None:
+        self.session_factory: Callable[[], Session] = session_factory
+        self.batch_size: int = batch_size
+        self.flush_interval: float = flush_interval
+        self.window: float = window
+        self.max_pending: int = max_pending
+        self.enabled: bool = enabled
+        self.recorded: int = 0
+        self.coalesced: int = 0
+        self.written: int = 0
+        self.flushes: int = 0
+        self.failures: int = 0
+        self.dropped: int = 0
+        self.last_error: str | None = None
+        # Open sightings by (person_id, camera_id), in order of first sighting
+        self._open: dict[tuple[int, int], PendingSighting] = {}
+        # Closed sightings waiting for the next flush
+        self._ready: list[PendingSighting] = []
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def record(
+        self,
+        person_id: int,
+        camera_id: int,
+        confidence: float,
+        box: Box,
+        at: float | None = None,
+    ) -> None:
+        """Buffer a recognized face; at is the frame time (defaults to now)."""
+        if not self.enabled:
+            return
+        at = time.time() if at is None else at
+        box = tuple(int(value) for value in box)
+        key = (person_id, camera_id)
+        with self._condition:
+            self.recorded += 1
+            pending = self._open.get(key)
+            if pending is not None and at - pending.first_seen < self.window:
+                pending.merge(at, float(confidence), box)
+                self.coalesced += 1
+                return
+            if pending is not None:
+                self._ready.append(pending)
+            self._open[key] = PendingSighting(
+                person_id, camera_id, at, float(confidence), box
+            )
+            self._drop_overflow()
+            # Wake the writer once, when the batch fills up
+            if len(self._ready) == self.batch_size:
+                self._condition.notify()
+        self._ensure_thread()
+
+    def flush(self, everything: bool = False) -> int:
+        """Write the closed sightings (or all of them), returning the rows written."""
+        with self._flush_lock:
+            with self._condition:
+                self._close_expired(time.time())
+                if everything:
+                    self._ready.extend(self._open.values())
+                    self._open.clear()
+                batch, self._ready = self._ready, []
+
+            written: int = 0
+            for start in range(0, len(batch), self.batch_size):
+                chunk = batch[start : start + self.batch_size]
+                try:
+                    self._insert([pending.to_row() for pending in chunk])
+                except Exception as e:
+                    with self._condition:
+                        self.failures += 1
+                        self.last_error = str(e)
+                        # Keep the unwritten rows for the next flush
+                        self._ready[:0] = batch[start:]
+                        self._drop_overflow()
+                    print(f"Error writing {len(batch) - start} sightings: {e}")
+                    break
+                written += len(chunk)
+                with self._condition:
+                    self.written += len(chunk)
+                    self.flushes += 1
+            return written
+
+    def _insert(self, rows: list[dict[str, Any]]) -> None:
+        """Insert rows and update the hourly rollups in one transaction.
+
+        The rows go in one executemany, sent by the driver as multi-row INSERTs.
+        """
+        session = self.session_factory()
+        try:
+            session.execute(Sighting.__table__.insert(), rows)
+            update_presence_rollups(session, rows)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def stop(self) -> None:
+        """Write every buffered sighting, e.g. when the API shuts down."""
+        self.flush(everything=True)
+
+    def _close_expired(self, now: float) -> None:
+        """Move sightings whose window ended to the ready list (lock held)."""
+        for key, pending in list(self._open.items()):
+            if now - pending.first_seen >= self.window:
+                self._ready.append(self._open.pop(key))
+
+    def _drop_overflow(self) -> None:
+        """Drop the oldest ready rows beyond max_pending (lock held)."""
+        overflow: int = len(self._ready) + len(self._open) - self.max_pending
+        if overflow > 0:
+            dropped = self._ready[:overflow]
+            del self._ready[: len(dropped)]
+            self.dropped += len(dropped)
+
+    def _ensure_thread(self) -> None:
+        """Start the flushing thread on first use."""
+        if self._thread is not None:
+            return
+        with self._condition:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="sighting-writer", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        """Flush on the interval, or sooner when a batch is full."""
+        failed: bool = False
+        while True:
+            with self._condition:
+                # After a failure, wait before retrying even with a full batch
+                if failed or len(self._ready) < self.batch_size:
+                    self._condition.wait(self.flush_interval)
+                failures: int = self.failures
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Sighting writer error: {e}")
+            failed = self.failures > failures
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get the counters of recorded, coalesced and written sightings."""
+        with self._condition:
+            return {
+                "enabled": self.enabled,
+                "recorded": self.recorded,
+                "coalesced": self.coalesced,
+                "written": self.written,
+                "flushes": self.flushes,
+                "failures": self.failures,
+                "dropped": self.dropped,
+                "pending": len(self._ready) + len(self._open),
+                "last_error": self.last_error,
+            }
+
+
+# Process-wide writer shared by the recognition loops
+sighting_writer: SightingWriter = SightingWriter()
@@ -0,0 +1,239 @@
+"""Shared camera capture hub: one reader per camera, many subscribers."""
+
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from cv2 import VideoCapture
+from numpy.typing import NDArray
+
+from src.infra.config import CAPTURE_LATEST_FRAME_ONLY
+
+# Key used for the local webcam (camera_id=0 is the webcam convention)
+WEBCAM_CAMERA_ID: int = 0
+
+
+class CameraReader:
+    """Reads frames from a single VideoCapture in a background thread.
+
+    In latest-frame-only mode the thread calls grab() continuously, which keeps
+    the capture buffer drained, and decodes (retrieve) only when a subscriber
+    asked for a frame. Otherwise every frame is decoded with read(). A raw
+    reader's capture returns compressed packets, which cost nothing to read.
+    """
+
+    def __init__(
+        self,
+        key: int,
+        capture: VideoCapture,
+        latest_frame_only: bool = CAPTURE_LATEST_FRAME_ONLY,
+        raw: bool = False,
+    ) -> None:
+        self.key: int = key
+        self.capture: VideoCapture = capture
+        self.latest_frame_only: bool = latest_frame_only and not raw
+        self.raw: bool = raw
+        self.subscribers: int = 0
+        self.sequence: int = 0
+        self.frames_decoded: int = 0
+        self.frame: NDArray[Any] | None = None
+        self.frame_sequence: int = 0
+        self._frame_wanted: bool = True
+        self._lock = threading.Lock()
+        self._running: bool = True
+        self._thread = threading.Thread(
+            target=self._run, name=f"camera-reader-{key}", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        """Keep the latest frame available for every subscriber."""
+        try:
+            while self._running:
+                if self.latest_frame_only:
+                    self._grab_latest()
+                else:
+                    self._read_next()
+        finally:
+            self.capture.release()
+
+    def _read_next(self) -> None:
+        """Decode every frame delivered by the capture."""
+        connected, frame = self.capture.read()
+        if not connected:
+            time.sleep(0.01)
+            return
+        with self._lock:
+            self.sequence += 1
+            if not self.raw:
+                self.frames_decoded += 1
+            self.frame = frame
+            self.frame_sequence = self.sequence
+
+    def _grab_latest(self) -> None:
+        """Grab the next frame and decode it only if someone is waiting."""
+        if not self.capture.grab():
+            time.sleep(0.01)
+            return
+        with self._lock:
+            self.sequence += 1
+            if not self._frame_wanted:
+                return
+            self._frame_wanted = False
+
+        retrieved, frame = self.capture.retrieve()
+        with self._lock:
+            if retrieved:
+                self.frames_decoded += 1
+                self.frame = frame
+                self.frame_sequence = self.sequence
+            else:
+                self._frame_wanted = True
+
+    def latest(self, seen_sequence: int = 0) -> tuple[int, NDArray[Any] | None]:
+        """Get the latest decoded frame and its sequence number.
+
+        If the latest frame was already seen, a fresh decode is requested.
+        """
+        with self._lock:
+            if self.frame_sequence <= seen_sequence:
+                self._frame_wanted = True
+            return self.frame_sequence, self.frame
+
+    def stop(self) -> None:
+        """Stop the reader thread; the capture is released by the thread."""
+        self._running = False
+
+
+class CaptureSubscription:
+    """A subscriber handle to a shared camera reader."""
+
+    def __init__(self, reader: CameraReader) -> None:
+        self.reader: CameraReader = reader
+        self.sequence: int = 0
+        self.frames_received: int = 0
+        self.frames_dropped: int = 0
+        self._released: bool = False
+
+    def read(self, copy: bool = True) -> tuple[bool, NDArray[Any] | None]:
+        """Get the latest frame, or (False, None) if nothing new.
+
+        With copy=False the frame is shared with other subscribers and must
+        not be modified.
+        """
+        sequence, frame = self.reader.latest(self.sequence)
+        if frame is None or sequence <= self.sequence:
+            return False, None
+
+        self.mark_seen(sequence)
+        return True, frame.copy() if copy else frame
+
+    def mark_seen(self, sequence: int) -> None:
+        """Record that the frame with this sequence was delivered."""
+        if sequence <= self.sequence:
+            return
+        # Frames grabbed since the previous read were never processed here
+        if self.sequence > 0:
+            self.frames_dropped += sequence - self.sequence - 1
+        self.frames_received += 1
+        self.sequence = sequence
+
+    def release(self) -> None:
+        """Unsubscribe from the camera reader."""
+        if not self._released:
+            self._released = True
+            unsubscribe(self)
+
+
+# Active readers keyed by camera id and raw mode
+_readers: dict[tuple[int, bool], CameraReader] = {}
+_subscriptions: dict[tuple[int, bool], list[CaptureSubscription]] = {}
+_hub_lock = threading.Lock()
+_open_locks: dict[tuple[int, bool], threading.Lock] = {}
+
+
+def subscribe(
+    key: int, open_capture: Callable[[], VideoCapture | None], raw: bool = False
+) -> CaptureSubscription | None:
+    """Subscribe to a camera, opening its capture only if no reader exists.
+
+    Raw subscriptions get the compressed packets of a capture opened in raw
+    mode, from a reader separate from the one of the decoded frames.
+    """
+    with _hub_lock:
+        open_lock = _open_locks.setdefault((key, raw), threading.Lock())
+
+    # Only one caller opens a given camera; the others wait and share it
+    with open_lock:
+        with _hub_lock:
+            reader = _readers.get((key, raw))
+            if reader is not None:
+                return _add_subscription(reader)
+
+        capture = open_capture()
+        if capture is None or not capture.isOpened():
+            if capture is not None:
+                capture.release()
+            return None
+
+        with _hub_lock:
+            reader = CameraReader(key, capture, raw=raw)
+            _readers[(key, raw)] = reader
+            return _add_subscription(reader)
+
+
+def _add_subscription(reader: CameraReader) -> CaptureSubscription:
+    """Register a new subscriber (caller must hold the hub lock)."""
+    subscription = CaptureSubscription(reader)
+    reader.subscribers += 1
+    _subscriptions.setdefault((reader.key, reader.raw), []).append(subscription)
+    return subscription
+
+
+def unsubscribe(subscription: CaptureSubscription) -> None:
+    """Drop a subscriber; the reader stops when the last one leaves."""
+    from src.services.frame_cache import frame_cache
+
+    reader = subscription.reader
+    key = (reader.key, reader.raw)
+    with _hub_lock:
+        reader.subscribers -= 1
+        subscriptions = _subscriptions.get(key, [])
+        if subscription in subscriptions:
+            subscriptions.remove(subscription)
+        if reader.subscribers <= 0:
+            reader.stop()
+            frame_cache.discard(reader)
+            if _readers.get(key) is reader:
+                del _readers[key]
+                _subscriptions.pop(key, None)
+
+
+def is_capturing(key: int, raw: bool = False) -> bool:
+    """Check if the hub currently has a reader for the camera."""
+    with _hub_lock:
+        return (key, raw) in _readers
+
+
+def get_hub_stats() -> list[dict[str, Any]]:
+    """Get subscriber and frame counters of every active reader."""
+    with _hub_lock:
+        return [
+            {
+                "camera_id": reader.key,
+                "latest_frame_only": reader.latest_frame_only,
+                "raw": reader.raw,
+                "subscribers": reader.subscribers,
+                "frames_grabbed": reader.sequence,
+                "frames_decoded": reader.frames_decoded,
+                "subscriptions": [
+                    {
+                        "frames_received": subscription.frames_received,
+                        "frames_dropped": subscription.frames_dropped,
+                    }
+                    for subscription in _subscriptions.get((reader.key, reader.raw), [])
+                ],
+            }
+            for reader in _readers.values()
+        ]
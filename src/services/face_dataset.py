@@ -0,0 +1,182 @@
+"""Packed store of the captured face crops used for training."""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import cv2
+import numpy as np
+from numpy.typing import NDArray
+
+from src.infra.config import FACE_DATASET_INDEX_PATH, FACE_DATASET_PATH, PICTURES_DIR
+from src.infra.file_lock import FileLock
+
+# Capture crops are saved gray at this size (width, height)
+FACE_SIZE: tuple[int, int] = (220, 220)
+# One row of the label table: whose face it is and its sample number
+RECORD: np.dtype = np.dtype([("person_id", "<i4"), ("sample", "<i4")])
+# Rows decoded or copied at once when importing or compacting
+CHUNK_ROWS: int = 1024
+
+
+class FaceDataset:
+    """Append-only packed face crops with their label table.
+
+    Faces are kept as one raw uint8 file of N x 220 x 220 crops that is
+    memory-mapped for training, so loading decodes nothing; a second file
+    holds the (person_id, sample) of every row. A face is written before its
+    row in the table, so a torn append is ignored and truncated by the next.
+    Appends and rewrites hold a lock file shared with the other workers.
+    """
+
+    def __init__(self, faces_path: Any, index_path: Any) -> None:
+        self.faces_path: Path = Path(faces_path)
+        self.index_path: Path = Path(index_path)
+        self.face_bytes: int = FACE_SIZE[0] * FACE_SIZE[1]
+        self._lock: FileLock = FileLock(f"{self.faces_path}.lock")
+
+    def __len__(self) -> int:
+        return self._rows()
+
+    def _rows(self) -> int:
+        """Rows whose face and label were both written."""
+        try:
+            faces: int = os.path.getsize(self.faces_path) // self.face_bytes
+            records: int = os.path.getsize(self.index_path) // RECORD.itemsize
+        except OSError:
+            return 0
+        return min(faces, records)
+
+    def append(self, person_id: int, sample: int, face: NDArray[np.uint8]) -> None:
+        """Add one gray 220x220 face crop."""
+        self.extend([person_id], [sample], [face])
+
+    def extend(
+        self,
+        person_ids: list[int],
+        samples: list[int],
+        faces: list[NDArray[np.uint8]],
+    ) -> None:
+        """Add several gray 220x220 face crops."""
+        data = np.ascontiguousarray(
+            np.asarray(faces, dtype=np.uint8).reshape(-1, FACE_SIZE[1], FACE_SIZE[0])
+        )
+        records = np.empty(len(data), dtype=RECORD)
+        records["person_id"] = person_ids
+        records["sample"] = samples
+        with self._lock:
+            rows: int = self._rows()
+            with open(self.faces_path, "ab") as file:
+                file.truncate(rows * self.face_bytes)
+                file.write(data.tobytes())
+            with open(self.index_path, "ab") as file:
+                file.truncate(rows * RECORD.itemsize)
+                file.write(records.tobytes())
+
+    def load(self) -> tuple[NDArray[np.uint8], NDArray[Any]]:
+        """Map the faces (N x 220 x 220) and read their labels."""
+        rows: int = self._rows()
+        if not rows:
+            return (
+                np.empty((0, FACE_SIZE[1], FACE_SIZE[0]), dtype=np.uint8),
+                np.empty(0, dtype=RECORD),
+            )
+        faces = np.memmap(
+            self.faces_path,
+            dtype=np.uint8,
+            mode="r",
+            shape=(rows, FACE_SIZE[1], FACE_SIZE[0]),
+        )
+        return faces, np.fromfile(self.index_path, dtype=RECORD, count=rows)
+
+    def remove_person(self, person_id: int) -> int:
+        """Drop every face of a person, returning how many were removed."""
+        with self._lock:
+            faces, records = self.load()
+            keep = np.flatnonzero(records["person_id"] != person_id)
+            if len(keep) == len(records):
+                return 0
+
+            faces_temporary = f"{self.faces_path}.tmp"
+            index_temporary = f"{self.index_path}.tmp"
+            with open(faces_temporary, "wb") as file:
+                for start in range(0, len(keep), CHUNK_ROWS):
+                    file.write(faces[keep[start : start + CHUNK_ROWS]].tobytes())
+            records[keep].tofile(index_temporary)
+            del faces
+            os.replace(faces_temporary, self.faces_path)
+            os.replace(index_temporary, self.index_path)
+            return len(records) - len(keep)
+
+    def clear(self) -> None:
+        """Remove every face."""
+        with self._lock:
+            for path in (self.faces_path, self.index_path):
+                path.unlink(missing_ok=True)
+
+    def import_pictures(self, directory: Any = PICTURES_DIR, workers: int = 1) -> int:
+        """Pack the person.{id}.{sample}.jpg pictures not in the dataset yet.
+
+        Pictures are decoded in chunks over workers threads.
+        """
+        _, records = self.load()
+        packed = set(zip(records["person_id"].tolist(), records["sample"].tolist()))
+        pending: list[tuple[tuple[int, int], Path]] = []
+        for imagePath in sorted(Path(directory).glob("person.*.*.jpg")):
+            try:
+                _, person_id, sample = imagePath.stem.split(".")
+                key = (int(person_id), int(sample))
+            except ValueError as e:
+                print(f"Erro ao processar {imagePath}: {e}")
+                continue
+            if key not in packed:
+                pending.append((key, imagePath))
+
+        imported: int = 0
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            for start in range(0, len(pending), CHUNK_ROWS):
+                chunk = pending[start : start + CHUNK_ROWS]
+                decoded = executor.map(_read_picture, [path for _, path in chunk])
+                rows = [
+                    (key, face)
+                    for (key, _), face in zip(chunk, decoded)
+                    if face is not None
+                ]
+                if rows:
+                    self.extend(
+                        [key[0] for key, _ in rows],
+                        [key[1] for key, _ in rows],
+                        [face for _, face in rows],
+                    )
+                    imported += len(rows)
+        return imported
+
+
+def _read_picture(imagePath: Path) -> NDArray[np.uint8] | None:
+    """Decode a picture as a gray 220x220 face, or None if invalid."""
+    try:
+        face_image = cv2.imread(str(imagePath))
+        if face_image is None:
+            return None
+        gray_face = cv2.cvtColor(face_image, cv2.COLOR_BGR2GRAY)
+        if gray_face.shape[::-1] != FACE_SIZE:
+            gray_face = cv2.resize(gray_face, FACE_SIZE)
+        return gray_face
+    except Exception as e:
+        print(f"Erro ao processar {imagePath}: {e}")
+        return None
+
+
+def sample_names(records: NDArray[Any]) -> list[str]:
+    """Names of dataset rows, like the person.{id}.{sample} picture names."""
+    return [
+        f"person.{person_id}.{sample}"
+        for person_id, sample in zip(
+            records["person_id"].tolist(), records["sample"].tolist()
+        )
+    ]
+
+
+# Shared by the capture flows and training
+face_dataset: FaceDataset = FaceDataset(FACE_DATASET_PATH, FACE_DATASET_INDEX_PATH)
@@ -0,0 +1,75 @@
+"""Face detection on downscaled frames for high-resolution streams."""
+
+import cv2
+from cv2 import CascadeClassifier
+from numpy.typing import NDArray
+
+Box = tuple[int, int, int, int]
+
+
+def detect_faces(
+    detector: CascadeClassifier,
+    gray_image: NDArray,
+    detection_width: int | None = None,
+    scale_factor: float = 1.1,
+    min_neighbors: int = 3,
+    min_size: tuple[int, int] = (30, 30),
+    region: Box | None = None,
+) -> list[Box]:
+    """Detect faces on a copy resized to detection_width.
+
+    Boxes are mapped back to the coordinates of gray_image, so face crops can
+    be taken from the full-resolution image. min_size is in full-resolution
+    pixels. When region is given, only that part of the image is searched.
+    """
+    image_height, image_width = gray_image.shape[:2]
+    region_x, region_y, region_width, region_height = region or (
+        0,
+        0,
+        image_width,
+        image_height,
+    )
+    if region_width < min_size[0] or region_height < min_size[1]:
+        return []
+
+    scale: float = 1.0
+    small_image = gray_image
+    if region is not None:
+        small_image = gray_image[
+            region_y : region_y + region_height, region_x : region_x + region_width
+        ]
+    if detection_width and image_width > detection_width:
+        scale = detection_width / image_width
+        small_image = cv2.resize(
+            small_image,
+            (
+                max(1, round(region_width * scale)),
+                max(1, round(region_height * scale)),
+            ),
+            interpolation=cv2.INTER_AREA,
+        )
+
+    scaled_min_size: tuple[int, int] = (
+        max(1, round(min_size[0] * scale)),
+        max(1, round(min_size[1] * scale)),
+    )
+    detected = detector.detectMultiScale(
+        small_image,
+        scaleFactor=scale_factor,
+        minNeighbors=min_neighbors,
+        minSize=scaled_min_size,
+    )
+
+    boxes: list[Box] = []
+    for x, y, w, h in detected:
+        x0: int = min(image_width - 1, region_x + round(x / scale))
+        y0: int = min(image_height - 1, region_y + round(y / scale))
+        boxes.append(
+            (
+                x0,
+                y0,
+                max(1, min(image_width - x0, round(w / scale))),
+                max(1, min(image_height - y0, round(h / scale))),
+            )
+        )
+    return boxes
@@ -0,0 +1,242 @@
+"""Approximate nearest-neighbour index over LBPH face histograms."""
+
+import os
+import tempfile
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+from src.infra.config import (
+    CLASSIFIER_PATH,
+    FACE_INDEX_DIMENSIONS,
+    FACE_INDEX_LISTS,
+    FACE_INDEX_MIN_SAMPLES,
+    FACE_INDEX_NPROBE,
+    FACE_INDEX_PATH,
+    FACE_INDEX_RERANK,
+)
+
+# Samples used to fit the PCA projection and the coarse quantizer
+PCA_TRAINING_SAMPLES: int = 1024
+KMEANS_POINTS_PER_LIST: int = 64
+KMEANS_ITERATIONS: int = 10
+# Samples projected at once while building
+PROJECTION_CHUNK: int = 1024
+
+
+class FaceIndex:
+    """Inverted-file index over PCA-reduced square-root LBPH histograms.
+
+    The square root turns the chi-square distance between histograms into
+    approximately a Euclidean one (the Hellinger distance bounds it within a
+    factor of 2), so histograms are projected with PCA and grouped by a
+    k-means coarse quantizer. A search probes the nprobe lists nearest to the
+    query and returns the rerank candidates closest in the reduced space, to
+    be re-ranked with the exact distance.
+    """
+
+    def __init__(
+        self,
+        mean: NDArray[np.float32],
+        components: NDArray[np.float32],
+        centroids: NDArray[np.float32],
+        vectors: NDArray[np.float32],
+        members: NDArray[np.int64],
+        offsets: NDArray[np.int64],
+        nprobe: int = FACE_INDEX_NPROBE,
+        rerank: int = FACE_INDEX_RERANK,
+    ) -> None:
+        self.mean: NDArray[np.float32] = mean
+        self.components: NDArray[np.float32] = components
+        self.centroids: NDArray[np.float32] = centroids
+        self.vectors: NDArray[np.float32] = vectors
+        self.members: NDArray[np.int64] = members
+        self.offsets: NDArray[np.int64] = offsets
+        self.nprobe: int = nprobe
+        self.rerank: int = rerank
+        self._projected_mean: NDArray[np.float32] = components @ mean
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    @classmethod
+    def build(
+        cls,
+        sample_blocks: list[NDArray[np.float32]],
+        dimensions: int = FACE_INDEX_DIMENSIONS,
+        lists: int = FACE_INDEX_LISTS,
+        seed: int = 0,
+    ) -> "FaceIndex":
+        """Build the index from bin-major (bins x samples) histogram blocks."""
+        rng = np.random.default_rng(seed)
+        samples: int = sum(block.shape[1] for block in sample_blocks)
+        all_rows = np.arange(samples)
+
+        # PCA from the Gram matrix of a sample, cheap when bins >> samples
+        training = np.sqrt(
+            _gather(sample_blocks, _choose(rng, all_rows, PCA_TRAINING_SAMPLES))
+        )
+        mean = training.mean(axis=0)
+        centered = training - mean
+        eigenvalues, eigenvectors = np.linalg.eigh(centered @ centered.T)
+        order = np.argsort(eigenvalues)[::-1][: min(dimensions, len(training))]
+        order = order[eigenvalues[order] > 1e-9]
+        components = (eigenvectors[:, order].T @ centered) / np.sqrt(
+            eigenvalues[order]
+        )[:, np.newaxis]
+        components = components.astype(np.float32)
+        mean = mean.astype(np.float32)
+
+        projected_mean = components @ mean
+        vectors = np.concatenate(
+            [
+                (components @ np.sqrt(block[:, start : start + PROJECTION_CHUNK])).T
+                - projected_mean
+                for block in sample_blocks
+                for start in range(0, block.shape[1], PROJECTION_CHUNK)
+            ]
+        ).astype(np.float32)
+
+        lists = lists or int(4 * np.sqrt(samples))
+        lists = max(1, min(lists, samples))
+        points = vectors[_choose(rng, all_rows, lists * KMEANS_POINTS_PER_LIST)]
+        centroids = points[rng.choice(len(points), lists, replace=False)].copy()
+        for _ in range(KMEANS_ITERATIONS):
+            assignment = _nearest(points, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, points)
+            counts = np.bincount(assignment, minlength=lists)
+            filled = counts > 0
+            centroids[filled] = sums[filled] / counts[filled, np.newaxis]
+
+        assignment = _nearest(vectors, centroids)
+        members = np.argsort(assignment, kind="stable")
+        offsets = np.concatenate(
+            [[0], np.cumsum(np.bincount(assignment, minlength=lists))]
+        )
+        return cls(mean, components, centroids, vectors, members, offsets)
+
+    def project(self, histogram: NDArray[np.float32]) -> NDArray[np.float32]:
+        """Reduce a histogram to the index space."""
+        return self.components @ np.sqrt(histogram) - self._projected_mean
+
+    def search(self, histogram: NDArray[np.float32]) -> NDArray[np.int64]:
+        """Get the candidate samples for a query histogram, in sample order."""
+        vector = self.project(histogram)
+        distances = ((self.centroids - vector) ** 2).sum(axis=1)
+        nprobe: int = min(self.nprobe, len(self.centroids))
+        probed = np.argpartition(distances, nprobe - 1)[:nprobe]
+        candidates = np.concatenate(
+            [self.members[self.offsets[i] : self.offsets[i + 1]] for i in probed]
+        )
+        if len(candidates) > self.rerank:
+            reduced = ((self.vectors[candidates] - vector) ** 2).sum(axis=1)
+            candidates = candidates[
+                np.argpartition(reduced, self.rerank - 1)[: self.rerank]
+            ]
+        return np.sort(candidates)
+
+    def save(self, path: Any = FACE_INDEX_PATH) -> None:
+        """Write the index next to the classifier, tagged with its model."""
+        # Workers reloading the model may rebuild the index at the same time
+        descriptor, temporary = tempfile.mkstemp(
+            dir=Path(path).parent, prefix=f"{Path(path).name}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                np.savez(
+                    file,
+                    mean=self.mean,
+                    components=self.components,
+                    centroids=self.centroids,
+                    vectors=self.vectors,
+                    members=self.members,
+                    offsets=self.offsets,
+                    model=np.array(_model_fingerprint(), dtype=np.int64),
+                )
+            os.replace(temporary, path)
+        except BaseException:
+            Path(temporary).unlink(missing_ok=True)
+            raise
+
+    @classmethod
+    def load(cls, samples: int, path: Any = FACE_INDEX_PATH) -> "FaceIndex | None":
+        """Read the index, or None if missing or built for another model."""
+        try:
+            with np.load(path) as data:
+                if (
+                    len(data["vectors"]) != samples
+                    or tuple(data["model"]) != _model_fingerprint()
+                ):
+                    return None
+                return cls(
+                    data["mean"],
+                    data["components"],
+                    data["centroids"],
+                    data["vectors"],
+                    data["members"],
+                    data["offsets"],
+                )
+        except (OSError, KeyError, ValueError):
+            return None
+
+
+def _model_fingerprint() -> tuple[int, int]:
+    """Size and modification time of the classifier file."""
+    try:
+        stat = os.stat(CLASSIFIER_PATH)
+    except OSError:
+        return (0, 0)
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+def _choose(rng: np.random.Generator, rows: NDArray[Any], count: int) -> NDArray[Any]:
+    """Pick up to count rows at random, in order."""
+    if len(rows) <= count:
+        return rows
+    return np.sort(rng.choice(rows, count, replace=False))
+
+
+def _gather(
+    sample_blocks: list[NDArray[np.float32]], rows: NDArray[Any]
+) -> NDArray[np.float32]:
+    """Get sample histograms (samples x bins) from bin-major blocks."""
+    block_size: int = sample_blocks[0].shape[1]
+    return np.stack(
+        [sample_blocks[row // block_size][:, row % block_size] for row in rows]
+    )
+
+
+def _nearest(
+    points: NDArray[np.float32], centroids: NDArray[np.float32]
+) -> NDArray[np.int64]:
+    """Index of the nearest centroid of every point, in chunks."""
+    centroid_norms = (centroids**2).sum(axis=1)
+    result = np.empty(len(points), dtype=np.int64)
+    chunk: int = max(1, (1 << 22) // max(1, len(centroids)))
+    for start in range(0, len(points), chunk):
+        part = points[start : start + chunk]
+        result[start : start + chunk] = np.argmin(
+            centroid_norms - 2 * part @ centroids.T, axis=1
+        )
+    return result
+
+
+def build_face_index(matcher: Any) -> FaceIndex | None:
+    """Build and save the index of a matcher, if it has enough samples."""
+    if len(matcher) < max(1, FACE_INDEX_MIN_SAMPLES):
+        if os.path.exists(FACE_INDEX_PATH):
+            os.remove(FACE_INDEX_PATH)
+        return None
+    index = FaceIndex.build(matcher.blocks)
+    index.save()
+    return index
+
+
+def load_face_index(matcher: Any) -> FaceIndex | None:
+    """Load the saved index of a matcher, rebuilding it if it is stale."""
+    if len(matcher) < max(1, FACE_INDEX_MIN_SAMPLES):
+        return None
+    return FaceIndex.load(len(matcher)) or build_face_index(matcher)
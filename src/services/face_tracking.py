@@ -0,0 +1,270 @@
+"""Face tracking between Haar cascade detections."""
+
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Sequence
+from typing import Any
+
+import cv2
+import numpy as np
+from numpy.typing import NDArray
+
+from src.infra.config import (
+    DETECTION_INTERVAL,
+    RECOGNITION_INTERVAL,
+    RECOGNITION_VOTES,
+)
+
+Box = tuple[int, int, int, int]
+
+# Optical flow parameters
+MIN_TRACKED_POINTS: int = 4
+MAX_FEATURES_PER_FACE: int = 30
+MAX_FORWARD_BACKWARD_ERROR: float = 1.0
+IOU_THRESHOLD: float = 0.3
+# Tracks older than this are not propagated (e.g. the stream was paused)
+MAX_FRAME_GAP_SECONDS: float = 1.0
+
+
+def box_iou(a: Box, b: Box) -> float:
+    """Intersection over union of two (x, y, w, h) boxes."""
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    inter_w: int = min(ax + aw, bx + bw) - max(ax, bx)
+    inter_h: int = min(ay + ah, by + bh) - max(ay, by)
+    if inter_w <= 0 or inter_h <= 0:
+        return 0.0
+    intersection: int = inter_w * inter_h
+    return intersection / float(aw * ah + bw * bh - intersection)
+
+
+# Predictions needed before a track's identity is considered settled
+MIN_VOTES: int = min(3, RECOGNITION_VOTES)
+
+
+class Track:
+    """A face followed across frames, with its recent identity predictions."""
+
+    def __init__(self, track_id: int, box: Box) -> None:
+        self.track_id: int = track_id
+        self.box: Box = box
+        self.points: NDArray[np.float32] | None = None
+        self.votes: deque[tuple[int, float]] = deque(maxlen=RECOGNITION_VOTES)
+        self.frames_since_prediction: int = 0
+
+    def identity(self) -> tuple[int, float] | None:
+        """Confidence-weighted vote over the recent predictions.
+
+        LBPH confidence is a distance, so closer matches weigh more. Returns
+        the winning label and its mean distance.
+        """
+        if not self.votes:
+            return None
+
+        scores: dict[int, float] = {}
+        distances: dict[int, list[float]] = {}
+        for label, trust in self.votes:
+            scores[label] = scores.get(label, 0.0) + 1.0 / (1.0 + trust)
+            distances.setdefault(label, []).append(trust)
+
+        label: int = max(scores, key=scores.__getitem__)
+        return label, sum(distances[label]) / len(distances[label])
+
+    def needs_prediction(self, interval: int = RECOGNITION_INTERVAL) -> bool:
+        """Check if the face should be recognized again on this frame."""
+        if len(self.votes) < MIN_VOTES:
+            return True
+        if self.frames_since_prediction + 1 >= interval:
+            return True
+        # The latest prediction disagrees with the vote: confidence degraded
+        identity = self.identity()
+        return identity is not None and self.votes[-1][0] != identity[0]
+
+
+class FaceTracker:
+    """Runs detection on keyframes and propagates boxes with optical flow."""
+
+    def __init__(self, detection_interval: int = DETECTION_INTERVAL) -> None:
+        self.detection_interval: int = detection_interval
+        self.tracks: list[Track] = []
+        self.frames: int = 0
+        self.detections: int = 0
+        self.predictions: int = 0
+        self._next_track_id: int = 1
+        self._frames_since_detection: int = 0
+        self._force_detection: bool = True
+        self._previous_gray: NDArray[Any] | None = None
+        self._previous_time: float = 0.0
+
+    def update(
+        self,
+        gray_image: NDArray[Any],
+        detect: Callable[[NDArray[Any]], Sequence],
+        region: Box | None = None,
+    ) -> list[Track]:
+        """Get the face tracks for a new grayscale frame.
+
+        region is the part of the frame detect searches; tracks outside it are
+        kept as they are.
+        """
+        now: float = time.monotonic()
+        stale: bool = (
+            self._previous_gray is None
+            or self._previous_gray.shape != gray_image.shape
+            or now - self._previous_time > MAX_FRAME_GAP_SECONDS
+        )
+
+        self.frames += 1
+        if (
+            stale
+            or self._force_detection
+            or self._frames_since_detection + 1 >= self.detection_interval
+        ):
+            self.detections += 1
+            self._frames_since_detection = 0
+            self._force_detection = False
+            boxes: list[Box] = [
+                tuple(int(v) for v in box) for box in detect(gray_image)
+            ]
+            self._associate(boxes, gray_image, region)
+        else:
+            self._frames_since_detection += 1
+            self._propagate(gray_image)
+
+        self._previous_gray = gray_image
+        self._previous_time = now
+        return self.tracks
+
+    def identify(
+        self, track: Track, predict: Callable[[], tuple[int, float]]
+    ) -> tuple[int, float]:
+        """Get the identity of a track, running predict only when needed."""
+        if track.needs_prediction():
+            label, trust = predict()
+            self.predictions += 1
+            track.votes.append((label, trust))
+            track.frames_since_prediction = 0
+        else:
+            track.frames_since_prediction += 1
+        return track.identity()
+
+    def _associate(
+        self, boxes: list[Box], gray_image: NDArray[Any], region: Box | None = None
+    ) -> None:
+        """Match detections to existing tracks by box overlap."""
+        unmatched: list[Track] = list(self.tracks)
+        tracks: list[Track] = []
+
+        for box in boxes:
+            best: Track | None = None
+            best_iou: float = IOU_THRESHOLD
+            for track in unmatched:
+                iou: float = box_iou(track.box, box)
+                if iou >= best_iou:
+                    best, best_iou = track, iou
+
+            if best is None:
+                best = Track(self._next_track_id, box)
+                self._next_track_id += 1
+            else:
+                unmatched.remove(best)
+                best.box = box
+
+            best.points = self._find_points(gray_image, box)
+            tracks.append(best)
+
+        if region is not None:
+            # Faces outside the searched region did not move: keep them
+            tracks.extend(t for t in unmatched if box_iou(t.box, region) == 0.0)
+
+        self.tracks = tracks
+
+    def _propagate(self, gray_image: NDArray[Any]) -> None:
+        """Move every track by the median optical flow of its points."""
+        tracks: list[Track] = [t for t in self.tracks if t.points is not None]
+        if not tracks:
+            return
+
+        previous_points = np.concatenate([t.points for t in tracks])
+        next_points, status, _ = cv2.calcOpticalFlowPyrLK(
+            self._previous_gray, gray_image, previous_points, None
+        )
+        # Forward-backward check: points that do not flow back are unreliable
+        back_points, back_status, _ = cv2.calcOpticalFlowPyrLK(
+            gray_image, self._previous_gray, next_points, None
+        )
+        back_error = np.linalg.norm(
+            (back_points - previous_points).reshape(-1, 2), axis=1
+        )
+        reliable = (
+            (status.ravel() == 1)
+            & (back_status.ravel() == 1)
+            & (back_error < MAX_FORWARD_BACKWARD_ERROR)
+        )
+
+        height, width = gray_image.shape[:2]
+        offset: int = 0
+        for track in tracks:
+            count: int = len(track.points)
+            found = reliable[offset : offset + count]
+            moved = next_points[offset : offset + count][found]
+            origin = previous_points[offset : offset + count][found]
+            offset += count
+
+            if len(moved) < MIN_TRACKED_POINTS:
+                # Lost this face: keep the last box and re-detect next frame
+                track.points = None
+                self._force_detection = True
+                continue
+
+            dx, dy = np.median((moved - origin).reshape(-1, 2), axis=0)
+            x, y, w, h = track.box
+            x = int(min(max(round(x + dx), 0), width - w))
+            y = int(min(max(round(y + dy), 0), height - h))
+            track.box = (x, y, w, h)
+            track.points = moved.reshape(-1, 1, 2)
+
+    def _find_points(
+        self, gray_image: NDArray[Any], box: Box
+    ) -> NDArray[np.float32] | None:
+        """Find good features to track inside a face box."""
+        x, y, w, h = box
+        corners = cv2.goodFeaturesToTrack(
+            gray_image[y : y + h, x : x + w],
+            maxCorners=MAX_FEATURES_PER_FACE,
+            qualityLevel=0.01,
+            minDistance=5,
+        )
+        if corners is None or len(corners) < MIN_TRACKED_POINTS:
+            return None
+        corners[:, 0, 0] += x
+        corners[:, 0, 1] += y
+        return corners.astype(np.float32)
+
+
+# Trackers of the live streams, keyed by camera id and output profile
+_trackers: dict[tuple[int, str], FaceTracker] = {}
+_trackers_lock = threading.Lock()
+
+
+def get_tracker(camera_id: int, profile: str) -> FaceTracker:
+    """Get the shared tracker of a camera stream."""
+    with _trackers_lock:
+        return _trackers.setdefault((camera_id, profile), FaceTracker())
+
+
+def get_tracker_stats() -> list[dict[str, Any]]:
+    """Get how many frames of each live stream ran the full detector."""
+    with _trackers_lock:
+        return [
+            {
+                "camera_id": camera_id,
+                "profile": profile,
+                "frames": tracker.frames,
+                "detections": tracker.detections,
+                "predictions": tracker.predictions,
+                "tracks": len(tracker.tracks),
+            }
+            for (camera_id, profile), tracker in _trackers.items()
+        ]
@@ -1,63 +1,175 @@
 """Facial recognition service module."""
 
 import asyncio
+import functools
 from collections.abc import AsyncGenerator
+from typing import Any
 
 import cv2
-from cv2 import CascadeClassifier, VideoCapture
+from numpy.typing import NDArray
 from sqlalchemy.orm import Session
 
 from src.entities.models import Camera, CameraStatus
 from src.infra.config import (
     CAMERA_NOT_FOUND_IMAGE,
     CAMERA_OFF_IMAGE,
-    CLASSIFIER_PATH,
-    HAARCASCADE_PATH,
+    RECOGNITION_MAX_DISTANCE,
     USE_WEBCAM_FALLBACK,
     classifier_exists,
+    get_detection_width,
     get_ip_camera_capture,
     get_webcam_capture,
 )
 from src.repositories.camera_repository import CameraNotFound, get_camera_by_id
-from src.repositories.person_repository import get_all_persons
-
-# Parameters for facial recognition
-faceDetector: CascadeClassifier = cv2.CascadeClassifier(str(HAARCASCADE_PATH))
-recognizer = cv2.face.LBPHFaceRecognizer_create()
-
-if classifier_exists():
-    recognizer.read(str(CLASSIFIER_PATH))
+from src.repositories.control_channel import get_camera_status
+from src.repositories.person_directory import get_person_name
+from src.repositories.sighting_repository import sighting_writer
+from src.services.capture_hub import (
+    WEBCAM_CAMERA_ID,
+    CaptureSubscription,
+    subscribe,
+)
+from src.services.face_detection import Box, detect_faces
+from src.services.face_tracking import FaceTracker, get_tracker
+from src.services.frame_cache import next_shared_frame
+from src.services.model_registry import model_registry
+from src.services.motion_gate import MotionGate, get_motion_gate
+from src.services.processing import encode_frame
+from src.services.recognition_service import recognition_service
 
 font: int = cv2.FONT_HERSHEY_COMPLEX_SMALL
 width: int = 220
 height: int = 220
 
 
-def verifyPerson(session: Session, person_id: int) -> str | None:
-    """Verify person name by ID."""
-    persons = get_all_persons(session=session)
-    for p in persons:
-        if person_id == p.person_id:
-            return p.name
-    return None
+def _predict_face(
+    gray_image: NDArray[Any], box: tuple[int, int, int, int]
+) -> tuple[int, float]:
+    """Recognize the face inside a box of a grayscale frame."""
+    x, y, w, h = box
+    face_image = cv2.resize(gray_image[y : y + h, x : x + w], (width, height))
+    return recognition_service.predict(face_image)
+
+
+def _detect_faces(
+    gray_image: NDArray[Any],
+    detection_width: int | None = None,
+    region: Box | None = None,
+) -> list[Box]:
+    """Run the Haar cascade on a grayscale frame."""
+    return detect_faces(
+        model_registry.face_detector(),
+        gray_image,
+        detection_width,
+        scale_factor=1.1,
+        min_neighbors=5,
+        min_size=(60, 60),
+        region=region,
+    )
+
+
+def _recognize_webcam_frame(
+    frame: NDArray[Any],
+    tracker: FaceTracker,
+    gate: MotionGate,
+    detection_width: int | None = None,
+) -> bytes:
+    """Detect, recognize and annotate a webcam frame, returning it encoded."""
+    region: Box | None = gate.check(frame)
+    if region is None and gate.idle_payload is not None:
+        return gate.idle_payload
+
+    gray_image = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    detect = functools.partial(
+        _detect_faces, detection_width=detection_width, region=region
+    )
+    tracks = tracker.update(gray_image, detect, region)
+
+    cv2.putText(
+        frame,
+        "MODO: RECONHECIMENTO",
+        (10, 30),
+        font,
+        1,
+        (0, 255, 255),
+        2,
+    )
+
+    for track in tracks:
+        x, y, w, h = track.box
+        cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+
+        try:
+            person_id, trust = tracker.identify(
+                track, functools.partial(_predict_face, gray_image, track.box)
+            )
+            if person_id >= 0 and trust < RECOGNITION_MAX_DISTANCE:
+                sighting_writer.record(person_id, WEBCAM_CAMERA_ID, trust, track.box)
+            name: str = (
+                (get_person_name(person_id) or "Desconhecido")
+                if trust < RECOGNITION_MAX_DISTANCE
+                else "Desconhecido"
+            )
 
+            cv2.putText(frame, name, (x, y - 10), font, 1, (0, 255, 0), 2)
+            cv2.putText(
+                frame,
+                f"Conf: {round(trust, 1)}",
+                (x, y + h + 20),
+                font,
+                1,
+                (0, 255, 0),
+                1,
+            )
+        except Exception:
+            cv2.putText(frame, "?", (x, y - 10), font, 1, (0, 0, 255), 2)
+
+    gate.idle_payload = encode_frame(frame)
+    return gate.idle_payload
+
+
+def _recognize_camera_frame(
+    frame: NDArray[Any],
+    tracker: FaceTracker,
+    gate: MotionGate,
+    detection_width: int | None = None,
+    camera_id: int = WEBCAM_CAMERA_ID,
+) -> bytes:
+    """Detect, recognize and annotate a camera frame, returning it encoded."""
+    region: Box | None = gate.check(frame)
+    if region is None and gate.idle_payload is not None:
+        return gate.idle_payload
+
+    gray_image = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    detect = functools.partial(
+        _detect_faces, detection_width=detection_width, region=region
+    )
+    for track in tracker.update(gray_image, detect, region):
+        x, y, w, h = track.box
+        cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 0, 255), 2)
+        person_id, trust = tracker.identify(
+            track, functools.partial(_predict_face, gray_image, track.box)
+        )
+        if person_id >= 0 and trust < RECOGNITION_MAX_DISTANCE:
+            sighting_writer.record(person_id, camera_id, trust, track.box)
 
-def load_persons_cache() -> dict[int, str]:
-    """Load all persons from database into a cache dict."""
-    from src.infra.database import SessionLocal
+        name = get_person_name(person_id)
+        if name is None:
+            name = "Desconhecido"
 
-    db: Session | None = None
-    try:
-        db = SessionLocal()
-        persons = get_all_persons(session=db)
-        cache: dict[int, str] = {p.person_id: p.name for p in persons}
-        return cache
-    except Exception as e:
-        print(f"Error loading persons cache: {e}")
-        return {}
-    finally:
-        if db is not None:
-            db.close()
+        cv2.putText(frame, name, (x, y + (h + 30)), font, 2, (0, 0, 255))
+        cv2.putText(
+            frame,
+            str(f"Confianca: {round(trust, 2)}%"),
+            (x, y + (h + 50)),
+            font,
+            1,
+            (0, 0, 255),
+        )
+
+    frame = cv2.resize(frame, (1280, 720), interpolation=cv2.INTER_AREA)
+    gate.idle_payload = encode_frame(frame)
+    return gate.idle_payload
 
 
 async def stream_recognition_only() -> AsyncGenerator[bytes, None]:
@@ -80,11 +192,12 @@ async def stream_recognition_only() -> AsyncGenerator[bytes, None]:
         )
         return
 
-    recognizer.read(str(CLASSIFIER_PATH))
-    persons_cache: dict[int, str] = load_persons_cache()
+    recognition_service.load()
 
-    cameraIP: VideoCapture = get_webcam_capture()
-    if cameraIP is None or not cameraIP.isOpened():
+    camera_capture: CaptureSubscription | None = subscribe(
+        WEBCAM_CAMERA_ID, get_webcam_capture
+    )
+    if camera_capture is None:
         image = cv2.imread(str(CAMERA_NOT_FOUND_IMAGE))
         _, encodedImage = cv2.imencode(".jpg", image)
         yield (
@@ -93,77 +206,32 @@ async def stream_recognition_only() -> AsyncGenerator[bytes, None]:
         )
         return
 
-    frame_count: int = 0
+    annotate = functools.partial(
+        _recognize_webcam_frame,
+        tracker=get_tracker(WEBCAM_CAMERA_ID, "reconhecimento_webcam"),
+        gate=get_motion_gate(WEBCAM_CAMERA_ID, "reconhecimento_webcam"),
+        detection_width=get_detection_width(WEBCAM_CAMERA_ID),
+    )
     try:
         while True:
-            connected, frame = cameraIP.read()
-            if not connected:
-                await asyncio.sleep(0.01)
-                continue
-
-            frame_count += 1
-            if frame_count % 100 == 0:
-                persons_cache = load_persons_cache()
-
             try:
-                gray_image = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                detected_faces = faceDetector.detectMultiScale(
-                    gray_image, scaleFactor=1.1, minNeighbors=5, minSize=(60, 60)
-                )
-
-                cv2.putText(
-                    frame,
-                    "MODO: RECONHECIMENTO",
-                    (10, 30),
-                    font,
-                    1,
-                    (0, 255, 255),
-                    2,
+                payload = await next_shared_frame(
+                    camera_capture, "reconhecimento_webcam", annotate
                 )
-
-                for x, y, w, h in detected_faces:
-                    face_image = cv2.resize(
-                        gray_image[y : y + h, x : x + w], (width, height)
-                    )
-                    cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
-
-                    try:
-                        person_id, trust = recognizer.predict(face_image)
-                        name: str = (
-                            persons_cache.get(person_id, "Desconhecido")
-                            if trust < 100
-                            else "Desconhecido"
-                        )
-
-                        cv2.putText(frame, name, (x, y - 10), font, 1, (0, 255, 0), 2)
-                        cv2.putText(
-                            frame,
-                            f"Conf: {round(trust, 1)}",
-                            (x, y + h + 20),
-                            font,
-                            1,
-                            (0, 255, 0),
-                            1,
-                        )
-                    except Exception:
-                        cv2.putText(frame, "?", (x, y - 10), font, 1, (0, 0, 255), 2)
-
-                _, encodedImage = cv2.imencode(".jpg", frame)
-                yield (
-                    b"--frame\r\n"
-                    b"Content-Type: image/jpeg\r\n\r\n"
-                    + bytearray(encodedImage)
-                    + b"\r\n"
-                )
-
-                await asyncio.sleep(0.01)
-
             except Exception as e:
                 print(f"Recognition error: {e}")
                 await asyncio.sleep(0.01)
+                continue
+
+            if payload is None:
+                await asyncio.sleep(0.01)
+                continue
+
+            yield payload
+            await asyncio.sleep(0.01)
 
     finally:
-        cameraIP.release()
+        camera_capture.release()
 
 
 async def stream_facial_recognition(
@@ -188,7 +256,7 @@ async def stream_facial_recognition(
         )
         return
 
-    recognizer.read(str(CLASSIFIER_PATH))
+    recognition_service.load()
 
     camera: Camera | None = None
     use_webcam: bool = False
@@ -198,18 +266,20 @@ async def stream_facial_recognition(
     except CameraNotFound:
         camera = None
 
-    cameraIP: VideoCapture | None = None
+    camera_capture: CaptureSubscription | None = None
 
     if camera is not None:
-        cameraIP = get_ip_camera_capture(camera.user, camera.password, camera.camera_ip)
-        if not cameraIP.isOpened():
-            cameraIP.release()
-            cameraIP = None
+        camera_capture = subscribe(
+            camera.camera_id,
+            lambda: get_ip_camera_capture(
+                camera.user, camera.password, camera.camera_ip
+            ),
+        )
 
-    if cameraIP is None and USE_WEBCAM_FALLBACK:
-        cameraIP = get_webcam_capture()
+    if camera_capture is None and USE_WEBCAM_FALLBACK:
+        camera_capture = subscribe(WEBCAM_CAMERA_ID, get_webcam_capture)
         use_webcam = True
-        if not cameraIP.isOpened():
+        if camera_capture is None:
             image = cv2.imread(str(CAMERA_NOT_FOUND_IMAGE))
             _, encodedImage = cv2.imencode(".jpg", image)
             yield (
@@ -217,7 +287,7 @@ async def stream_facial_recognition(
                 b"Content-Type: image/jpeg\r\n\r\n" + bytearray(encodedImage) + b"\r\n"
             )
             return
-    elif cameraIP is None:
+    elif camera_capture is None:
         image = cv2.imread(str(CAMERA_NOT_FOUND_IMAGE))
         _, encodedImage = cv2.imencode(".jpg", image)
         yield (
@@ -226,59 +296,40 @@ async def stream_facial_recognition(
         )
         return
 
+    annotate = functools.partial(
+        _recognize_camera_frame,
+        tracker=get_tracker(camera_capture.reader.key, "reconhecimento"),
+        gate=get_motion_gate(camera_capture.reader.key, "reconhecimento"),
+        detection_width=get_detection_width(camera_capture.reader.key),
+        camera_id=camera_capture.reader.key,
+    )
     should_run: bool = True
-    while should_run:
-        connected, frame = cameraIP.read()
-        if connected:
+    try:
+        while should_run:
             try:
-                gray_image = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                detected_faces = faceDetector.detectMultiScale(
-                    gray_image, scaleFactor=1.1, minNeighbors=5, minSize=(60, 60)
-                )
-                for x, y, w, h in detected_faces:
-                    face_image = cv2.resize(
-                        gray_image[y : y + h, x : x + w], (width, height)
-                    )
-                    cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 0, 255), 2)
-                    person_id, trust = recognizer.predict(face_image)
-
-                    name = verifyPerson(session, person_id)
-                    if name is None:
-                        name = "Desconhecido"
-
-                    cv2.putText(frame, name, (x, y + (h + 30)), font, 2, (0, 0, 255))
-                    cv2.putText(
-                        frame,
-                        str(f"Confianca: {round(trust, 2)}%"),
-                        (x, y + (h + 50)),
-                        font,
-                        1,
-                        (0, 0, 255),
-                    )
-
-                frame = cv2.resize(frame, (1280, 720), interpolation=cv2.INTER_AREA)
-
-                _, encodedImage = cv2.imencode(".jpg", frame)
-                yield (
-                    b"--frame\r\n"
-                    b"Content-Type: image/jpeg\r\n\r\n"
-                    + bytearray(encodedImage)
-                    + b"\r\n"
+                payload = await next_shared_frame(
+                    camera_capture, "reconhecimento", annotate
                 )
+            except Exception as e:
+                print(e)
+                await asyncio.sleep(0.01)
+                continue
 
+            if payload is None:
                 await asyncio.sleep(0.01)
+                continue
 
-            except Exception as e:
-                print(e)
+            yield payload
+            await asyncio.sleep(0.01)
 
-        if not use_webcam and camera:
-            session.commit()
-            session.refresh(camera)
-            camera = get_camera_by_id(session=session, _id=id_camera)
-            if camera and camera.status != CameraStatus.on:
-                should_run = False
+            if not use_webcam and camera:
+                status: CameraStatus | None = get_camera_status(id_camera)
+                if status is not None and status != CameraStatus.on:
+                    should_run = False
+
+    finally:
+        camera_capture.release()
 
-    cameraIP.release()
     cv2.destroyAllWindows()
     try:
         image = cv2.imread(str(CAMERA_OFF_IMAGE))
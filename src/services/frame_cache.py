@@ -0,0 +1,124 @@
+"""Encode-once cache of annotated frames shared by every viewer of a camera."""
+
+import threading
+from collections.abc import Callable
+from typing import Any
+
+from numpy.typing import NDArray
+
+from src.services.capture_hub import CameraReader, CaptureSubscription
+from src.services.processing import run_in_pool
+
+
+class FrameCache:
+    """Keeps the latest encoded frame per camera and output profile.
+
+    The first viewer to ask for a frame sequence produces it (detection,
+    annotation and JPEG encoding); every other viewer reuses the same bytes.
+    A slot belongs to the reader that produced it, since the sequence numbers
+    of a camera start over when its reader is reopened.
+    """
+
+    def __init__(self) -> None:
+        self._slots: dict[tuple[int, str], tuple[CameraReader, int, bytes]] = {}
+        self._slot_locks: dict[tuple[int, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def _slot_lock(self, key: tuple[int, str]) -> threading.Lock:
+        """Get the lock serializing producers of a slot."""
+        with self._lock:
+            return self._slot_locks.setdefault(key, threading.Lock())
+
+    def _slot(self, reader: CameraReader, profile: str) -> tuple[int, bytes | None]:
+        """Get the cached sequence and payload of a reader (caller holds lock)."""
+        slot = self._slots.get((reader.key, profile))
+        if slot is None or slot[0] is not reader:
+            return 0, None
+        return slot[1], slot[2]
+
+    def take_newer(
+        self, reader: CameraReader, profile: str, seen_sequence: int
+    ) -> tuple[int, bytes | None]:
+        """Get the latest payload if it is newer than the one already seen."""
+        with self._lock:
+            sequence, payload = self._slot(reader, profile)
+            if payload is None or sequence <= seen_sequence:
+                return seen_sequence, None
+            self.hits += 1
+            return sequence, payload
+
+    def get_or_encode(
+        self,
+        reader: CameraReader,
+        profile: str,
+        sequence: int,
+        produce: Callable[[], bytes],
+    ) -> bytes:
+        """Get the payload for a frame sequence, producing it only once."""
+        key = (reader.key, profile)
+        with self._slot_lock(key):
+            with self._lock:
+                cached_sequence, payload = self._slot(reader, profile)
+                if payload is not None and cached_sequence >= sequence:
+                    self.hits += 1
+                    return payload
+
+            payload = produce()
+            with self._lock:
+                self.misses += 1
+                self._slots[key] = (reader, sequence, payload)
+            return payload
+
+    def discard(self, reader: CameraReader) -> None:
+        """Drop the cached frames of a reader that stopped."""
+        with self._lock:
+            for key in [key for key in self._slots if self._slots[key][0] is reader]:
+                del self._slots[key]
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get hit and miss counters."""
+        with self._lock:
+            total: int = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+                "slots": len(self._slots),
+            }
+
+
+# Shared by all MJPEG responses of this worker
+frame_cache: FrameCache = FrameCache()
+
+
+async def next_shared_frame(
+    camera_capture: CaptureSubscription,
+    profile: str,
+    annotate: Callable[[NDArray[Any]], bytes],
+) -> bytes | None:
+    """Get the next encoded frame of a camera for one viewer.
+
+    Reuses a frame already produced by another viewer when it is newer than
+    the last one this viewer got; otherwise reads the latest camera frame and
+    annotates it in the processing pool. Returns None if nothing is new.
+    """
+    reader: CameraReader = camera_capture.reader
+    sequence, payload = frame_cache.take_newer(reader, profile, camera_capture.sequence)
+    if payload is None:
+        connected, frame = camera_capture.read(copy=False)
+        if not connected:
+            return None
+        sequence = camera_capture.sequence
+        # The frame is shared with other viewers, so annotate a copy
+        payload = await run_in_pool(
+            frame_cache.get_or_encode,
+            reader,
+            profile,
+            sequence,
+            lambda: annotate(frame.copy()),
+        )
+
+    camera_capture.mark_seen(sequence)
+    return payload
@@ -0,0 +1,317 @@
+"""Vectorized LBPH matching on the histograms of a trained OpenCV model."""
+
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+# Result of OpenCV's LBPH predict when no sample is under the threshold
+NO_MATCH: tuple[int, float] = (-1, float(np.finfo(np.float64).max))
+# Samples whose float32 lower bound is within this relative margin of the best
+# distance are compared exactly in float64, so near-ties resolve like OpenCV
+RERANK_MARGIN: float = 1e-3
+# Training samples per contiguous bin-major block of the histogram matrix
+BLOCK_SAMPLES: int = 4096
+
+
+class LBPHMatcher:
+    """Nearest-neighbour search over LBPH spatial histograms with NumPy.
+
+    Reproduces cv2.face.LBPHFaceRecognizer.predict: extended LBP codes with
+    bilinear interpolation, normalized per-cell histograms and the
+    HISTCMP_CHISQR_ALT distance. Training histograms are kept bin-major
+    (bins x samples) in contiguous float32 blocks, so a batch of queries only
+    reads the rows of their non-empty bins, and blocks are matched in parallel
+    threads. A lower bound of every distance is computed for the whole batch
+    with one matrix product per block, and only the samples it cannot rule
+    out are compared exactly. With an index attached, only its candidates are
+    compared.
+    """
+
+    def __init__(
+        self,
+        histograms: NDArray[np.float32],
+        labels: NDArray[np.int32],
+        radius: int = 1,
+        neighbors: int = 8,
+        grid_x: int = 8,
+        grid_y: int = 8,
+        threshold: float = NO_MATCH[1],
+        workers: int | None = None,
+    ) -> None:
+        labels = np.asarray(labels, dtype=np.int32).ravel()
+        bins: int = grid_x * grid_y * 2**neighbors
+        histograms = np.asarray(histograms, dtype=np.float32).reshape(len(labels), bins)
+        blocks = [
+            np.ascontiguousarray(histograms[start : start + BLOCK_SAMPLES].T)
+            for start in range(0, len(labels), BLOCK_SAMPLES)
+        ]
+        # Normalized cell histograms sum to 1; keep the exact sums anyway
+        sums = histograms.sum(axis=1, dtype=np.float64)
+        self._setup(
+            blocks,
+            labels,
+            sums,
+            BLOCK_SAMPLES,
+            radius,
+            neighbors,
+            grid_x,
+            grid_y,
+            threshold,
+            workers,
+        )
+
+    def _setup(
+        self,
+        blocks: list[NDArray[np.float32]],
+        labels: NDArray[np.int32],
+        sums: NDArray[np.float64],
+        block_samples: int,
+        radius: int,
+        neighbors: int,
+        grid_x: int,
+        grid_y: int,
+        threshold: float,
+        workers: int | None,
+    ) -> None:
+        """Set the model parameters and its bin-major histogram blocks."""
+        self.labels: NDArray[np.int32] = labels
+        self.radius: int = radius
+        self.neighbors: int = neighbors
+        self.grid_x: int = grid_x
+        self.grid_y: int = grid_y
+        self.threshold: float = threshold
+        self.patterns: int = 2**neighbors
+        self.bins: int = grid_x * grid_y * self.patterns
+        self.block_samples: int = block_samples
+        self.blocks: list[NDArray[np.float32]] = blocks
+        self.sums: NDArray[np.float64] = sums
+        self._sampling = self._sampling_points()
+        # Optional approximate index (FaceIndex) used instead of a full scan
+        self.index: Any = None
+        self._executor: ThreadPoolExecutor | None = None
+        workers = workers or os.cpu_count() or 1
+        if workers > 1 and len(self.blocks) > 1:
+            self._executor = ThreadPoolExecutor(
+                max_workers=min(workers, len(self.blocks)),
+                thread_name_prefix="lbph-matcher",
+            )
+
+    @classmethod
+    def from_blocks(
+        cls,
+        blocks: list[NDArray[np.float32]],
+        labels: NDArray[np.int32],
+        sums: NDArray[np.float64],
+        block_samples: int = BLOCK_SAMPLES,
+        radius: int = 1,
+        neighbors: int = 8,
+        grid_x: int = 8,
+        grid_y: int = 8,
+        threshold: float = NO_MATCH[1],
+        workers: int | None = None,
+    ) -> "LBPHMatcher":
+        """Build a matcher on existing bin-major blocks, without copying them.
+
+        Every block but the last holds block_samples samples; sums are the
+        totals of each sample histogram.
+        """
+        matcher = cls.__new__(cls)
+        matcher._setup(
+            blocks,
+            labels,
+            sums,
+            block_samples,
+            radius,
+            neighbors,
+            grid_x,
+            grid_y,
+            threshold,
+            workers,
+        )
+        return matcher
+
+    @classmethod
+    def from_recognizer(cls, recognizer: Any, **kwargs: Any) -> "LBPHMatcher":
+        """Build a matcher from a trained cv2.face.LBPHFaceRecognizer."""
+        histograms = recognizer.getHistograms()
+        neighbors: int = recognizer.getNeighbors()
+        bins: int = recognizer.getGridX() * recognizer.getGridY() * 2**neighbors
+        return cls(
+            np.vstack(histograms) if histograms else np.zeros((0, bins), np.float32),
+            recognizer.getLabels(),
+            radius=recognizer.getRadius(),
+            neighbors=neighbors,
+            grid_x=recognizer.getGridX(),
+            grid_y=recognizer.getGridY(),
+            threshold=recognizer.getThreshold(),
+            **kwargs,
+        )
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def histograms(self) -> NDArray[np.float32]:
+        """Training histograms, one row per sample."""
+        if not self.blocks:
+            return np.zeros((0, self.bins), dtype=np.float32)
+        return np.concatenate([block.T for block in self.blocks])
+
+    def _sampling_points(self) -> list[tuple[int, int, int, int, tuple]]:
+        """Neighbour offsets and interpolation weights, computed like OpenCV."""
+        one = np.float32(1)
+        points = []
+        for n in range(self.neighbors):
+            x = np.float32(self.radius * math.cos(2.0 * math.pi * n / self.neighbors))
+            y = np.float32(-self.radius * math.sin(2.0 * math.pi * n / self.neighbors))
+            fx, fy = math.floor(x), math.floor(y)
+            cx, cy = math.ceil(x), math.ceil(y)
+            tx = x - np.float32(fx)
+            ty = y - np.float32(fy)
+            weights = (
+                (one - tx) * (one - ty),
+                tx * (one - ty),
+                (one - tx) * ty,
+                tx * ty,
+            )
+            points.append((fx, fy, cx, cy, weights))
+        return points
+
+    def lbp(self, faces: NDArray[np.uint8]) -> NDArray[np.int32]:
+        """Extended LBP codes of a batch of grayscale faces (B x H x W)."""
+        r: int = self.radius
+        height, width = faces.shape[1:]
+        rows, cols = height - 2 * r, width - 2 * r
+        src = faces.astype(np.float32)
+        center = src[:, r : r + rows, r : r + cols]
+        codes = np.zeros((len(faces), rows, cols), dtype=np.int32)
+        eps = np.finfo(np.float32).eps
+
+        def shifted(dy: int, dx: int) -> NDArray[np.float32]:
+            return src[:, r + dy : r + dy + rows, r + dx : r + dx + cols]
+
+        for n, (fx, fy, cx, cy, (w1, w2, w3, w4)) in enumerate(self._sampling):
+            # Same float32 operation order as OpenCV's elbp
+            t = w1 * shifted(fy, fx)
+            t += w2 * shifted(fy, cx)
+            t += w3 * shifted(cy, fx)
+            t += w4 * shifted(cy, cx)
+            bit = (t > center) | (np.abs(t - center) < eps)
+            codes |= bit.astype(np.int32) << n
+        return codes
+
+    def histogram(self, faces: NDArray[np.uint8]) -> NDArray[np.float32]:
+        """Spatial LBP histograms of a batch of faces (B x bins)."""
+        if faces.ndim == 2:
+            faces = faces[np.newaxis]
+        codes = self.lbp(faces)
+        batch, rows, cols = codes.shape
+        cell_h, cell_w = rows // self.grid_y, cols // self.grid_x
+        cells = codes[:, : cell_h * self.grid_y, : cell_w * self.grid_x]
+        cells = cells.reshape(batch, self.grid_y, cell_h, self.grid_x, cell_w)
+        cells = cells.transpose(0, 1, 3, 2, 4).reshape(batch, -1, cell_h * cell_w)
+
+        # One bincount over (face, cell, pattern) offsets for the whole batch
+        offsets = np.arange(batch * cells.shape[1], dtype=np.int64) * self.patterns
+        counts = np.bincount(
+            (cells + offsets.reshape(batch, -1, 1)).ravel(),
+            minlength=len(offsets) * self.patterns,
+        )
+        # OpenCV scales the counts by 1 / cell size in double, then stores float
+        histograms = counts * (1.0 / (cell_h * cell_w))
+        return histograms.astype(np.float32).reshape(batch, -1)
+
+    def lower_bounds(self, queries: NDArray[np.float32]) -> NDArray[np.float64]:
+        """Lower bounds of the chi-square (alternative) distance of each query
+        to every sample.
+
+        Each term (h - q)^2 / (h + q) is at least (sqrt(h) - sqrt(q))^2, so the
+        distance is at least 2 * (sum(h) + sum(q) - 2 * sqrt(h) . sqrt(q)). The
+        dot products of all the queries with a block are one matrix product
+        over the union of their non-empty bins.
+        """
+        queries = np.atleast_2d(queries).astype(np.float32)
+        bins = np.flatnonzero(queries.any(axis=0))
+        roots = np.sqrt(queries[:, bins])
+        query_sums = queries.sum(axis=1, dtype=np.float64)[:, np.newaxis]
+
+        def match_block(index: int) -> NDArray[np.float64]:
+            block = self.blocks[index]
+            start: int = index * self.block_samples
+            sums = self.sums[start : start + block.shape[1]]
+            rows = block[bins]
+            dots = roots @ np.sqrt(rows, out=rows)
+            return sums + query_sums - 2 * dots
+
+        indexes = range(len(self.blocks))
+        if self._executor is not None:
+            parts = list(self._executor.map(match_block, indexes))
+        else:
+            parts = [match_block(index) for index in indexes]
+        if not parts:
+            return np.empty((len(queries), 0), dtype=np.float64)
+        return 2 * np.concatenate(parts, axis=1)
+
+    def exact_distances(
+        self, query: NDArray[np.float32], indexes: NDArray[np.int64]
+    ) -> NDArray[np.float64]:
+        """Chi-square (alternative) distances to some samples, in float64."""
+        bins = np.flatnonzero(query)
+        q = query[bins, np.newaxis].astype(np.float64)
+        blocks, offsets = np.divmod(indexes, self.block_samples)
+        weighted = np.empty(len(indexes), dtype=np.float64)
+        for block in np.unique(blocks):
+            selected = blocks == block
+            h = self.blocks[block][np.ix_(bins, offsets[selected])].astype(np.float64)
+            weighted[selected] = (h * q / (h + q)).sum(axis=0)
+        return 2 * (self.sums[indexes] + query.sum(dtype=np.float64) - 4 * weighted)
+
+    def _best(
+        self, query: NDArray[np.float32], candidates: NDArray[np.int64]
+    ) -> tuple[int, float]:
+        """Nearest of some candidate samples, like OpenCV's predict collector."""
+        distances = self.exact_distances(query, candidates)
+        # argmin keeps the first sample on a tie, like OpenCV
+        best: int = int(np.argmin(distances))
+        distance: float = float(distances[best])
+        if distance < self.threshold:
+            return int(self.labels[candidates[best]]), distance
+        return NO_MATCH
+
+    def predict_histograms(
+        self, queries: NDArray[np.float32]
+    ) -> list[tuple[int, float]]:
+        """Nearest training sample of each query histogram.
+
+        With an index, only its candidates are compared. Otherwise the exact
+        distance to the sample with the lowest bound is an upper bound of the
+        best one, and only the samples bounded below it are compared exactly.
+        """
+        if not len(self):
+            return [NO_MATCH] * len(queries)
+
+        if self.index is not None:
+            return [self._best(query, self.index.search(query)) for query in queries]
+
+        results: list[tuple[int, float]] = []
+        for query, lower in zip(queries, self.lower_bounds(queries)):
+            nearest = np.array([np.argmin(lower)])
+            upper: float = float(self.exact_distances(query, nearest)[0])
+            # The float32 rounding of the bounds grows with the histogram sums
+            slack: float = RERANK_MARGIN * (abs(upper) + query.sum(dtype=np.float64))
+            candidates = np.flatnonzero(lower <= upper + slack)
+            results.append(self._best(query, candidates))
+        return results
+
+    def predict_batch(self, faces: list[NDArray[np.uint8]]) -> list[tuple[int, float]]:
+        """Recognize a batch of grayscale faces of the same size."""
+        if not faces:
+            return []
+        return self.predict_histograms(self.histogram(np.stack(faces)))
+
+    def predict(self, face: NDArray[np.uint8]) -> tuple[int, float]:
+        """Recognize one grayscale face, like LBPHFaceRecognizer.predict."""
+        return self.predict_batch([face])[0]
@@ -0,0 +1,62 @@
+"""Server-sent events with the faces recognized on each frame of a camera."""
+
+import asyncio
+import json
+import time
+from collections.abc import AsyncGenerator, Callable
+from typing import Any
+
+from cv2 import VideoCapture
+
+from src.services.recognition_monitor import RecognitionMonitor, recognition_monitor
+
+# Seconds without a new frame before a keep-alive comment is sent
+KEEPALIVE_SECONDS: float = 15.0
+# How often a stream checks for a new result
+POLL_SECONDS: float = 0.02
+
+
+def _event(data: dict[str, Any], event: str | None = None) -> bytes:
+    """Encode a server-sent event with compact JSON data."""
+    payload: str = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+    prefix: str = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {payload}\n\n".encode()
+
+
+async def stream_detection_metadata(
+    camera_id: int,
+    open_capture: Callable[[], VideoCapture | None],
+    monitor: RecognitionMonitor = recognition_monitor,
+) -> AsyncGenerator[bytes, None]:
+    """Stream the boxes, names and confidences of every processed frame.
+
+    All the streams of a camera share its recognition monitor, so detection
+    and recognition run once per frame whatever the number of clients, and
+    no frame is drawn or encoded. Each event is one JSON object with the
+    frame timestamp, its size and the faces found on it.
+    """
+    camera_monitor = monitor.acquire(camera_id, open_capture)
+    sequence: int = 0
+    sent_at: float = time.monotonic()
+    try:
+        while True:
+            latest = camera_monitor.latest
+            if latest is not None and latest["sequence"] > sequence:
+                sequence = latest["sequence"]
+                sent_at = time.monotonic()
+                yield _event(latest)
+            elif not camera_monitor.running:
+                yield _event(
+                    {
+                        "camera_id": camera_id,
+                        "message": camera_monitor.last_error or "Câmera parada",
+                    },
+                    event="error",
+                )
+                return
+            elif time.monotonic() - sent_at >= KEEPALIVE_SECONDS:
+                sent_at = time.monotonic()
+                yield b": keepalive\n\n"
+            await asyncio.sleep(POLL_SECONDS)
+    finally:
+        monitor.release(camera_id)
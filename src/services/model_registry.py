@@ -0,0 +1,240 @@
+"""Models shared by every module of a worker, loaded on first use.
+
+Holds the Haar cascade used for face detection and the versioned LBPH model,
+swapped in without stopping recognition.
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+import cv2
+import numpy as np
+from cv2 import CascadeClassifier
+
+from src.infra.config import (
+    CLASSIFIER_PATH,
+    FACE_INDEX,
+    FACE_INDEX_PATH,
+    HAARCASCADE_PATH,
+    MODEL_WATCH_INTERVAL,
+)
+from src.services.face_index import load_face_index
+from src.services.lbph_matcher import LBPHMatcher
+from src.services.model_store import load_model
+
+# Loaded versions kept in the stats history
+VERSION_HISTORY: int = 10
+
+
+class ModelVersion:
+    """One loaded model file."""
+
+    def __init__(
+        self, version: int, matcher: LBPHMatcher, fingerprint: tuple[Any, ...]
+    ) -> None:
+        self.version: int = version
+        self.matcher: LBPHMatcher = matcher
+        self.fingerprint: tuple[Any, ...] = fingerprint
+        self.loaded_at: float = time.time()
+
+    def to_dict(self) -> dict[str, Any]:
+        """Get the version details for the API."""
+        return {
+            "version": self.version,
+            "samples": len(self.matcher),
+            "indexed": self.matcher.index is not None,
+            "loaded_at": self.loaded_at,
+        }
+
+
+class ModelRegistry:
+    """Holds the face detector and the current model version.
+
+    Nothing is read from disk until a module first asks for it. A new version
+    is fully loaded before the current reference is replaced, and callers
+    take the current version once per batch, so predictions in flight finish
+    on the version they started with. A watcher thread polls the model file
+    and loads it again whenever any worker replaces it.
+    """
+
+    def __init__(
+        self,
+        path: Any = CLASSIFIER_PATH,
+        watch_interval: float = MODEL_WATCH_INTERVAL,
+        detector_path: Any = HAARCASCADE_PATH,
+    ) -> None:
+        self.path: Path = Path(path)
+        self.detector_path: Path = Path(detector_path)
+        self.watch_interval: float = watch_interval
+        self.version: int = 0
+        self.swaps: int = 0
+        self.last_error: str | None = None
+        self.history: list[dict[str, Any]] = []
+        self._current: ModelVersion | None = None
+        self._load_lock = threading.Lock()
+        self._watcher: threading.Thread | None = None
+        self._detector: CascadeClassifier | None = None
+        self._detector_bytes: int = 0
+        self._detector_seconds: float = 0.0
+        self._detector_lock = threading.Lock()
+
+    def face_detector(self) -> CascadeClassifier:
+        """Get the Haar cascade, loading it on first use."""
+        if self._detector is None:
+            with self._detector_lock:
+                if self._detector is None:
+                    before: int = _resident_bytes()
+                    start: float = time.perf_counter()
+                    detector = cv2.CascadeClassifier(str(self.detector_path))
+                    if detector.empty():
+                        print(
+                            "Warning: Could not load cascade classifier from "
+                            f"{self.detector_path}"
+                        )
+                    self._detector_seconds = time.perf_counter() - start
+                    self._detector_bytes = max(0, _resident_bytes() - before)
+                    self._detector = detector
+        return self._detector
+
+    def current(self) -> ModelVersion | None:
+        """Get the current version, loading the model on first use."""
+        self._ensure_watcher()
+        if self._current is None:
+            self.reload()
+        return self._current
+
+    def matcher(self) -> LBPHMatcher | None:
+        """Get the matcher of the current version, or None if not trained."""
+        current = self.current()
+        return current.matcher if current is not None else None
+
+    def reload(self) -> bool:
+        """Load the model file if it changed since the current version.
+
+        Returns whether a model is available afterwards.
+        """
+        with self._load_lock:
+            fingerprint = self._fingerprint()
+            current = self._current
+            if fingerprint is None:
+                if current is not None:
+                    print("Modelo removido; reconhecimento desativado.")
+                self._current = None
+                return False
+            if current is not None and current.fingerprint == fingerprint:
+                return True
+
+            try:
+                matcher = load_model(self.path)
+                if FACE_INDEX:
+                    matcher.index = load_face_index(matcher)
+            except (OSError, ValueError) as e:
+                self.last_error = str(e)
+                print(f"Erro ao carregar o modelo: {e}")
+                return current is not None
+
+            self.version += 1
+            version = ModelVersion(self.version, matcher, fingerprint)
+            # Replacing the reference is atomic; readers see old or new
+            self._current = version
+            if current is not None:
+                self.swaps += 1
+            self.history = (self.history + [version.to_dict()])[-VERSION_HISTORY:]
+            print(f"Modelo versão {self.version} carregado ({len(matcher)} amostras).")
+            return True
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get the current version and the recent ones."""
+        current = self._current
+        return {
+            "current": current.to_dict() if current is not None else None,
+            "swaps": self.swaps,
+            "watching": self._watcher is not None,
+            "last_error": self.last_error,
+            "history": list(self.history),
+            "memory": self.get_memory(),
+        }
+
+    def get_memory(self) -> dict[str, Any]:
+        """Get the memory held by the loaded detector and model.
+
+        The detector size is the growth of the resident set while loading it.
+        The model arrays are mapped from the model file, so the page cache
+        shares them between the workers of a host.
+        """
+        current = self._current
+        matcher = current.matcher if current is not None else None
+        index = matcher.index if matcher is not None else None
+        return {
+            "detector_loaded": self._detector is not None,
+            "detector_bytes": self._detector_bytes,
+            "detector_load_ms": round(self._detector_seconds * 1000, 1),
+            "model_bytes": _array_bytes(
+                [matcher.labels, matcher.sums, *matcher.blocks]
+                if matcher is not None
+                else []
+            ),
+            "index_bytes": _array_bytes(
+                [v for v in vars(index).values() if isinstance(v, np.ndarray)]
+                if index is not None
+                else []
+            ),
+        }
+
+    def _fingerprint(self) -> tuple[Any, ...] | None:
+        """Identify the model file (and its face index), or None if missing."""
+        model = _stat(self.path)
+        if model is None:
+            return None
+        # The index is written after the model, so it must trigger a reload too
+        return (model, _stat(FACE_INDEX_PATH)) if FACE_INDEX else (model,)
+
+    def _ensure_watcher(self) -> None:
+        """Start polling the model file on first use."""
+        if self._watcher is not None or self.watch_interval <= 0:
+            return
+        with self._load_lock:
+            if self._watcher is None:
+                self._watcher = threading.Thread(
+                    target=self._watch, name="model-watcher", daemon=True
+                )
+                self._watcher.start()
+
+    def _watch(self) -> None:
+        """Reload the model whenever its file changes."""
+        while True:
+            time.sleep(self.watch_interval)
+            current = self._current
+            fingerprint = self._fingerprint()
+            if fingerprint != (current.fingerprint if current else None):
+                self.reload()
+
+
+def _stat(path: Any) -> tuple[int, ...] | None:
+    """Inode, size and modification time of a file, or None if missing."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def _resident_bytes() -> int:
+    """Resident memory of this process, or 0 where /proc is not available."""
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _array_bytes(arrays: list[Any]) -> int:
+    """Total size of numpy arrays."""
+    return sum(int(array.nbytes) for array in arrays)
+
+
+# Shared by every module of this worker
+model_registry: ModelRegistry = ModelRegistry()
@@ -0,0 +1,155 @@
+"""Binary LBPH model files that load by memory-mapping."""
+
+import json
+import os
+import struct
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any
+
+import cv2
+import numpy as np
+
+from src.infra.config import CLASSIFIER_PATH, LEGACY_CLASSIFIER_PATH
+from src.infra.file_lock import FileLock
+from src.services.lbph_matcher import LBPHMatcher
+
+MAGIC: bytes = b"LBPHMDL1"
+# Arrays start at multiples of this many bytes, so they can be viewed in place
+ALIGNMENT: int = 64
+
+
+class _ModelLock(FileLock):
+    """Serializes every change of the model files, across threads and workers."""
+
+    def lock_path(self) -> str:
+        """Get the lock file next to the model."""
+        return f"{CLASSIFIER_PATH}.lock"
+
+
+# Held by training, enrolment and conversion while they write the model
+model_lock: FileLock = _ModelLock()
+
+
+def _aligned(offset: int) -> int:
+    """Round an offset up to the alignment."""
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def save_model(matcher: LBPHMatcher, path: Any = CLASSIFIER_PATH) -> None:
+    """Write a matcher as a binary model file.
+
+    The file holds the magic, a small JSON header and then, aligned, the
+    labels (int32), the histogram sums (float64) and the bin-major histogram
+    blocks (float32) exactly as the matcher keeps them in memory.
+    """
+    samples: int = len(matcher)
+    header: dict[str, Any] = {
+        "radius": matcher.radius,
+        "neighbors": matcher.neighbors,
+        "grid_x": matcher.grid_x,
+        "grid_y": matcher.grid_y,
+        "threshold": matcher.threshold,
+        "samples": samples,
+        "bins": matcher.bins,
+        "block_samples": matcher.block_samples,
+    }
+    # Offsets only depend on the sizes, so they are part of the header
+    start: int = _aligned(len(MAGIC) + 4 + 1024)
+    header["labels_offset"] = start
+    header["sums_offset"] = _aligned(start + 4 * samples)
+    header["blocks_offset"] = _aligned(header["sums_offset"] + 8 * samples)
+    encoded: bytes = json.dumps(header).encode()
+    if len(encoded) > 1024:
+        raise ValueError("Cabeçalho do modelo muito grande")
+
+    # A temporary file of its own, so concurrent writers never share one
+    descriptor, temporary = tempfile.mkstemp(
+        dir=Path(path).parent, prefix=f"{Path(path).name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(MAGIC + struct.pack("<I", len(encoded)) + encoded)
+            for offset, array in (
+                (header["labels_offset"], matcher.labels.astype("<i4")),
+                (header["sums_offset"], matcher.sums.astype("<f8")),
+            ):
+                file.write(b"\0" * (offset - file.tell()))
+                file.write(array.tobytes())
+            file.write(b"\0" * (header["blocks_offset"] - file.tell()))
+            for block in matcher.blocks:
+                file.write(np.ascontiguousarray(block, dtype="<f4").tobytes())
+        os.replace(temporary, path)
+    except BaseException:
+        Path(temporary).unlink(missing_ok=True)
+        raise
+
+
+def load_model(path: Any = CLASSIFIER_PATH, workers: int | None = None) -> LBPHMatcher:
+    """Map a binary model file into a matcher, without reading the histograms."""
+    data = np.memmap(path, dtype=np.uint8, mode="r")
+    if bytes(data[: len(MAGIC)]) != MAGIC:
+        raise ValueError(f"{path} não é um modelo LBPH binário")
+    (length,) = struct.unpack("<I", bytes(data[len(MAGIC) : len(MAGIC) + 4]))
+    start: int = len(MAGIC) + 4
+    header: dict[str, Any] = json.loads(bytes(data[start : start + length]))
+
+    samples: int = header["samples"]
+    bins: int = header["bins"]
+    block_samples: int = header["block_samples"]
+    labels = data[header["labels_offset"] :][: 4 * samples].view("<i4")
+    sums = data[header["sums_offset"] :][: 8 * samples].view("<f8")
+    blocks = []
+    offset: int = header["blocks_offset"]
+    for first in range(0, samples, block_samples):
+        count: int = min(block_samples, samples - first)
+        size: int = 4 * bins * count
+        blocks.append(data[offset : offset + size].view("<f4").reshape(bins, count))
+        offset += size
+
+    return LBPHMatcher.from_blocks(
+        blocks,
+        labels,
+        sums,
+        block_samples=block_samples,
+        radius=header["radius"],
+        neighbors=header["neighbors"],
+        grid_x=header["grid_x"],
+        grid_y=header["grid_y"],
+        threshold=header["threshold"],
+        workers=workers,
+    )
+
+
+def convert_yaml_model(
+    yaml_path: Any = LEGACY_CLASSIFIER_PATH, path: Any = CLASSIFIER_PATH
+) -> int:
+    """Convert a model written by LBPHFaceRecognizer.write, returning its samples."""
+    recognizer = cv2.face.LBPHFaceRecognizer_create()
+    recognizer.read(str(yaml_path))
+    matcher = LBPHMatcher.from_recognizer(recognizer, workers=1)
+    save_model(matcher, path)
+    return len(matcher)
+
+
+def convert_legacy_model() -> bool:
+    """Convert the YAML model of older versions if there is no binary model yet.
+
+    Every worker calls this at startup; the first to take the model lock
+    converts and the others find the binary model already written.
+    """
+    with model_lock:
+        if CLASSIFIER_PATH.exists() or not LEGACY_CLASSIFIER_PATH.exists():
+            return False
+        samples: int = convert_yaml_model(LEGACY_CLASSIFIER_PATH, CLASSIFIER_PATH)
+    print(f"Modelo YAML convertido para {CLASSIFIER_PATH} ({samples} amostras).")
+    return True
+
+
+if __name__ == "__main__":
+    # python -m src.services.model_store [classifierLBPH.yml] [classifierLBPH.bin]
+    arguments = sys.argv[1:]
+    source = arguments[0] if arguments else LEGACY_CLASSIFIER_PATH
+    target = arguments[1] if len(arguments) > 1 else CLASSIFIER_PATH
+    print(f"{convert_yaml_model(source, target)} amostras convertidas para {target}")
@@ -0,0 +1,132 @@
+"""Frame differencing gate that skips face detection on static scenes."""
+
+import threading
+import time
+from typing import Any
+
+import cv2
+import numpy as np
+from numpy.typing import NDArray
+
+from src.infra.config import (
+    MOTION_GATE,
+    MOTION_LEARNING_RATE,
+    MOTION_MIN_AREA,
+    MOTION_REFRESH_SECONDS,
+    MOTION_THRESHOLD,
+    MOTION_WIDTH,
+)
+from src.services.face_detection import Box
+
+
+class MotionGate:
+    """Finds the region of a frame that changed against a running background."""
+
+    def __init__(
+        self,
+        enabled: bool = MOTION_GATE,
+        width: int = MOTION_WIDTH,
+        threshold: int = MOTION_THRESHOLD,
+        min_area: float = MOTION_MIN_AREA,
+        learning_rate: float = MOTION_LEARNING_RATE,
+        refresh_seconds: float = MOTION_REFRESH_SECONDS,
+    ) -> None:
+        self.enabled: bool = enabled
+        self.width: int = width
+        self.threshold: int = threshold
+        self.min_area: float = min_area
+        self.learning_rate: float = learning_rate
+        self.refresh_seconds: float = refresh_seconds
+        self.frames: int = 0
+        self.skipped: int = 0
+        self.limited: int = 0
+        self.refreshed: int = 0
+        # When a frame was last reported as changed
+        self._checked_at: float = 0.0
+        # Output of the last processed frame, reused while the scene is static
+        self.idle_payload: bytes | None = None
+        self._background: NDArray[np.float32] | None = None
+
+    def check(self, frame: NDArray[Any]) -> Box | None:
+        """Get the region of the frame that changed, or None if it is static.
+
+        A static frame is reported as changed in full once refresh_seconds
+        passed since the last changed one, so a slow drift the background
+        keeps learning still refreshes the output now and then.
+        """
+        height, width = frame.shape[:2]
+        full_frame: Box = (0, 0, width, height)
+        self.frames += 1
+        if not self.enabled:
+            return full_frame
+
+        scale: float = min(1.0, self.width / width)
+        small = cv2.resize(
+            frame,
+            (max(1, round(width * scale)), max(1, round(height * scale))),
+            interpolation=cv2.INTER_AREA,
+        )
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        small = cv2.GaussianBlur(small, (5, 5), 0)
+
+        now: float = time.monotonic()
+        if self._background is None or self._background.shape != small.shape:
+            self._background = small.astype(np.float32)
+            self._checked_at = now
+            return full_frame
+
+        difference = cv2.absdiff(small, cv2.convertScaleAbs(self._background))
+        cv2.accumulateWeighted(small, self._background, self.learning_rate)
+        _, mask = cv2.threshold(difference, self.threshold, 255, cv2.THRESH_BINARY)
+
+        if cv2.countNonZero(mask) < self.min_area * mask.size:
+            if now - self._checked_at < self.refresh_seconds:
+                self.skipped += 1
+                return None
+            self.refreshed += 1
+            self._checked_at = now
+            return full_frame
+
+        self._checked_at = now
+        x, y, w, h = cv2.boundingRect(mask)
+        # Pad the moving area so a face at its edge is fully inside
+        pad: int = max(w, h) // 4 + 2
+        x0: int = max(0, int((x - pad) / scale))
+        y0: int = max(0, int((y - pad) / scale))
+        x1: int = min(width, int((x + w + pad) / scale) + 1)
+        y1: int = min(height, int((y + h + pad) / scale) + 1)
+        region: Box = (x0, y0, x1 - x0, y1 - y0)
+        if region != full_frame:
+            self.limited += 1
+        return region
+
+
+# Gates of the live streams, keyed by camera id and output profile
+_gates: dict[tuple[int, str], MotionGate] = {}
+_gates_lock = threading.Lock()
+
+
+def get_motion_gate(camera_id: int, profile: str) -> MotionGate:
+    """Get the shared motion gate of a camera stream."""
+    with _gates_lock:
+        return _gates.setdefault((camera_id, profile), MotionGate())
+
+
+def get_motion_stats() -> list[dict[str, Any]]:
+    """Get how many frames of each live stream were skipped as static."""
+    with _gates_lock:
+        return [
+            {
+                "camera_id": camera_id,
+                "profile": profile,
+                "frames": gate.frames,
+                "skipped": gate.skipped,
+                "limited": gate.limited,
+                "refreshed": gate.refreshed,
+                "skip_ratio": round(gate.skipped / gate.frames, 3)
+                if gate.frames
+                else 0.0,
+            }
+            for (camera_id, profile), gate in _gates.items()
+        ]
@@ -0,0 +1,123 @@
+"""Plain video streams that relay the camera's own JPEG frames to the viewers."""
+
+import asyncio
+from collections.abc import AsyncGenerator, Callable
+
+import cv2
+from cv2 import VideoCapture
+
+from src.entities.models import Camera
+from src.infra.config import (
+    CAMERA_NOT_FOUND_IMAGE,
+    CAMERA_STREAM_URLS,
+    PASSTHROUGH,
+    get_ip_camera_url,
+    get_raw_capture,
+)
+from src.services.capture_hub import CaptureSubscription, subscribe
+from src.services.frame_cache import next_shared_frame
+from src.services.processing import encode_frame
+
+# Frame cache profile of the plain streams of non-MJPEG cameras
+PROFILE: str = "video"
+
+MJPEG_FOURCC: int = cv2.VideoWriter_fourcc(*"MJPG")
+JPEG_START: bytes = b"\xff\xd8"
+
+# Whether each camera delivered MJPEG when it was last opened in raw mode
+_mjpeg_cameras: dict[int, bool] = {}
+
+
+def camera_stream_url(camera: Camera) -> str:
+    """Get the URL relayed for a camera, its RTSP one unless configured."""
+    return CAMERA_STREAM_URLS.get(camera.camera_id) or get_ip_camera_url(
+        camera.user, camera.password, camera.camera_ip
+    )
+
+
+def open_mjpeg_capture(camera_id: int, url: str) -> VideoCapture | None:
+    """Open a camera in raw mode, or None if it does not deliver MJPEG."""
+    capture = get_raw_capture(url)
+    if not capture.isOpened():
+        capture.release()
+        return None
+
+    mjpeg: bool = int(capture.get(cv2.CAP_PROP_FOURCC)) == MJPEG_FOURCC
+    # Cameras with other codecs are not opened in raw mode again
+    _mjpeg_cameras[camera_id] = mjpeg
+    if not mjpeg:
+        capture.release()
+        return None
+    return capture
+
+
+def _multipart(jpeg: bytes) -> bytes:
+    """Wrap a JPEG image in a multipart frame."""
+    return b"--frame\r\nContent-Type: image/jpeg\r\n\r\n" + jpeg + b"\r\n"
+
+
+async def _relay(camera_capture: CaptureSubscription) -> AsyncGenerator[bytes, None]:
+    """Forward every new JPEG packet of a raw subscription."""
+    while True:
+        connected, packet = camera_capture.read(copy=False)
+        if not connected:
+            await asyncio.sleep(0.01)
+            continue
+
+        jpeg: bytes = packet.tobytes()
+        if jpeg.startswith(JPEG_START):
+            yield _multipart(jpeg)
+        await asyncio.sleep(0.01)
+
+
+async def _encode(camera_capture: CaptureSubscription) -> AsyncGenerator[bytes, None]:
+    """Encode the decoded frames, once per frame for every viewer."""
+    while True:
+        try:
+            payload = await next_shared_frame(camera_capture, PROFILE, encode_frame)
+        except Exception as e:
+            print(f"Error in video stream: {e}")
+            await asyncio.sleep(0.01)
+            continue
+
+        if payload is None:
+            await asyncio.sleep(0.01)
+            continue
+
+        yield payload
+        await asyncio.sleep(0.01)
+
+
+async def stream_plain_video(
+    camera_id: int,
+    open_capture: Callable[[], VideoCapture | None],
+    url: str | None = None,
+) -> AsyncGenerator[bytes, None]:
+    """Stream a camera as it is, without detection or overlays.
+
+    When the camera at url delivers MJPEG, its JPEG frames are relayed as they
+    arrive: nothing is decoded or encoded, and every viewer shares one raw
+    reader. Otherwise the frames of open_capture are encoded without
+    annotations, once per frame whatever the number of viewers.
+    """
+    camera_capture: CaptureSubscription | None = None
+    relayed: bool = False
+    if PASSTHROUGH and url is not None and _mjpeg_cameras.get(camera_id, True):
+        camera_capture = subscribe(
+            camera_id, lambda: open_mjpeg_capture(camera_id, url), raw=True
+        )
+        relayed = camera_capture is not None
+    if camera_capture is None:
+        camera_capture = subscribe(camera_id, open_capture)
+    if camera_capture is None:
+        image = cv2.imread(str(CAMERA_NOT_FOUND_IMAGE))
+        if image is not None:
+            yield encode_frame(image)
+        return
+
+    try:
+        frames = _relay(camera_capture) if relayed else _encode(camera_capture)
+        async for payload in frames:
+            yield payload
+    finally:
+        camera_capture.release()
@@ -7,7 +7,7 @@ from typing import Any
 
 import cv2
 import numpy as np
-from cv2 import CascadeClassifier, VideoCapture
+from numpy.typing import NDArray
 from sqlalchemy.orm import Session
 
 from src.entities.models import Camera
@@ -15,29 +15,32 @@ from src.entities.schemas import CreateAndUpdatePerson
 from src.infra.config import (
     CAMERA_NOT_FOUND_IMAGE,
     CAMERA_OFF_IMAGE,
-    HAARCASCADE_PATH,
-    PICTURES_DIR,
     USE_WEBCAM_FALLBACK,
     get_ip_camera_capture,
     get_webcam_capture,
 )
 from src.repositories.camera_repository import CameraNotFound, get_camera_by_id
+from src.repositories.control_channel import get_capture_flag
 from src.repositories.controller_repository import (
     get_controller_by_id,
     reset_capture_flag,
 )
 from src.repositories.person_repository import create_person, get_all_persons
+from src.services.capture_hub import (
+    WEBCAM_CAMERA_ID,
+    CaptureSubscription,
+    subscribe,
+)
+from src.services.face_dataset import face_dataset
+from src.services.model_registry import model_registry
+from src.services.processing import encode_frame, run_in_pool
+from src.services.training_jobs import training_jobs
 
 # Face detection parameters
 SCALE_FACTOR: float = 1.1
 MIN_NEIGHBORS: int = 5
 MIN_SIZE: tuple[int, int] = (60, 60)
 
-# Classifier setup
-classifier: CascadeClassifier = cv2.CascadeClassifier(str(HAARCASCADE_PATH))
-if classifier.empty():
-    print(f"Warning: Could not load cascade classifier from {HAARCASCADE_PATH}")
-
 font: int = cv2.FONT_HERSHEY_COMPLEX_SMALL
 width: int = 220
 height: int = 220
@@ -53,11 +56,11 @@ def getNextID(session: Session) -> int:
 
 def _get_camera_capture(
     session: Session, camera_id: int
-) -> tuple[VideoCapture | None, bool, Camera | None]:
-    """Get camera capture object."""
+) -> tuple[CaptureSubscription | None, bool, Camera | None]:
+    """Subscribe to the camera capture through the capture hub."""
     camera: Camera | None = None
     use_webcam: bool = False
-    cameraIP: VideoCapture | None = None
+    cameraIP: CaptureSubscription | None = None
 
     try:
         camera = get_camera_by_id(session=session, _id=camera_id)
@@ -65,18 +68,27 @@ def _get_camera_capture(
         camera = None
 
     if camera is not None:
-        cameraIP = get_ip_camera_capture(camera.user, camera.password, camera.camera_ip)
-        if not cameraIP.isOpened():
-            cameraIP.release()
-            cameraIP = None
+        cameraIP = subscribe(
+            camera.camera_id,
+            lambda: get_ip_camera_capture(
+                camera.user, camera.password, camera.camera_ip
+            ),
+        )
 
     if cameraIP is None and USE_WEBCAM_FALLBACK:
-        cameraIP = get_webcam_capture()
+        cameraIP = subscribe(WEBCAM_CAMERA_ID, get_webcam_capture)
         use_webcam = True
 
     return cameraIP, use_webcam, camera
 
 
+def _discard_unregistered_faces(person_id: int) -> None:
+    """Drop the faces a capture that never finished left under a person id."""
+    removed: int = face_dataset.remove_person(person_id)
+    if removed:
+        print(f"Discarded {removed} faces of unregistered person {person_id}")
+
+
 def _yield_error_image(image_path: Any) -> bytes | None:
     """Generate error image frame."""
     try:
@@ -140,14 +152,201 @@ def reset_capture_state() -> None:
     }
 
 
+def _process_session_frame(frame: NDArray[Any]) -> bytes:
+    """Annotate a frame for the manual capture session and save requested shots."""
+    gray_image = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    detected_faces = model_registry.face_detector().detectMultiScale(
+        gray_image,
+        scaleFactor=SCALE_FACTOR,
+        minNeighbors=MIN_NEIGHBORS,
+        minSize=MIN_SIZE,
+    )
+
+    luminosity: int = int(np.average(gray_image))
+    num_faces: int = len(detected_faces)
+
+    person_name: str = capture_state.get("person_name") or "---"
+    samples: int = capture_state.get("samples_captured", 0)
+    max_samples: int = capture_state.get("max_samples", 20)
+    person_id: int = capture_state.get("person_id", 0)
+    is_active: bool = capture_state.get("is_active", False)
+
+    status_text = (
+        f"Fotos: {samples}/{max_samples} | Lum: {luminosity} | Faces: {num_faces}"
+    )
+    cv2.putText(frame, status_text, (10, 30), font, 1, (0, 255, 0), 2)
+
+    if is_active and person_name:
+        cv2.putText(
+            frame,
+            f"Pessoa: {person_name}",
+            (10, 60),
+            font,
+            1,
+            (255, 255, 0),
+            2,
+        )
+
+    if not is_active:
+        cv2.putText(
+            frame,
+            "Inicie uma sessao em /captura/iniciar/{nome}",
+            (10, 60),
+            font,
+            0.8,
+            (0, 255, 255),
+            1,
+        )
+
+    for x, y, w, h in detected_faces:
+        color = (0, 255, 0) if is_active else (255, 165, 0)
+        cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
+
+        if person_name and person_name != "---":
+            cv2.putText(frame, person_name, (x, y - 10), font, 1, color, 2)
+
+        if capture_state["should_capture"] and is_active and samples < max_samples:
+            if luminosity >= 60:
+                face_image = cv2.resize(
+                    gray_image[y : y + h, x : x + w], (width, height)
+                )
+                face_dataset.append(person_id, samples + 1, face_image)
+                capture_state["samples_captured"] += 1
+                capture_state["should_capture"] = False
+
+                cv2.rectangle(frame, (x, y), (x + w, y + h), (255, 255, 255), 4)
+                print(f"Captured: person.{person_id}.{samples + 1}")
+            else:
+                capture_state["should_capture"] = False
+
+    return encode_frame(frame)
+
+
+def _process_auto_capture_frame(
+    frame: NDArray[Any],
+    person_id: int,
+    person_name: str,
+    samples: int,
+    samples_number: int,
+    last_capture_time: float,
+    capture_interval: float,
+    min_luminosity: int,
+) -> tuple[bytes, int, float]:
+    """Annotate a frame and save face crops at the capture interval.
+
+    Returns the encoded frame, the updated sample count and last capture time.
+    """
+    gray_image = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    detected_faces = model_registry.face_detector().detectMultiScale(
+        gray_image,
+        scaleFactor=SCALE_FACTOR,
+        minNeighbors=MIN_NEIGHBORS,
+        minSize=MIN_SIZE,
+    )
+
+    current_time: float = time.time()
+    luminosity: int = int(np.average(gray_image))
+    num_faces: int = len(detected_faces)
+
+    cv2.putText(
+        frame,
+        f"Capturadas: {samples}/{samples_number} | Lum: {luminosity} | Faces: {num_faces}",
+        (10, 30),
+        font,
+        1,
+        (0, 255, 0),
+        2,
+    )
+
+    for x, y, w, h in detected_faces:
+        cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+        cv2.putText(
+            frame,
+            person_name,
+            (x, y - 10),
+            font,
+            1,
+            (0, 255, 0),
+            2,
+        )
+
+        if (current_time - last_capture_time) >= capture_interval:
+            if luminosity >= min_luminosity:
+                face_image = cv2.resize(
+                    gray_image[y : y + h, x : x + w], (width, height)
+                )
+                face_dataset.append(person_id, samples + 1, face_image)
+                samples += 1
+                last_capture_time = current_time
+
+                cv2.rectangle(frame, (x, y), (x + w, y + h), (255, 255, 255), 4)
+
+    return encode_frame(frame), samples, last_capture_time
+
+
+def _process_flag_capture_frame(
+    frame: NDArray[Any],
+    person_id: int,
+    person_name: str,
+    samples: int,
+    samples_number: int,
+    save_picture: bool,
+) -> tuple[bytes, int]:
+    """Annotate a frame and save face crops while the capture flag is set.
+
+    Returns the encoded frame and the updated sample count.
+    """
+    gray_image = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    detected_faces = model_registry.face_detector().detectMultiScale(
+        gray_image,
+        scaleFactor=SCALE_FACTOR,
+        minNeighbors=MIN_NEIGHBORS,
+        minSize=MIN_SIZE,
+    )
+
+    luminosity: int = int(np.average(gray_image))
+    num_faces: int = len(detected_faces)
+
+    cv2.putText(
+        frame,
+        f"Fotos: {samples - 1}/{samples_number} | Lum: {luminosity} | Faces: {num_faces}",
+        (10, 30),
+        font,
+        1,
+        (0, 255, 0),
+        2,
+    )
+
+    for x, y, w, h in detected_faces:
+        cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 0, 255), 2)
+        cv2.putText(
+            frame,
+            f"{person_name}",
+            (x, y - 10),
+            font,
+            1,
+            (0, 0, 255),
+        )
+
+        if save_picture and luminosity > 80:
+            face_image = cv2.resize(gray_image[y : y + h, x : x + w], (width, height))
+            face_dataset.append(person_id, samples, face_image)
+            samples += 1
+            cv2.rectangle(frame, (x, y), (x + w, y + h), (255, 255, 255), 4)
+
+    return encode_frame(frame), samples
+
+
 async def stream_video_only(camera_id: int = 0) -> AsyncGenerator[bytes, None]:
     """Stream video with face detection without database dependency."""
-    cameraIP: VideoCapture = get_webcam_capture()
+    cameraIP: CaptureSubscription | None = subscribe(
+        WEBCAM_CAMERA_ID, get_webcam_capture
+    )
 
     if camera_id > 0:
         pass
 
-    if cameraIP is None or not cameraIP.isOpened():
+    if cameraIP is None:
         error_frame = _yield_error_image(CAMERA_NOT_FOUND_IMAGE)
         if error_frame:
             yield error_frame
@@ -161,86 +360,7 @@ async def stream_video_only(camera_id: int = 0) -> AsyncGenerator[bytes, None]:
                 continue
 
             try:
-                gray_image = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                detected_faces = classifier.detectMultiScale(
-                    gray_image,
-                    scaleFactor=SCALE_FACTOR,
-                    minNeighbors=MIN_NEIGHBORS,
-                    minSize=MIN_SIZE,
-                )
-
-                luminosity: int = int(np.average(gray_image))
-                num_faces: int = len(detected_faces)
-
-                person_name: str = capture_state.get("person_name") or "---"
-                samples: int = capture_state.get("samples_captured", 0)
-                max_samples: int = capture_state.get("max_samples", 20)
-                person_id: int = capture_state.get("person_id", 0)
-                is_active: bool = capture_state.get("is_active", False)
-
-                status_text = f"Fotos: {samples}/{max_samples} | Lum: {luminosity} | Faces: {num_faces}"
-                cv2.putText(frame, status_text, (10, 30), font, 1, (0, 255, 0), 2)
-
-                if is_active and person_name:
-                    cv2.putText(
-                        frame,
-                        f"Pessoa: {person_name}",
-                        (10, 60),
-                        font,
-                        1,
-                        (255, 255, 0),
-                        2,
-                    )
-
-                if not is_active:
-                    cv2.putText(
-                        frame,
-                        "Inicie uma sessao em /captura/iniciar/{nome}",
-                        (10, 60),
-                        font,
-                        0.8,
-                        (0, 255, 255),
-                        1,
-                    )
-
-                for x, y, w, h in detected_faces:
-                    color = (0, 255, 0) if is_active else (255, 165, 0)
-                    cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
-
-                    if person_name and person_name != "---":
-                        cv2.putText(frame, person_name, (x, y - 10), font, 1, color, 2)
-
-                    if (
-                        capture_state["should_capture"]
-                        and is_active
-                        and samples < max_samples
-                    ):
-                        if luminosity >= 60:
-                            face_image = cv2.resize(
-                                gray_image[y : y + h, x : x + w], (width, height)
-                            )
-                            image_path = (
-                                PICTURES_DIR / f"person.{person_id}.{samples + 1}.jpg"
-                            )
-                            cv2.imwrite(str(image_path), face_image)
-                            capture_state["samples_captured"] += 1
-                            capture_state["should_capture"] = False
-
-                            cv2.rectangle(
-                                frame, (x, y), (x + w, y + h), (255, 255, 255), 4
-                            )
-                            print(f"Captured: {image_path}")
-                        else:
-                            capture_state["should_capture"] = False
-
-                _, encodedImage = cv2.imencode(".jpg", frame)
-                yield (
-                    b"--frame\r\n"
-                    b"Content-Type: image/jpeg\r\n\r\n"
-                    + bytearray(encodedImage)
-                    + b"\r\n"
-                )
-
+                yield await run_in_pool(_process_session_frame, frame)
                 await asyncio.sleep(0.01)
 
             except Exception as e:
@@ -263,10 +383,12 @@ async def stream_pictures_capture_auto(
     last_capture_time: float = 0
 
     person_id: int = getNextID(session)
+    # The id is not registered yet, so any faces under it are from an aborted capture
+    _discard_unregistered_faces(person_id)
 
-    cameraIP, use_webcam, camera = _get_camera_capture(session, camera_id)
+    cameraIP, _use_webcam, _camera = _get_camera_capture(session, camera_id)
 
-    if cameraIP is None or not cameraIP.isOpened():
+    if cameraIP is None:
         error_frame = _yield_error_image(CAMERA_NOT_FOUND_IMAGE)
         if error_frame:
             yield error_frame
@@ -280,63 +402,18 @@ async def stream_pictures_capture_auto(
                 continue
 
             try:
-                gray_image = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                detected_faces = classifier.detectMultiScale(
-                    gray_image,
-                    scaleFactor=SCALE_FACTOR,
-                    minNeighbors=MIN_NEIGHBORS,
-                    minSize=MIN_SIZE,
-                )
-
-                current_time: float = time.time()
-                luminosity: int = int(np.average(gray_image))
-                num_faces: int = len(detected_faces)
-
-                cv2.putText(
+                payload, samples, last_capture_time = await run_in_pool(
+                    _process_auto_capture_frame,
                     frame,
-                    f"Capturadas: {samples}/{samples_number} | Lum: {luminosity} | Faces: {num_faces}",
-                    (10, 30),
-                    font,
-                    1,
-                    (0, 255, 0),
-                    2,
-                )
-
-                for x, y, w, h in detected_faces:
-                    cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
-                    cv2.putText(
-                        frame,
-                        person_name,
-                        (x, y - 10),
-                        font,
-                        1,
-                        (0, 255, 0),
-                        2,
-                    )
-
-                    if (current_time - last_capture_time) >= capture_interval:
-                        if luminosity >= min_luminosity:
-                            face_image = cv2.resize(
-                                gray_image[y : y + h, x : x + w], (width, height)
-                            )
-                            image_path = (
-                                PICTURES_DIR / f"person.{person_id}.{samples + 1}.jpg"
-                            )
-                            cv2.imwrite(str(image_path), face_image)
-                            samples += 1
-                            last_capture_time = current_time
-
-                            cv2.rectangle(
-                                frame, (x, y), (x + w, y + h), (255, 255, 255), 4
-                            )
-
-                _, encodedImage = cv2.imencode(".jpg", frame)
-                yield (
-                    b"--frame\r\n"
-                    b"Content-Type: image/jpeg\r\n\r\n"
-                    + bytearray(encodedImage)
-                    + b"\r\n"
+                    person_id,
+                    person_name,
+                    samples,
+                    samples_number,
+                    last_capture_time,
+                    capture_interval,
+                    min_luminosity,
                 )
+                yield payload
 
                 await asyncio.sleep(0.01)
 
@@ -345,6 +422,12 @@ async def stream_pictures_capture_auto(
 
     finally:
         cameraIP.release()
+        if samples < samples_number:
+            _discard_unregistered_faces(person_id)
+
+    # Register the person before anything else is sent to the client
+    person = CreateAndUpdatePerson(person_id=person_id, name=person_name)
+    create_person(session=session, person_info=person)
 
     # Show completion message
     try:
@@ -369,7 +452,7 @@ async def stream_pictures_capture_auto(
         )
         cv2.putText(
             completion_frame,
-            "Execute /treinamento para treinar o modelo",
+            "Adicionando ao modelo de reconhecimento...",
             (50, 300),
             font,
             1,
@@ -385,10 +468,7 @@ async def stream_pictures_capture_auto(
     except Exception as e:
         print(f"Error showing completion: {e}")
 
-    # Register person in database
-    if samples > 0:
-        person = CreateAndUpdatePerson(person_id=person_id, name=person_name)
-        create_person(session=session, person_info=person)
+    training_jobs.submit_enrollment(person_id)
 
 
 async def stream_pictures_capture(
@@ -400,15 +480,17 @@ async def stream_pictures_capture(
     controller = None
 
     person_id: int = getNextID(session)
+    # The id is not registered yet, so any faces under it are from an aborted capture
+    _discard_unregistered_faces(person_id)
 
     try:
         controller = get_controller_by_id(session=session, _id=1)
     except Exception as e:
         print(f"Controller not found: {e}")
 
-    cameraIP, use_webcam, camera = _get_camera_capture(session, camera_id)
+    cameraIP, _use_webcam, _camera = _get_camera_capture(session, camera_id)
 
-    if cameraIP is None or not cameraIP.isOpened():
+    if cameraIP is None:
         error_frame = _yield_error_image(CAMERA_NOT_FOUND_IMAGE)
         if error_frame:
             yield error_frame
@@ -422,80 +504,36 @@ async def stream_pictures_capture(
                 continue
 
             try:
-                gray_image = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                detected_faces = classifier.detectMultiScale(
-                    gray_image,
-                    scaleFactor=SCALE_FACTOR,
-                    minNeighbors=MIN_NEIGHBORS,
-                    minSize=MIN_SIZE,
-                )
-
-                luminosity: int = int(np.average(gray_image))
-                num_faces: int = len(detected_faces)
-
-                cv2.putText(
+                previous_samples: int = samples
+                payload, samples = await run_in_pool(
+                    _process_flag_capture_frame,
                     frame,
-                    f"Fotos: {samples - 1}/{samples_number} | Lum: {luminosity} | Faces: {num_faces}",
-                    (10, 30),
-                    font,
-                    1,
-                    (0, 255, 0),
-                    2,
-                )
-
-                for x, y, w, h in detected_faces:
-                    cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 0, 255), 2)
-                    cv2.putText(
-                        frame,
-                        f"{person_name}",
-                        (x, y - 10),
-                        font,
-                        1,
-                        (0, 0, 255),
-                    )
-
-                    if controller and controller.save_picture == 1:
-                        if luminosity > 80:
-                            face_image = cv2.resize(
-                                gray_image[y : y + h, x : x + w], (width, height)
-                            )
-                            image_path = (
-                                PICTURES_DIR / f"person.{person_id}.{samples}.jpg"
-                            )
-                            cv2.imwrite(str(image_path), face_image)
-                            samples += 1
-                            reset_capture_flag(session, 1)
-                            cv2.rectangle(
-                                frame, (x, y), (x + w, y + h), (255, 255, 255), 4
-                            )
-
-                _, encodedImage = cv2.imencode(".jpg", frame)
-                yield (
-                    b"--frame\r\n"
-                    b"Content-Type: image/jpeg\r\n\r\n"
-                    + bytearray(encodedImage)
-                    + b"\r\n"
+                    person_id,
+                    person_name,
+                    samples,
+                    samples_number,
+                    bool(controller and get_capture_flag(1) == 1),
                 )
+                if samples > previous_samples:
+                    reset_capture_flag(session, 1)
+                yield payload
 
                 await asyncio.sleep(0.01)
 
             except Exception as e:
                 print(f"Error in capture: {e}")
 
-            if controller:
-                try:
-                    session.refresh(controller)
-                    controller = get_controller_by_id(session=session, _id=1)
-                except Exception:
-                    pass
-
     finally:
         cameraIP.release()
+        if samples <= samples_number:
+            _discard_unregistered_faces(person_id)
+
+    # Register the person before anything else is sent to the client
+    person = CreateAndUpdatePerson(person_id=person_id, name=person_name)
+    create_person(session=session, person_info=person)
 
     completion_frame = _yield_error_image(CAMERA_OFF_IMAGE)
     if completion_frame:
         yield completion_frame
 
-    if samples > 1:
-        person = CreateAndUpdatePerson(person_id=person_id, name=person_name)
-        create_person(session=session, person_info=person)
+    training_jobs.submit_enrollment(person_id)
@@ -0,0 +1,40 @@
+"""Bounded executor for CPU-heavy OpenCV work outside the event loop."""
+
+import asyncio
+import functools
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+
+import cv2
+
+from src.infra.config import PROCESSING_MAX_PENDING, PROCESSING_WORKERS
+
+T = TypeVar("T")
+
+# OpenCV releases the GIL in detectMultiScale, predict and imencode, so a
+# thread pool gives real parallelism without copying frames between processes.
+_executor = ThreadPoolExecutor(
+    max_workers=PROCESSING_WORKERS, thread_name_prefix="frame-processing"
+)
+
+# Limits how many frames may wait for the pool; extra callers await a slot
+_pending = asyncio.Semaphore(PROCESSING_WORKERS + PROCESSING_MAX_PENDING)
+
+
+async def run_in_pool(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking function in the processing pool and await its result."""
+    async with _pending:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _executor, functools.partial(func, *args, **kwargs)
+        )
+
+
+def encode_frame(image: Any) -> bytes:
+    """Encode an image as a multipart JPEG frame."""
+    _, encodedImage = cv2.imencode(".jpg", image)
+    return (
+        b"--frame\r\n"
+        b"Content-Type: image/jpeg\r\n\r\n" + bytearray(encodedImage) + b"\r\n"
+    )
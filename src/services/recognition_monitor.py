@@ -0,0 +1,364 @@
+"""Headless face recognition on every camera that is on."""
+
+import functools
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+import cv2
+from cv2 import VideoCapture
+from numpy.typing import NDArray
+from sqlalchemy.orm import Session
+
+from src.entities.models import Camera, CameraStatus
+from src.infra.config import (
+    MONITOR_RESCAN_INTERVAL,
+    RECOGNITION_MAX_DISTANCE,
+    get_detection_width,
+    get_ip_camera_capture,
+    get_monitor_fps,
+)
+from src.repositories.person_directory import get_person_name
+from src.repositories.sighting_repository import sighting_writer
+from src.services.capture_hub import subscribe
+from src.services.face_detection import Box, detect_faces
+from src.services.face_tracking import FaceTracker, get_tracker
+from src.services.model_registry import model_registry
+from src.services.motion_gate import MotionGate, get_motion_gate
+from src.services.recognition_service import recognition_service
+
+# Profile of the trackers and motion gates used by the monitor
+PROFILE: str = "monitoramento"
+
+width: int = 220
+height: int = 220
+
+
+def _predict_face(gray_image: NDArray[Any], box: Box) -> tuple[int, float]:
+    """Recognize the face inside a box of a grayscale frame."""
+    x, y, w, h = box
+    face_image = cv2.resize(gray_image[y : y + h, x : x + w], (width, height))
+    return recognition_service.predict(face_image)
+
+
+def _detect_faces(
+    gray_image: NDArray[Any],
+    detection_width: int | None = None,
+    region: Box | None = None,
+) -> list[Box]:
+    """Run the Haar cascade on a grayscale frame."""
+    return detect_faces(
+        model_registry.face_detector(),
+        gray_image,
+        detection_width,
+        scale_factor=1.1,
+        min_neighbors=5,
+        min_size=(60, 60),
+        region=region,
+    )
+
+
+class CameraMonitor:
+    """Recognizes the faces of one camera in a background thread.
+
+    Frames come from the shared capture hub, so a camera that is also being
+    streamed is only read once. At most fps frames are processed per second
+    (0 is uncapped), and nothing is drawn or encoded: the faces of the last
+    processed frame are kept for the API and the metadata streams.
+    """
+
+    def __init__(
+        self,
+        camera_id: int,
+        open_capture: Callable[[], VideoCapture | None],
+        fps: float,
+    ) -> None:
+        self.camera_id: int = camera_id
+        self.open_capture: Callable[[], VideoCapture | None] = open_capture
+        self.fps: float = fps
+        self.frames: int = 0
+        self.processed: int = 0
+        self.errors: int = 0
+        self.last_error: str | None = None
+        # Result of the last processed frame, replaced as a whole
+        self.latest: dict[str, Any] | None = None
+        self.started_at: float = time.time()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name=f"monitor-{camera_id}", daemon=True
+        )
+
+    @property
+    def running(self) -> bool:
+        """Whether the monitor thread is still running."""
+        return self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start recognizing in the background."""
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Ask the thread to stop; the camera is released by the thread."""
+        self._stop.set()
+
+    def _run(self) -> None:
+        """Process the latest frame of the camera at most fps times a second."""
+        subscription = subscribe(self.camera_id, self.open_capture)
+        if subscription is None:
+            self.last_error = "Câmera não encontrada"
+            print(f"Monitor: camera {self.camera_id} could not be opened")
+            return
+
+        tracker = get_tracker(self.camera_id, PROFILE)
+        gate = get_motion_gate(self.camera_id, PROFILE)
+        detection_width = get_detection_width(self.camera_id)
+        try:
+            while not self._stop.is_set():
+                started: float = time.monotonic()
+                # Frames are only read, so they can be shared with the streams
+                connected, frame = subscription.read(copy=False)
+                if not connected:
+                    self._stop.wait(0.01)
+                    continue
+
+                self.frames += 1
+                try:
+                    self._process(frame, tracker, gate, detection_width)
+                except Exception as e:
+                    self.errors += 1
+                    self.last_error = str(e)
+                    print(f"Monitor error on camera {self.camera_id}: {e}")
+
+                if self.fps > 0:
+                    elapsed: float = time.monotonic() - started
+                    self._stop.wait(max(0.0, 1 / self.fps - elapsed))
+        finally:
+            subscription.release()
+
+    def _process(
+        self,
+        frame: NDArray[Any],
+        tracker: FaceTracker,
+        gate: MotionGate,
+        detection_width: int | None,
+    ) -> None:
+        """Detect and recognize the faces of a frame."""
+        region: Box | None = gate.check(frame)
+        # Static scene: the faces of the last processed frame still hold
+        if region is None and self.processed:
+            return
+        if model_registry.matcher() is None:
+            self.last_error = "Modelo não treinado"
+            return
+
+        gray_image = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        detect = functools.partial(
+            _detect_faces, detection_width=detection_width, region=region
+        )
+        faces: list[dict[str, Any]] = []
+        frame_time: float = time.time()
+        for track in tracker.update(gray_image, detect, region):
+            person_id, trust = tracker.identify(
+                track, functools.partial(_predict_face, gray_image, track.box)
+            )
+            if person_id >= 0 and trust < RECOGNITION_MAX_DISTANCE:
+                sighting_writer.record(
+                    person_id, self.camera_id, trust, track.box, at=frame_time
+                )
+            faces.append(
+                {
+                    "track_id": track.track_id,
+                    "person_id": person_id,
+                    "name": get_person_name(person_id) or "Desconhecido",
+                    "confidence": round(float(trust), 2),
+                    "box": [int(value) for value in track.box],
+                }
+            )
+        frame_height, frame_width = frame.shape[:2]
+        self.latest = {
+            "camera_id": self.camera_id,
+            "sequence": self.processed + 1,
+            "timestamp": frame_time,
+            "width": frame_width,
+            "height": frame_height,
+            "faces": faces,
+        }
+        self.processed += 1
+
+    def to_dict(self) -> dict[str, Any]:
+        """Get the counters and the last recognized faces."""
+        uptime: float = max(time.time() - self.started_at, 1e-9)
+        return {
+            "camera_id": self.camera_id,
+            "running": self.running,
+            "fps_cap": self.fps,
+            "frames": self.frames,
+            "processed": self.processed,
+            "fps": round(self.frames / uptime, 2),
+            "errors": self.errors,
+            "last_error": self.last_error,
+            "latest": self.latest,
+        }
+
+
+def _cameras_on() -> list[Camera]:
+    """Get every camera whose status is on."""
+    from src.infra.database import SessionLocal
+
+    db: Session = SessionLocal()
+    try:
+        return db.query(Camera).filter(Camera.status == CameraStatus.on).all()
+    finally:
+        db.close()
+
+
+def camera_opener(camera: Camera) -> Callable[[], VideoCapture | None]:
+    """Get a function opening the RTSP capture of a camera."""
+    return lambda: get_ip_camera_capture(camera.user, camera.password, camera.camera_ip)
+
+
+class RecognitionMonitor:
+    """Keeps one CameraMonitor running for every camera that is on.
+
+    While started, the list of cameras is refreshed every rescan_interval
+    seconds: cameras turned on get a monitor, cameras turned off or removed
+    are stopped, and monitors whose camera could not be opened are retried.
+    """
+
+    def __init__(
+        self,
+        list_cameras: Callable[[], list[Camera]] = _cameras_on,
+        open_capture: Callable[[Camera], Callable[[], VideoCapture | None]] = (
+            camera_opener
+        ),
+        rescan_interval: float = MONITOR_RESCAN_INTERVAL,
+    ) -> None:
+        self.list_cameras: Callable[[], list[Camera]] = list_cameras
+        self.open_capture: Callable[[Camera], Callable[[], VideoCapture | None]] = (
+            open_capture
+        )
+        self.rescan_interval: float = rescan_interval
+        self.monitors: dict[int, CameraMonitor] = {}
+        self.fps_caps: dict[int, float] = {}
+        # Metadata streams reading each camera, which keep its monitor running
+        self.viewers: dict[int, int] = {}
+        self._cameras_on: set[int] = set()
+        self.running: bool = False
+        self._lock = threading.RLock()
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> list[int]:
+        """Start monitoring, returning the cameras being monitored."""
+        with self._lock:
+            self.running = True
+            if self._thread is None or self._wake.is_set():
+                # A stopped supervisor may still be exiting; start a new one
+                self._wake = threading.Event()
+                self._thread = threading.Thread(
+                    target=self._supervise,
+                    args=(self._wake,),
+                    name="recognition-monitor",
+                    daemon=True,
+                )
+                self._thread.start()
+        self.sync()
+        return sorted(self.monitors)
+
+    def stop(self) -> None:
+        """Stop monitoring every camera that has no metadata stream."""
+        with self._lock:
+            self.running = False
+            self._wake.set()
+            for camera_id, monitor in list(self.monitors.items()):
+                if not self.viewers.get(camera_id):
+                    monitor.stop()
+                    del self.monitors[camera_id]
+
+    def acquire(
+        self, camera_id: int, open_capture: Callable[[], VideoCapture | None]
+    ) -> CameraMonitor:
+        """Get the monitor of a camera for a viewer, starting it if needed."""
+        with self._lock:
+            self.viewers[camera_id] = self.viewers.get(camera_id, 0) + 1
+            monitor = self.monitors.get(camera_id)
+            if monitor is None or not monitor.running:
+                monitor = CameraMonitor(
+                    camera_id,
+                    open_capture,
+                    self.fps_caps.get(camera_id, get_monitor_fps(camera_id)),
+                )
+                self.monitors[camera_id] = monitor
+                monitor.start()
+            return monitor
+
+    def release(self, camera_id: int) -> None:
+        """Drop a viewer; the camera stops unless it is monitored anyway."""
+        with self._lock:
+            viewers: int = self.viewers.get(camera_id, 0) - 1
+            if viewers > 0:
+                self.viewers[camera_id] = viewers
+                return
+            self.viewers.pop(camera_id, None)
+            if self.running and camera_id in self._cameras_on:
+                return
+            monitor = self.monitors.pop(camera_id, None)
+            if monitor is not None:
+                monitor.stop()
+
+    def set_fps(self, camera_id: int, fps: float) -> None:
+        """Cap the frame rate of a camera, applied right away if it is running."""
+        with self._lock:
+            self.fps_caps[camera_id] = fps
+            monitor = self.monitors.get(camera_id)
+            if monitor is not None:
+                monitor.fps = fps
+
+    def sync(self) -> None:
+        """Start and stop camera monitors to match the cameras that are on."""
+        try:
+            cameras = {camera.camera_id: camera for camera in self.list_cameras()}
+        except Exception as e:
+            # Keep the current monitors; try the database again later
+            print(f"Monitor: error listing cameras: {e}")
+            return
+
+        with self._lock:
+            if not self.running:
+                return
+            self._cameras_on = set(cameras)
+            for camera_id, monitor in list(self.monitors.items()):
+                if self.viewers.get(camera_id) and monitor.running:
+                    continue
+                if camera_id not in cameras or not monitor.running:
+                    monitor.stop()
+                    del self.monitors[camera_id]
+            for camera_id, camera in cameras.items():
+                if camera_id in self.monitors:
+                    continue
+                monitor = CameraMonitor(
+                    camera_id,
+                    self.open_capture(camera),
+                    self.fps_caps.get(camera_id, get_monitor_fps(camera_id)),
+                )
+                self.monitors[camera_id] = monitor
+                monitor.start()
+
+    def _supervise(self, wake: threading.Event) -> None:
+        """Refresh the monitored cameras until stopped."""
+        while not wake.wait(self.rescan_interval):
+            self.sync()
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get the state of every camera monitor."""
+        with self._lock:
+            monitors = list(self.monitors.values())
+        return {
+            "running": self.running,
+            "cameras": [monitor.to_dict() for monitor in monitors],
+        }
+
+
+# Process-wide monitor started from the API
+recognition_monitor: RecognitionMonitor = RecognitionMonitor()
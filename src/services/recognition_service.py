@@ -0,0 +1,142 @@
+"""Batched face recognition shared by every camera stream and video job."""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any
+
+from numpy.typing import NDArray
+
+from src.infra.config import (
+    RECOGNITION_BATCH_SIZE,
+    RECOGNITION_BATCH_WAIT_MS,
+)
+from src.services.model_registry import ModelRegistry, model_registry
+
+
+class RecognitionService:
+    """Recognizes face crops from every caller in micro-batches on one worker.
+
+    Callers submit 220x220 grayscale faces and block on a future; the worker
+    drains the queue into batches of up to batch_size faces, waiting at most
+    max_wait seconds for a batch to fill, and matches each batch at once with
+    an LBPHMatcher built from the trained model.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = RECOGNITION_BATCH_SIZE,
+        max_wait: float = RECOGNITION_BATCH_WAIT_MS / 1000,
+        registry: ModelRegistry | None = None,
+    ) -> None:
+        self.batch_size: int = batch_size
+        self.max_wait: float = max_wait
+        self.faces: int = 0
+        self.batches: int = 0
+        self.busy_seconds: float = 0.0
+        self.wait_seconds: float = 0.0
+        self._queue: queue.Queue[tuple[NDArray[Any], Future, float]] = queue.Queue()
+        self.registry: ModelRegistry = registry or model_registry
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._started_at: float = 0.0
+
+    def load(self) -> bool:
+        """Load the trained classifier if it changed since the current version.
+
+        Batches already running keep the previous version. Returns False if
+        the model was not trained yet (or was removed).
+        """
+        return self.registry.reload()
+
+    @property
+    def loaded(self) -> bool:
+        """Whether a model is loaded in this worker."""
+        return self.registry.version > 0
+
+    def submit(self, face_image: NDArray[Any]) -> Future:
+        """Queue a face for recognition and get the future of its result."""
+        future: Future = Future()
+        self._ensure_worker()
+        self._queue.put((face_image, future, time.perf_counter()))
+        return future
+
+    def predict(self, face_image: NDArray[Any]) -> tuple[int, float]:
+        """Recognize a face, blocking until its batch is done."""
+        return self.submit(face_image).result()
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get throughput counters of the recognition worker."""
+        elapsed: float = time.monotonic() - self._started_at if self._thread else 0.0
+        return {
+            "faces": self.faces,
+            "batches": self.batches,
+            "mean_batch_size": round(self.faces / self.batches, 2)
+            if self.batches
+            else 0.0,
+            "faces_per_second": round(self.faces / elapsed, 2) if elapsed else 0.0,
+            "busy_faces_per_second": round(self.faces / self.busy_seconds, 2)
+            if self.busy_seconds
+            else 0.0,
+            "mean_wait_ms": round(self.wait_seconds / self.faces * 1000, 3)
+            if self.faces
+            else 0.0,
+            "queued": self._queue.qsize(),
+        }
+
+    def _ensure_worker(self) -> None:
+        """Start the worker thread on first use."""
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._started_at = time.monotonic()
+                self._thread = threading.Thread(
+                    target=self._run, name="recognition-service", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        """Collect submitted faces into batches and recognize them."""
+        while True:
+            batch = [self._queue.get()]
+            deadline: float = time.perf_counter() + self.max_wait
+            while len(batch) < self.batch_size:
+                remaining: float = deadline - time.perf_counter()
+                try:
+                    if remaining > 0:
+                        batch.append(self._queue.get(timeout=remaining))
+                    else:
+                        batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            started: float = time.perf_counter()
+            faces = [face_image for face_image, _, _ in batch]
+            try:
+                results = self._predict_batch(faces)
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            finally:
+                finished: float = time.perf_counter()
+                self.busy_seconds += finished - started
+                self.wait_seconds += sum(started - queued for _, _, queued in batch)
+                self.faces += len(batch)
+                self.batches += 1
+
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
+
+    def _predict_batch(self, faces: list[NDArray[Any]]) -> list[tuple[int, float]]:
+        """Recognize a batch of faces with the current model version."""
+        matcher = self.registry.matcher()
+        if matcher is None:
+            raise RuntimeError("Modelo não treinado")
+        return matcher.predict_batch(faces)
+
+
+# Shared by all streams and video jobs of this worker
+recognition_service: RecognitionService = RecognitionService()
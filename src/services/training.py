@@ -1,12 +1,38 @@
 """Training module for facial recognition classifier."""
 
+import json
+import math
+import os
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
 from typing import Any
 
 import cv2
 import numpy as np
 from numpy.typing import NDArray
 
-from src.infra.config import CLASSIFIER_PATH, PICTURES_DIR
+from src.infra.config import (
+    CLASSIFIER_PATH,
+    ENROLLED_PICTURES_PATH,
+    FACE_INDEX,
+    FACE_INDEX_PATH,
+    LEGACY_CLASSIFIER_PATH,
+    PICTURES_DIR,
+    TRAINING_WORKERS,
+    classifier_exists,
+)
+from src.services.face_dataset import face_dataset, sample_names
+from src.services.face_index import build_face_index
+from src.services.lbph_matcher import LBPHMatcher
+from src.services.model_store import load_model, model_lock, save_model
+from src.services.recognition_service import recognition_service
+
+# Most faces per training chunk; smaller chunks keep every worker busy
+TRAINING_CHUNK: int = 1024
+# Chunks per worker when the faces are split
+CHUNKS_PER_WORKER: int = 4
 
 
 class TrainingError(Exception):
@@ -15,47 +41,63 @@ class TrainingError(Exception):
     pass
 
 
-def trainLBPH() -> tuple[bool, str]:
-    """Train the LBPH face recognizer with captured images."""
+def trainLBPH(
+    progress: Callable[[str, float], None] | None = None,
+    workers: int = TRAINING_WORKERS,
+) -> tuple[bool, str]:
+    """Train the LBPH face recognizer with captured images.
+
+    progress, if given, is called with the phase (loading, training, writing)
+    and the percent done of the whole training.
+    """
     recognizer = cv2.face.LBPHFaceRecognizer_create()
+    enrolled: list[str] = []
+
+    def report(phase: str, percent: float) -> None:
+        if progress is not None:
+            progress(phase, percent)
 
     def getImageAndId() -> tuple[NDArray[Any], list[NDArray[Any]]]:
-        # Get all jpg files from pictures directory
-        paths = list(PICTURES_DIR.glob("person.*.*.jpg"))
+        # Pack pictures saved as JPEG by older versions, then map the dataset
+        imported = face_dataset.import_pictures(PICTURES_DIR, workers=workers)
+        if imported:
+            print(f"{imported} fotos JPEG importadas para o dataset.")
+        faces, records = face_dataset.load()
 
-        if not paths:
+        if not len(faces):
             raise TrainingError(
                 f"Nenhuma imagem encontrada em {PICTURES_DIR}. "
                 "Capture fotos primeiro usando /captura"
             )
 
-        faces: list[NDArray[Any]] = []
-        ids: list[int] = []
-
-        for imagePath in paths:
-            try:
-                # Extract person_id from filename pattern: person.{id}.{sample}.jpg
-                person_id = int(imagePath.stem.split(".")[1])
-                face_image = cv2.imread(str(imagePath))
-                if face_image is not None:
-                    gray_face = cv2.cvtColor(face_image, cv2.COLOR_BGR2GRAY)
-                    faces.append(gray_face)
-                    ids.append(person_id)
-            except Exception as e:
-                print(f"Erro ao processar {imagePath}: {e}")
-                continue
-
-        if not faces:
-            raise TrainingError("Nenhuma imagem válida foi processada.")
-
-        return np.array(ids), faces
+        enrolled.extend(sample_names(records))
+        return records["person_id"].astype(np.int32), list(faces)
 
     try:
-        ids, faces = getImageAndId()
+        with model_lock:
+            report("loading", 0.0)
+            started: float = time.perf_counter()
+            ids, faces = getImageAndId()
+            _log_stage("loading", started)
 
-        print(f"Treinando com {len(faces)} imagens...")
-        recognizer.train(faces, ids)
-        recognizer.write(str(CLASSIFIER_PATH))
+            print(f"Treinando com {len(faces)} imagens...")
+            report("training", 10.0)
+            started = time.perf_counter()
+            trained, busy = train_in_chunks(
+                faces,
+                ids,
+                workers,
+                lambda done: report("training", 10.0 + 80.0 * done),
+            )
+            _log_stage("training", started, busy, workers)
+
+            report("writing", 90.0)
+            started = time.perf_counter()
+            histograms = [h for part in trained for h in part.getHistograms()]
+            matcher = _matcher_from_histograms(recognizer, histograms, ids)
+            save_model(matcher, CLASSIFIER_PATH)
+            _model_saved(set(enrolled), matcher)
+            _log_stage("writing", started)
 
         print("Treinamento concluído!")
         return True, f"Treinamento concluído com {len(faces)} imagens."
@@ -66,3 +108,202 @@ def trainLBPH() -> tuple[bool, str]:
     except Exception as e:
         print(f"Erro inesperado no treinamento: {e}")
         return False, f"Erro inesperado: {e}"
+
+
+def train_in_chunks(
+    faces: list[NDArray[Any]],
+    ids: NDArray[Any],
+    workers: int = TRAINING_WORKERS,
+    on_progress: Callable[[float], None] | None = None,
+) -> tuple[list[Any], float]:
+    """Train LBPH recognizers on chunks of the faces in parallel threads.
+
+    Histograms do not depend on each other, so the recognizers of the chunks,
+    in order, hold the same histograms as one trained on every face. Returns
+    them with the seconds spent training summed over the threads.
+    """
+    size: int = min(
+        TRAINING_CHUNK, math.ceil(len(faces) / (workers * CHUNKS_PER_WORKER))
+    )
+    chunks = [slice(start, start + size) for start in range(0, len(faces), size)]
+
+    def trainChunk(chunk: slice) -> tuple[Any, float]:
+        # OpenCV releases the GIL while computing histograms
+        started: float = time.perf_counter()
+        recognizer = cv2.face.LBPHFaceRecognizer_create()
+        recognizer.train(faces[chunk], ids[chunk])
+        return recognizer, time.perf_counter() - started
+
+    trained: list[Any] = [None] * len(chunks)
+    busy: float = 0.0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(trainChunk, chunk): i for i, chunk in enumerate(chunks)
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            trained[futures[future]], seconds = future.result()
+            busy += seconds
+            if on_progress is not None:
+                on_progress(done / len(chunks))
+    return trained, busy
+
+
+def enroll_person(
+    person_id: int, progress: Callable[[str, float], None] | None = None
+) -> tuple[bool, str]:
+    """Add the new pictures of a person to the model without retraining.
+
+    Only the histograms of dataset rows not yet in the model are computed and
+    appended. Without a model (or its list of enrolled pictures) a full
+    training is run instead, reporting to progress like trainLBPH. Runs in
+    the training jobs thread, see training_jobs.submit_enrollment.
+    """
+    with model_lock:
+        enrolled = _read_enrolled()
+        if not classifier_exists() or enrolled is None:
+            return trainLBPH(progress=progress)
+
+        try:
+            faces, records = face_dataset.load()
+            rows = np.flatnonzero(records["person_id"] == person_id)
+            new = [name not in enrolled for name in sample_names(records[rows])]
+            rows = rows[np.array(new, dtype=bool)]
+            if not len(rows):
+                return True, f"Nenhuma imagem nova da pessoa {person_id}."
+
+            ids = records["person_id"][rows]
+            trained, _ = train_in_chunks(list(faces[rows]), ids)
+            matcher = load_model(CLASSIFIER_PATH, workers=1)
+            matcher = _rebuilt(
+                matcher,
+                np.vstack(
+                    [matcher.histograms()]
+                    + [h for part in trained for h in part.getHistograms()]
+                ),
+                np.concatenate([matcher.labels, ids]),
+            )
+            save_model(matcher, CLASSIFIER_PATH)
+            _model_saved(enrolled | set(sample_names(records[rows])), matcher)
+
+            print(f"Pessoa {person_id} adicionada ao modelo com {len(rows)} imagens.")
+            return True, f"Pessoa {person_id} adicionada com {len(rows)} imagens."
+
+        except Exception as e:
+            print(f"Erro ao adicionar pessoa {person_id} ao modelo: {e}")
+            return False, f"Erro inesperado: {e}"
+
+
+def remove_person_from_model(person_id: int) -> tuple[bool, str]:
+    """Drop the samples and pictures of a person from the model.
+
+    The pictures are deleted from the dataset too, so a later full training
+    (or a new person reusing the ID) does not bring the samples back.
+    """
+    with model_lock:
+        face_dataset.remove_person(person_id)
+        for path in PICTURES_DIR.glob(f"person.{person_id}.*.jpg"):
+            path.unlink(missing_ok=True)
+
+        if not classifier_exists():
+            return True, "Modelo ainda não treinado."
+
+        try:
+            matcher = load_model(CLASSIFIER_PATH, workers=1)
+            keep = np.flatnonzero(matcher.labels != person_id)
+            removed: int = len(matcher) - len(keep)
+
+            enrolled = _read_enrolled() or set()
+            enrolled = {
+                name for name in enrolled if not name.startswith(f"person.{person_id}.")
+            }
+            if not len(keep):
+                # An LBPH model cannot be empty: go back to the untrained state
+                for path in (
+                    CLASSIFIER_PATH,
+                    LEGACY_CLASSIFIER_PATH,
+                    ENROLLED_PICTURES_PATH,
+                    FACE_INDEX_PATH,
+                ):
+                    Path(path).unlink(missing_ok=True)
+                recognition_service.load()
+            elif removed:
+                matcher = _rebuilt(
+                    matcher, matcher.histograms()[keep], matcher.labels[keep]
+                )
+                save_model(matcher, CLASSIFIER_PATH)
+                _model_saved(enrolled, matcher)
+
+            print(f"Pessoa {person_id} removida do modelo ({removed} amostras).")
+            return True, f"Pessoa {person_id} removida com {removed} amostras."
+
+        except Exception as e:
+            print(f"Erro ao remover pessoa {person_id} do modelo: {e}")
+            return False, f"Erro inesperado: {e}"
+
+
+def _read_enrolled() -> set[str] | None:
+    """Names of the pictures already in the model, or None if unknown."""
+    try:
+        with open(ENROLLED_PICTURES_PATH) as file:
+            return set(json.load(file))
+    except (OSError, ValueError):
+        return None
+
+
+def _log_stage(
+    stage: str, started: float, busy: float | None = None, workers: int = 1
+) -> None:
+    """Print how long a training stage took and, if parallel, its speedup."""
+    seconds: float = time.perf_counter() - started
+    message: str = f"Etapa {stage}: {seconds:.2f} s"
+    if busy is not None and seconds > 0:
+        message += f" ({workers} threads, speedup estimado {busy / seconds:.1f}x)"
+    print(message)
+
+
+def _matcher_from_histograms(
+    recognizer: Any, histograms: list[NDArray[Any]], labels: NDArray[Any]
+) -> LBPHMatcher:
+    """Matcher over histograms with the parameters of a recognizer."""
+    return LBPHMatcher(
+        np.vstack(histograms),
+        labels,
+        radius=recognizer.getRadius(),
+        neighbors=recognizer.getNeighbors(),
+        grid_x=recognizer.getGridX(),
+        grid_y=recognizer.getGridY(),
+        threshold=recognizer.getThreshold(),
+        workers=1,
+    )
+
+
+def _rebuilt(
+    matcher: LBPHMatcher, histograms: NDArray[Any], labels: NDArray[Any]
+) -> LBPHMatcher:
+    """Matcher over other histograms with the parameters of a matcher."""
+    return LBPHMatcher(
+        histograms,
+        labels,
+        radius=matcher.radius,
+        neighbors=matcher.neighbors,
+        grid_x=matcher.grid_x,
+        grid_y=matcher.grid_y,
+        threshold=matcher.threshold,
+        workers=1,
+    )
+
+
+def _model_saved(enrolled: set[str], matcher: LBPHMatcher) -> None:
+    """Record the enrolled pictures, rebuild the index and reload the model."""
+    temporary = f"{ENROLLED_PICTURES_PATH}.tmp"
+    with open(temporary, "w") as file:
+        json.dump(sorted(enrolled), file)
+    os.replace(temporary, ENROLLED_PICTURES_PATH)
+
+    if FACE_INDEX:
+        index = build_face_index(matcher)
+        if index is not None:
+            print(f"Índice aproximado de faces com {len(index)} amostras.")
+
+    if recognition_service.loaded:
+        recognition_service.load()
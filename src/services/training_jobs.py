@@ -0,0 +1,145 @@
+"""Background training jobs, so requests never wait for the model lock."""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Any
+
+from src.services.training import enroll_person, trainLBPH
+
+# Finished jobs kept for status queries
+JOB_HISTORY: int = 20
+
+
+class TrainingJob:
+    """State of one training or enrolment, updated by the training thread.
+
+    A job without person_id is a full training.
+    """
+
+    def __init__(self, person_id: int | None = None) -> None:
+        self.job_id: str = uuid.uuid4().hex
+        self.person_id: int | None = person_id
+        self.status: str = "queued"
+        self.phase: str = "queued"
+        self.progress: float = 0.0
+        self.message: str = (
+            "Treinamento na fila"
+            if person_id is None
+            else f"Adição da pessoa {person_id} ao modelo na fila"
+        )
+        self.requests: int = 1
+        self.created_at: float = time.time()
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+
+    def report(self, phase: str, percent: float) -> None:
+        """Progress callback given to trainLBPH."""
+        self.phase = phase
+        self.progress = round(percent, 1)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Get the job state for the API."""
+        return {
+            "job_id": self.job_id,
+            "person_id": self.person_id,
+            "status": self.status,
+            "phase": self.phase,
+            "progress": self.progress,
+            "message": self.message,
+            "requests": self.requests,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class TrainingJobs:
+    """Runs full trainings and enrolments one at a time on a background thread.
+
+    Requests made while a job is queued join it instead of queueing another:
+    a full training joins the queued one, and an enrolment joins a queued
+    enrolment of the same person or a queued full training, which trains its
+    pictures too. A request made while a job is running queues one more job,
+    so the pictures captured meanwhile are trained too. Jobs live in the
+    memory of this worker.
+    """
+
+    def __init__(self, history: int = JOB_HISTORY) -> None:
+        self.history: int = history
+        self._jobs: OrderedDict[str, TrainingJob] = OrderedDict()
+        self._queue: deque[TrainingJob] = deque()
+        self._running: TrainingJob | None = None
+        self._condition = threading.Condition()
+        self._thread: threading.Thread | None = None
+
+    def submit(self) -> TrainingJob:
+        """Request a training and get the job that will run it."""
+        return self._submit(None)
+
+    def submit_enrollment(self, person_id: int) -> TrainingJob:
+        """Request adding the new pictures of a person to the model."""
+        return self._submit(person_id)
+
+    def _submit(self, person_id: int | None) -> TrainingJob:
+        """Queue a job, or join a queued one that covers it."""
+        with self._condition:
+            for queued in self._queue:
+                if queued.person_id is None or queued.person_id == person_id:
+                    queued.requests += 1
+                    return queued
+
+            job = TrainingJob(person_id)
+            self._queue.append(job)
+            self._jobs[job.job_id] = job
+            while len(self._jobs) > self.history:
+                oldest = next(iter(self._jobs.values()))
+                if oldest is self._running or oldest in self._queue:
+                    break
+                self._jobs.popitem(last=False)
+
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="training-jobs", daemon=True
+                )
+                self._thread.start()
+            self._condition.notify()
+            return job
+
+    def get(self, job_id: str) -> TrainingJob | None:
+        """Get a job by ID, or None if unknown or forgotten."""
+        with self._condition:
+            return self._jobs.get(job_id)
+
+    def _run(self) -> None:
+        """Run queued jobs one after the other."""
+        while True:
+            with self._condition:
+                while not self._queue:
+                    self._condition.wait()
+                job = self._running = self._queue.popleft()
+
+            job.status = "running"
+            job.started_at = time.time()
+            try:
+                if job.person_id is None:
+                    job.message = "Treinando modelo"
+                    success, message = trainLBPH(progress=job.report)
+                else:
+                    job.message = f"Adicionando pessoa {job.person_id} ao modelo"
+                    success, message = enroll_person(job.person_id, progress=job.report)
+            except Exception as e:
+                success, message = False, f"Erro inesperado: {e}"
+
+            job.status = "success" if success else "error"
+            job.phase = "done"
+            job.progress = 100.0 if success else job.progress
+            job.message = message
+            job.finished_at = time.time()
+            with self._condition:
+                self._running = None
+
+
+# Shared by every request of this worker
+training_jobs: TrainingJobs = TrainingJobs()
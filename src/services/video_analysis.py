@@ -1,35 +1,145 @@
 """Video file analysis for facial recognition."""
 
+import functools
 from collections.abc import AsyncGenerator
 from pathlib import Path
 from typing import Any
 
 import cv2
 import numpy as np
+from numpy.typing import NDArray
 from sqlalchemy.orm import Session
 
-from src.infra.config import CLASSIFIER_PATH, HAARCASCADE_PATH, classifier_exists
-from src.repositories.person_repository import get_all_persons
-
-# Initialize face detector and recognizer
-faceDetector = cv2.CascadeClassifier(str(HAARCASCADE_PATH))
-recognizer = cv2.face.LBPHFaceRecognizer_create()
-
-if classifier_exists():
-    recognizer.read(str(CLASSIFIER_PATH))
+from src.infra.config import (
+    DETECTION_WIDTH,
+    classifier_exists,
+)
+from src.repositories.person_directory import get_person_name
+from src.services.face_detection import Box, detect_faces
+from src.services.face_tracking import FaceTracker, Track
+from src.services.model_registry import model_registry
+from src.services.motion_gate import MotionGate
+from src.services.processing import encode_frame, run_in_pool
+from src.services.recognition_service import recognition_service
 
 font: int = cv2.FONT_HERSHEY_COMPLEX_SMALL
 width: int = 220
 height: int = 220
 
 
-def verifyPerson(session: Session, person_id: int) -> str:
+def verifyPerson(person_id: int) -> str:
     """Verify person name by ID."""
-    persons = get_all_persons(session=session)
-    for p in persons:
-        if person_id == p.person_id:
-            return p.name
-    return "Desconhecido"
+    return get_person_name(person_id) or "Desconhecido"
+
+
+def _predict_face(
+    gray_image: NDArray[Any], box: tuple[int, int, int, int]
+) -> tuple[int, float]:
+    """Recognize the face inside a box of a grayscale frame."""
+    x, y, w, h = box
+    face_image = cv2.resize(gray_image[y : y + h, x : x + w], (width, height))
+    return recognition_service.predict(face_image)
+
+
+def _detect_faces(gray_image: NDArray[Any], region: Box | None = None) -> list[Box]:
+    """Run the Haar cascade on a grayscale video frame."""
+    return detect_faces(
+        model_registry.face_detector(),
+        gray_image,
+        DETECTION_WIDTH or None,
+        scale_factor=1.5,
+        min_size=(30, 30),
+        region=region,
+    )
+
+
+def _update_tracks(
+    frame: NDArray[Any], tracker: FaceTracker, gate: MotionGate
+) -> list[tuple[Track, tuple[int, float] | None]]:
+    """Get the tracked faces of a video frame with their identities.
+
+    Static frames keep the previous tracks and identities without running
+    the detector or the recognizer.
+    """
+    region: Box | None = gate.check(frame)
+    if region is None:
+        return [(track, track.identity()) for track in tracker.tracks]
+
+    gray_image = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    detect = functools.partial(_detect_faces, region=region)
+    tracks: list[tuple[Track, tuple[int, float] | None]] = []
+    for track in tracker.update(gray_image, detect, region):
+        try:
+            identity = tracker.identify(
+                track, functools.partial(_predict_face, gray_image, track.box)
+            )
+        except Exception:
+            identity = None
+        tracks.append((track, identity))
+    return tracks
+
+
+def _analyze_frame(
+    frame: NDArray[Any],
+    tracker: FaceTracker,
+    gate: MotionGate,
+    frame_count: int,
+    total_frames: int,
+    faces_detected: int,
+    recognized_persons: dict[str, dict[str, Any]],
+    video_writer: Any,
+) -> tuple[bytes, int]:
+    """Recognize and annotate a video frame, updating the recognized persons.
+
+    Returns the encoded frame and the updated count of detected faces.
+    """
+    for track, identity in _update_tracks(frame, tracker, gate):
+        x, y, w, h = track.box
+        faces_detected += 1
+        cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+
+        if identity is None:
+            cv2.putText(frame, "Erro", (x, y - 10), font, 1, (0, 0, 255), 2)
+        else:
+            person_id, trust = identity
+            name = verifyPerson(person_id)
+
+            if name != "Desconhecido":
+                if name not in recognized_persons:
+                    recognized_persons[name] = {
+                        "count": 0,
+                        "best_trust": trust,
+                    }
+                recognized_persons[name]["count"] += 1
+                if trust < recognized_persons[name]["best_trust"]:
+                    recognized_persons[name]["best_trust"] = trust
+
+            cv2.putText(frame, name, (x, y - 10), font, 1, (0, 255, 0), 2)
+            cv2.putText(
+                frame,
+                f"Conf: {round(trust, 1)}",
+                (x, y + h + 20),
+                font,
+                1,
+                (0, 255, 0),
+                1,
+            )
+
+    progress: int = int((frame_count / total_frames) * 100)
+    cv2.putText(
+        frame,
+        f"Progresso: {progress}% | Faces: {faces_detected}",
+        (10, 30),
+        font,
+        1,
+        (255, 255, 0),
+        1,
+    )
+
+    if video_writer:
+        video_writer.write(frame)
+
+    return encode_frame(frame), faces_detected
 
 
 async def analyze_video_file(
@@ -66,7 +176,7 @@ async def analyze_video_file(
         )
         return
 
-    recognizer.read(str(CLASSIFIER_PATH))
+    recognition_service.load()
 
     video_path_obj = Path(video_path)
     if not video_path_obj.exists():
@@ -131,10 +241,12 @@ async def analyze_video_file(
     frame_count: int = 0
     faces_detected: int = 0
     recognized_persons: dict[str, dict[str, Any]] = {}
+    tracker: FaceTracker = FaceTracker()
+    gate: MotionGate = MotionGate()
 
     try:
         while True:
-            ret, frame = cap.read()
+            ret, frame = await run_in_pool(cap.read)
             if not ret:
                 break
 
@@ -144,66 +256,18 @@ async def analyze_video_file(
                 continue
 
             try:
-                gray_image = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                detected_faces = faceDetector.detectMultiScale(
-                    gray_image, scaleFactor=1.5, minSize=(30, 30)
-                )
-
-                for x, y, w, h in detected_faces:
-                    faces_detected += 1
-                    face_image = cv2.resize(
-                        gray_image[y : y + h, x : x + w], (width, height)
-                    )
-                    cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
-
-                    try:
-                        person_id, trust = recognizer.predict(face_image)
-                        name = verifyPerson(session, person_id)
-
-                        if name != "Desconhecido":
-                            if name not in recognized_persons:
-                                recognized_persons[name] = {
-                                    "count": 0,
-                                    "best_trust": trust,
-                                }
-                            recognized_persons[name]["count"] += 1
-                            if trust < recognized_persons[name]["best_trust"]:
-                                recognized_persons[name]["best_trust"] = trust
-
-                        cv2.putText(frame, name, (x, y - 10), font, 1, (0, 255, 0), 2)
-                        cv2.putText(
-                            frame,
-                            f"Conf: {round(trust, 1)}",
-                            (x, y + h + 20),
-                            font,
-                            1,
-                            (0, 255, 0),
-                            1,
-                        )
-                    except Exception:
-                        cv2.putText(frame, "Erro", (x, y - 10), font, 1, (0, 0, 255), 2)
-
-                progress: int = int((frame_count / total_frames) * 100)
-                cv2.putText(
+                payload, faces_detected = await run_in_pool(
+                    _analyze_frame,
                     frame,
-                    f"Progresso: {progress}% | Faces: {faces_detected}",
-                    (10, 30),
-                    font,
-                    1,
-                    (255, 255, 0),
-                    1,
-                )
-
-                if video_writer:
-                    video_writer.write(frame)
-
-                _, encodedImage = cv2.imencode(".jpg", frame)
-                yield (
-                    b"--frame\r\n"
-                    b"Content-Type: image/jpeg\r\n\r\n"
-                    + bytearray(encodedImage)
-                    + b"\r\n"
+                    tracker,
+                    gate,
+                    frame_count,
+                    total_frames,
+                    faces_detected,
+                    recognized_persons,
+                    video_writer,
                 )
+                yield payload
 
             except Exception as e:
                 print(f"Error processing frame {frame_count}: {e}")
@@ -243,7 +307,18 @@ async def analyze_video_file(
         1,
     )
 
-    y_pos: int = 180
+    skip_ratio: float = gate.skipped / gate.frames if gate.frames else 0.0
+    cv2.putText(
+        summary_frame,
+        f"Quadros estaticos: {round(skip_ratio * 100)}%",
+        (50, 160),
+        font,
+        1,
+        (255, 255, 255),
+        1,
+    )
+
+    y_pos: int = 200
     cv2.putText(
         summary_frame,
         "Pessoas reconhecidas:",
@@ -281,7 +356,7 @@ def analyze_video_file_sync(
     if not classifier_exists():
         return {"status": "error", "message": "Modelo não treinado"}
 
-    recognizer.read(str(CLASSIFIER_PATH))
+    recognition_service.load()
 
     video_path_obj = Path(video_path)
     if not video_path_obj.exists():
@@ -297,6 +372,8 @@ def analyze_video_file_sync(
     frame_count: int = 0
     faces_detected: int = 0
     recognized_persons: dict[str, dict[str, Any]] = {}
+    tracker: FaceTracker = FaceTracker()
+    gate: MotionGate = MotionGate()
 
     while True:
         ret, frame = cap.read()
@@ -309,32 +386,23 @@ def analyze_video_file_sync(
             continue
 
         try:
-            gray_image = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            detected_faces = faceDetector.detectMultiScale(
-                gray_image, scaleFactor=1.5, minSize=(30, 30)
-            )
-
-            for x, y, w, h in detected_faces:
+            for _, identity in _update_tracks(frame, tracker, gate):
                 faces_detected += 1
-                face_image = cv2.resize(
-                    gray_image[y : y + h, x : x + w], (width, height)
-                )
-
-                try:
-                    person_id, trust = recognizer.predict(face_image)
-                    name = verifyPerson(session, person_id)
-
-                    if name not in recognized_persons:
-                        recognized_persons[name] = {
-                            "count": 0,
-                            "best_confidence": float("inf"),
-                            "person_id": person_id,
-                        }
-                    recognized_persons[name]["count"] += 1
-                    if trust < recognized_persons[name]["best_confidence"]:
-                        recognized_persons[name]["best_confidence"] = trust
-                except Exception:
-                    pass
+                if identity is None:
+                    continue
+
+                person_id, trust = identity
+                name = verifyPerson(person_id)
+
+                if name not in recognized_persons:
+                    recognized_persons[name] = {
+                        "count": 0,
+                        "best_confidence": float("inf"),
+                        "person_id": person_id,
+                    }
+                recognized_persons[name]["count"] += 1
+                if trust < recognized_persons[name]["best_confidence"]:
+                    recognized_persons[name]["best_confidence"] = trust
 
         except Exception as e:
             print(f"Error processing frame: {e}")
@@ -359,5 +427,6 @@ def analyze_video_file_sync(
         "frames_processed": frame_count // 3,
         "fps": fps,
         "faces_detected": faces_detected,
+        "static_frames_skipped": gate.skipped,
         "recognized_persons": persons_list,
     }
@@ -0,0 +1,148 @@
+"""
+Tests for the capture hub module.
+"""
+
+import sys
+import os
+import time
+from unittest.mock import MagicMock
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.capture_hub import (
+    CameraReader,
+    get_hub_stats,
+    is_capturing,
+    subscribe,
+)
+
+
+def make_capture(opened: bool = True) -> MagicMock:
+    """Create a fake VideoCapture that delivers a frame every 5 ms."""
+    capture = MagicMock()
+    capture.isOpened.return_value = opened
+    capture.grab.side_effect = lambda: time.sleep(0.005) or True
+    capture.retrieve.side_effect = lambda: (
+        True,
+        np.zeros((10, 10, 3), dtype=np.uint8),
+    )
+    capture.read.side_effect = lambda: (
+        time.sleep(0.005) or True,
+        np.zeros((10, 10, 3), dtype=np.uint8),
+    )
+    return capture
+
+
+def wait_for_frame(subscription, timeout: float = 1.0):
+    """Poll a subscription until it returns a frame."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        connected, frame = subscription.read()
+        if connected:
+            return frame
+        time.sleep(0.005)
+    return None
+
+
+class TestSubscribe:
+    """Tests for subscribing to cameras."""
+
+    def test_subscribers_share_one_capture(self):
+        """Test that a second subscriber does not open the camera again."""
+        capture = make_capture()
+        opener = MagicMock(return_value=capture)
+
+        first = subscribe(101, opener)
+        second = subscribe(101, opener)
+        try:
+            assert opener.call_count == 1
+            assert wait_for_frame(first) is not None
+            assert wait_for_frame(second) is not None
+            stats = [s for s in get_hub_stats() if s["camera_id"] == 101]
+            assert stats[0]["subscribers"] == 2
+        finally:
+            first.release()
+            second.release()
+
+    def test_last_release_stops_reader(self):
+        """Test that the capture is released after the last subscriber leaves."""
+        capture = make_capture()
+        subscription = subscribe(102, lambda: capture)
+        assert is_capturing(102)
+
+        subscription.release()
+        subscription.release()
+
+        assert not is_capturing(102)
+        time.sleep(0.05)
+        capture.release.assert_called_once()
+
+    def test_subscribe_fails_when_capture_not_opened(self):
+        """Test that unavailable cameras return None."""
+        capture = make_capture(opened=False)
+
+        assert subscribe(103, lambda: capture) is None
+        assert not is_capturing(103)
+        capture.release.assert_called_once()
+
+    def test_frames_are_copied_per_subscriber(self):
+        """Test that subscribers can annotate frames independently."""
+        subscription = subscribe(104, make_capture)
+        other = subscribe(104, make_capture)
+        try:
+            frame = wait_for_frame(subscription)
+            frame[:] = 255
+            assert wait_for_frame(other).max() == 0
+        finally:
+            subscription.release()
+            other.release()
+
+
+class TestLatestFrameOnly:
+    """Tests for the grab/retrieve reader mode."""
+
+    def test_slow_consumer_gets_newest_frame_and_counts_drops(self):
+        """Test that a slow subscriber skips stale frames instead of lagging."""
+        capture = make_capture()
+        subscription = subscribe(105, lambda: capture)
+        try:
+            assert wait_for_frame(subscription) is not None
+            time.sleep(0.1)
+            assert wait_for_frame(subscription) is not None
+
+            assert subscription.frames_dropped > 0
+            assert capture.retrieve.call_count < capture.grab.call_count
+        finally:
+            subscription.release()
+
+    def test_reader_decodes_only_on_demand(self):
+        """Test that grabbed frames are not decoded without a request."""
+        capture = make_capture()
+        reader = CameraReader(106, capture, latest_frame_only=True)
+        try:
+            time.sleep(0.1)
+            assert capture.retrieve.call_count == 1
+            assert reader.sequence > 1
+        finally:
+            reader.stop()
+
+
+class TestRawReaders:
+    """Tests for readers of compressed packets."""
+
+    def test_raw_and_decoded_readers_are_separate(self):
+        """Test that a raw subscription does not share the decoded reader."""
+        decoded = subscribe(107, make_capture)
+        raw = subscribe(107, make_capture, raw=True)
+        try:
+            assert raw.reader is not decoded.reader
+            assert is_capturing(107) and is_capturing(107, raw=True)
+            assert wait_for_frame(raw) is not None
+            assert raw.reader.frames_decoded == 0
+        finally:
+            raw.release()
+            decoded.release()
+        assert not is_capturing(107, raw=True)
@@ -0,0 +1,71 @@
+"""
+Tests for the camera control channel.
+"""
+
+import sys
+import os
+from unittest.mock import MagicMock, patch
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.entities.models import CameraStatus
+from src.repositories import control_channel
+from src.repositories.control_channel import (
+    get_camera_status,
+    get_capture_flag,
+    publish_camera_status,
+    publish_capture_flag,
+)
+from src.repositories.controller_repository import set_capture_flag
+
+
+class TestCameraStatus:
+    """Tests for camera status changes."""
+
+    def test_published_status_is_read_without_database(self):
+        """Test that streams see published changes without polling."""
+        with patch.object(control_channel, "_poll") as mock_poll:
+            publish_camera_status(201, CameraStatus.on)
+            assert get_camera_status(201) == CameraStatus.on
+
+            publish_camera_status(201, CameraStatus.off)
+            assert get_camera_status(201) == CameraStatus.off
+            mock_poll.assert_not_called()
+
+    def test_unknown_camera_falls_back_to_database(self):
+        """Test that an unknown camera is polled once and then cached."""
+        with patch.object(control_channel, "_poll") as mock_poll:
+            mock_poll.return_value = CameraStatus.on
+
+            assert get_camera_status(202) == CameraStatus.on
+            assert get_camera_status(202) == CameraStatus.on
+            mock_poll.assert_called_once_with("camera", 202)
+
+    def test_stale_value_is_polled_again(self):
+        """Test that the database is polled after the poll interval."""
+        with (
+            patch.object(control_channel, "_poll") as mock_poll,
+            patch.object(control_channel, "CONTROL_POLL_INTERVAL", 0),
+        ):
+            mock_poll.return_value = CameraStatus.off
+            publish_camera_status(203, CameraStatus.on)
+
+            assert get_camera_status(203) == CameraStatus.off
+
+
+class TestCaptureFlag:
+    """Tests for the capture flag."""
+
+    def test_set_capture_flag_publishes(self):
+        """Test that the repository pushes the new flag value."""
+        session = MagicMock()
+        controller = MagicMock()
+        session.query.return_value.get.return_value = controller
+
+        with patch.object(control_channel, "_poll") as mock_poll:
+            publish_capture_flag(2, 0)
+            set_capture_flag(session, 2)
+
+            assert get_capture_flag(2) == 1
+            mock_poll.assert_not_called()
@@ -0,0 +1,139 @@
+"""
+Tests for the packed face dataset.
+"""
+
+import sys
+import os
+import multiprocessing
+
+import cv2
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.infra import file_lock
+from src.services.face_dataset import FaceDataset, sample_names
+
+
+def make_face(value: int) -> np.ndarray:
+    """Create a 220x220 face filled with one value."""
+    return np.full((220, 220), value, dtype=np.uint8)
+
+
+def make_dataset(tmp_path) -> FaceDataset:
+    """Create an empty dataset in a temporary directory."""
+    return FaceDataset(tmp_path / "faces.u8", tmp_path / "faces.labels")
+
+
+def append_faces(tmp_path, person_id: int, start, count: int) -> None:
+    """Append faces of a person one at a time, like another worker."""
+    dataset = make_dataset(tmp_path)
+    start.wait()
+    for sample in range(1, count + 1):
+        dataset.append(person_id, sample, make_face(person_id))
+
+
+class TestFaceDataset:
+    """Tests for appending, loading and removing packed faces."""
+
+    def test_appended_faces_are_loaded(self, tmp_path):
+        """Test that faces come back with their labels, in order."""
+        dataset = make_dataset(tmp_path)
+        dataset.append(1, 1, make_face(10))
+        dataset.extend([2, 2], [1, 2], [make_face(20), make_face(30)])
+
+        faces, records = dataset.load()
+
+        assert len(dataset) == 3
+        assert faces.shape == (3, 220, 220)
+        assert faces[:, 0, 0].tolist() == [10, 20, 30]
+        assert sample_names(records) == ["person.1.1", "person.2.1", "person.2.2"]
+
+    def test_torn_append_is_ignored(self, tmp_path):
+        """Test that a face written without its label is dropped and replaced."""
+        dataset = make_dataset(tmp_path)
+        dataset.append(1, 1, make_face(10))
+        with open(dataset.faces_path, "ab") as file:
+            file.write(make_face(99).tobytes()[:1000])
+
+        assert len(dataset) == 1
+        dataset.append(1, 2, make_face(20))
+
+        faces, records = dataset.load()
+        assert faces[:, 0, 0].tolist() == [10, 20]
+        assert os.path.getsize(dataset.faces_path) == 2 * 220 * 220
+
+    def test_remove_person(self, tmp_path):
+        """Test that only the faces of the removed person are dropped."""
+        dataset = make_dataset(tmp_path)
+        dataset.extend([1, 2, 1], [1, 1, 2], [make_face(v) for v in (10, 20, 30)])
+
+        assert dataset.remove_person(1) == 2
+        assert dataset.remove_person(5) == 0
+
+        faces, records = dataset.load()
+        assert faces[:, 0, 0].tolist() == [20]
+        assert sample_names(records) == ["person.2.1"]
+
+    def test_import_pictures_skips_packed_ones(self, tmp_path):
+        """Test that JPEG pictures are imported once and resized."""
+        dataset = make_dataset(tmp_path)
+        cv2.imwrite(str(tmp_path / "person.3.1.jpg"), make_face(50))
+        cv2.imwrite(str(tmp_path / "person.3.2.jpg"), np.zeros((100, 80), np.uint8))
+
+        assert dataset.import_pictures(tmp_path) == 2
+        assert dataset.import_pictures(tmp_path) == 0
+
+        faces, records = dataset.load()
+        assert faces.shape == (2, 220, 220)
+        assert sample_names(records) == ["person.3.1", "person.3.2"]
+
+
+@pytest.mark.skipif(file_lock.fcntl is None, reason="flock is not available")
+class TestWorkers:
+    """Tests for workers sharing the dataset files."""
+
+    def test_concurrent_appends_keep_every_face(self, tmp_path):
+        """Test that appends of several processes do not overwrite each other."""
+        context = multiprocessing.get_context("fork")
+        start = context.Event()
+        workers = [
+            context.Process(target=append_faces, args=(tmp_path, person_id, start, 200))
+            for person_id in (1, 2, 3)
+        ]
+        for worker in workers:
+            worker.start()
+        start.set()
+        for worker in workers:
+            worker.join(30)
+
+        faces, records = make_dataset(tmp_path).load()
+        assert len(records) == 600
+        for person_id in (1, 2, 3):
+            rows = records["person_id"] == person_id
+            assert records["sample"][rows].tolist() == list(range(1, 201))
+            assert (faces[rows][:, 0, 0] == person_id).all()
+
+    def test_lock_file_is_held_while_rewriting(self, tmp_path):
+        """Test that other workers wait while the dataset is rewritten."""
+        dataset = make_dataset(tmp_path)
+        dataset.extend([1, 2], [1, 1], [make_face(1), make_face(2)])
+        held: list[bool] = []
+        load = dataset.load
+
+        def load_and_check():
+            with open(tmp_path / "faces.u8.lock", "a") as file:
+                try:
+                    file_lock.fcntl.flock(
+                        file, file_lock.fcntl.LOCK_EX | file_lock.fcntl.LOCK_NB
+                    )
+                except BlockingIOError:
+                    held.append(True)
+            return load()
+
+        dataset.load = load_and_check
+        dataset.remove_person(1)
+
+        assert held == [True]
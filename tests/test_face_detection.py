@@ -0,0 +1,65 @@
+"""
+Tests for downscaled face detection.
+"""
+
+import sys
+import os
+from unittest.mock import MagicMock
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.face_detection import detect_faces
+
+
+class TestDetectFaces:
+    """Tests for detection on a downscaled copy."""
+
+    def test_boxes_are_mapped_to_full_resolution(self):
+        """Test that boxes found on the small copy are scaled back."""
+        detector = MagicMock()
+        detector.detectMultiScale.return_value = [(100, 50, 40, 40)]
+        gray_image = np.zeros((1080, 1920), dtype=np.uint8)
+
+        boxes = detect_faces(detector, gray_image, 960, min_size=(60, 60))
+
+        small_image = detector.detectMultiScale.call_args.args[0]
+        assert small_image.shape == (540, 960)
+        assert detector.detectMultiScale.call_args.kwargs["minSize"] == (30, 30)
+        assert boxes == [(200, 100, 80, 80)]
+
+    def test_small_frames_are_not_resized(self):
+        """Test that frames narrower than the detection width are kept."""
+        detector = MagicMock()
+        detector.detectMultiScale.return_value = [(10, 10, 30, 30)]
+        gray_image = np.zeros((480, 640), dtype=np.uint8)
+
+        boxes = detect_faces(detector, gray_image, 960)
+
+        assert detector.detectMultiScale.call_args.args[0] is gray_image
+        assert boxes == [(10, 10, 30, 30)]
+
+    def test_boxes_are_clipped_to_the_frame(self):
+        """Test that rounding never produces a box outside the frame."""
+        detector = MagicMock()
+        detector.detectMultiScale.return_value = [(300, 200, 20, 25)]
+        gray_image = np.zeros((675, 1201), dtype=np.uint8)
+
+        x, y, w, h = detect_faces(detector, gray_image, 320)[0]
+
+        assert x + w <= 1201
+        assert y + h <= 675
+
+    def test_region_boxes_are_offset(self):
+        """Test that detection in a region returns frame coordinates."""
+        detector = MagicMock()
+        detector.detectMultiScale.return_value = [(10, 20, 40, 40)]
+        gray_image = np.zeros((1080, 1920), dtype=np.uint8)
+
+        boxes = detect_faces(detector, gray_image, 960, region=(1000, 500, 400, 300))
+
+        small_image = detector.detectMultiScale.call_args.args[0]
+        assert small_image.shape == (150, 200)
+        assert boxes == [(1020, 540, 80, 80)]
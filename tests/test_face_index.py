@@ -0,0 +1,128 @@
+"""
+Tests for the approximate face index.
+"""
+
+import sys
+import os
+import threading
+from unittest.mock import patch
+
+import cv2
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services import face_index
+from src.services.face_index import FaceIndex
+from src.services.lbph_matcher import LBPHMatcher
+
+
+def make_face(seed: int) -> np.ndarray:
+    """Create a smooth random 220x220 grayscale face."""
+    rng = np.random.default_rng(seed)
+    image = cv2.resize(rng.integers(0, 255, (55, 55), dtype=np.uint8), (220, 220))
+    return cv2.GaussianBlur(image, (3, 3), 0)
+
+
+def make_sample(base: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Create a noisy variation of a face."""
+    return cv2.add(base, rng.integers(0, 16, base.shape, dtype=np.uint8))
+
+
+@pytest.fixture(scope="module")
+def enrolled():
+    """Create a matcher with 40 persons of 10 samples and some queries."""
+    rng = np.random.default_rng(0)
+    bases = [make_face(i) for i in range(40)]
+    labels = np.repeat(np.arange(40, dtype=np.int32), 10)
+    empty = LBPHMatcher(np.zeros((0, 16384), np.float32), np.zeros(0))
+    histograms = empty.histogram(
+        np.stack([make_sample(bases[label], rng) for label in labels])
+    )
+    queries = empty.histogram(
+        np.stack([make_sample(bases[i % 40], rng) for i in range(20)])
+    )
+    return LBPHMatcher(histograms, labels), queries
+
+
+class TestFaceIndex:
+    """Tests for index search and persistence."""
+
+    def test_search_returns_few_candidates(self, enrolled):
+        """Test that a search compares far fewer samples than a full scan."""
+        matcher, queries = enrolled
+        index = FaceIndex.build(matcher.blocks, dimensions=32, lists=16)
+        index.nprobe, index.rerank = 2, 32
+
+        candidates = index.search(queries[0])
+
+        assert 0 < len(candidates) <= 32
+        assert np.all(np.diff(candidates) > 0)
+
+    def test_indexed_predictions_match_exhaustive(self, enrolled):
+        """Test that re-ranked index candidates find the exact match."""
+        matcher, queries = enrolled
+        expected = matcher.predict_histograms(queries)
+
+        matcher.index = FaceIndex.build(matcher.blocks, dimensions=32, lists=16)
+        matcher.index.nprobe, matcher.index.rerank = 4, 32
+        try:
+            results = matcher.predict_histograms(queries)
+        finally:
+            matcher.index = None
+
+        assert [label for label, _ in results] == [label for label, _ in expected]
+        assert [distance for _, distance in results] == pytest.approx(
+            [distance for _, distance in expected], rel=1e-12
+        )
+
+    def test_save_and_load(self, enrolled, tmp_path):
+        """Test that a saved index is loaded only for the same model."""
+        matcher, queries = enrolled
+        classifier = tmp_path / "classifierLBPH.yml"
+        classifier.write_text("model")
+        path = tmp_path / "classifierLBPH.ann.npz"
+
+        with patch.object(face_index, "CLASSIFIER_PATH", classifier):
+            index = FaceIndex.build(matcher.blocks, dimensions=16, lists=8)
+            index.save(path)
+
+            loaded = FaceIndex.load(len(matcher), path)
+            assert loaded is not None
+            assert np.array_equal(loaded.search(queries[0]), index.search(queries[0]))
+            assert FaceIndex.load(len(matcher) + 1, path) is None
+
+            classifier.write_text("retrained model")
+            assert FaceIndex.load(len(matcher), path) is None
+
+    def test_concurrent_saves_do_not_share_a_temporary_file(self, enrolled, tmp_path):
+        """Test that workers rebuilding the index at once each write a whole one."""
+        matcher, _ = enrolled
+        classifier = tmp_path / "classifierLBPH.bin"
+        classifier.write_text("model")
+        path = tmp_path / "classifierLBPH.ann.npz"
+        index = FaceIndex.build(matcher.blocks, dimensions=16, lists=8)
+        errors: list[Exception] = []
+
+        def save() -> None:
+            try:
+                for _ in range(10):
+                    index.save(path)
+            except Exception as e:
+                errors.append(e)
+
+        with patch.object(face_index, "CLASSIFIER_PATH", classifier):
+            threads = [threading.Thread(target=save) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            assert errors == []
+            assert FaceIndex.load(len(matcher), path) is not None
+        assert sorted(os.listdir(tmp_path)) == [
+            "classifierLBPH.ann.npz",
+            "classifierLBPH.bin",
+        ]
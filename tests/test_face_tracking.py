@@ -0,0 +1,151 @@
+"""
+Tests for the face tracking module.
+"""
+
+import sys
+import os
+from unittest.mock import MagicMock
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.face_tracking import FaceTracker, Track, box_iou
+
+
+def make_frame(x: int, y: int, patch: np.ndarray) -> np.ndarray:
+    """Create a gray frame with a textured patch at (x, y)."""
+    frame = np.full((240, 320), 90, dtype=np.uint8)
+    frame[y : y + patch.shape[0], x : x + patch.shape[1]] = patch
+    return frame
+
+
+def make_patch() -> np.ndarray:
+    """Create a textured 60x60 patch with trackable corners."""
+    rng = np.random.default_rng(0)
+    small = rng.integers(0, 255, (6, 6), dtype=np.uint8)
+    return np.kron(small, np.ones((10, 10), dtype=np.uint8))
+
+
+class TestBoxIou:
+    """Tests for the box overlap helper."""
+
+    def test_identical_boxes(self):
+        """Test that identical boxes have IoU 1."""
+        assert box_iou((0, 0, 10, 10), (0, 0, 10, 10)) == 1.0
+
+    def test_disjoint_boxes(self):
+        """Test that disjoint boxes have IoU 0."""
+        assert box_iou((0, 0, 10, 10), (20, 20, 10, 10)) == 0.0
+
+
+class TestFaceTracker:
+    """Tests for detection cadence and propagation."""
+
+    def test_detects_only_on_keyframes(self):
+        """Test that the cascade runs once every detection interval."""
+        patch = make_patch()
+        detect = MagicMock(return_value=[(100, 80, 60, 60)])
+        tracker = FaceTracker(detection_interval=5)
+
+        for _ in range(10):
+            tracker.update(make_frame(100, 80, patch), detect)
+
+        assert detect.call_count == 2
+        assert tracker.detections == 2
+
+    def test_propagates_moving_face(self):
+        """Test that boxes follow the face between detections."""
+        patch = make_patch()
+        detect = MagicMock(return_value=[(100, 80, 60, 60)])
+        tracker = FaceTracker(detection_interval=10)
+
+        tracks = tracker.update(make_frame(100, 80, patch), detect)
+        track_id = tracks[0].track_id
+        for step in range(1, 4):
+            tracks = tracker.update(
+                make_frame(100 + 4 * step, 80 + 2 * step, patch), detect
+            )
+
+        assert detect.call_count == 1
+        assert tracks[0].track_id == track_id
+        x, y, _, _ = tracks[0].box
+        assert abs(x - 112) <= 2
+        assert abs(y - 86) <= 2
+
+    def test_keeps_identity_across_keyframes(self):
+        """Test that overlapping detections keep the same track id."""
+        patch = make_patch()
+        tracker = FaceTracker(detection_interval=1)
+
+        first = tracker.update(
+            make_frame(100, 80, patch), lambda _: [(100, 80, 60, 60)]
+        )[0].track_id
+        second = tracker.update(
+            make_frame(104, 80, patch), lambda _: [(104, 80, 60, 60)]
+        )[0].track_id
+
+        assert first == second
+
+    def test_lost_track_forces_detection(self):
+        """Test that losing the face triggers a new detection."""
+        patch = make_patch()
+        detect = MagicMock(return_value=[(100, 80, 60, 60)])
+        tracker = FaceTracker(detection_interval=10)
+
+        tracker.update(make_frame(100, 80, patch), detect)
+        tracker.update(np.full((240, 320), 90, dtype=np.uint8), detect)
+        tracker.update(np.full((240, 320), 90, dtype=np.uint8), detect)
+
+        assert detect.call_count == 2
+
+    def test_tracks_outside_region_are_kept(self):
+        """Test that a detection limited to a region keeps the other faces."""
+        patch = make_patch()
+        tracker = FaceTracker(detection_interval=1)
+        frame = make_frame(10, 10, patch)
+        frame[150:210, 220:280] = patch
+
+        first = tracker.update(frame, lambda _: [(10, 10, 60, 60), (220, 150, 60, 60)])
+        tracks = tracker.update(frame, lambda _: [], region=(200, 130, 100, 100))
+
+        assert [t.track_id for t in tracks] == [first[0].track_id]
+
+
+class TestTrackIdentity:
+    """Tests for per-track recognition caching and voting."""
+
+    def test_predicts_only_periodically(self):
+        """Test that a stable face is not re-recognized on every frame."""
+        tracker = FaceTracker(detection_interval=1)
+        track = Track(1, (0, 0, 10, 10))
+        predict = MagicMock(return_value=(7, 40.0))
+
+        for _ in range(60):
+            assert tracker.identify(track, predict)[0] == 7
+
+        assert predict.call_count <= 8
+        assert tracker.predictions == predict.call_count
+
+    def test_vote_smooths_flicker(self):
+        """Test that an occasional wrong prediction does not change the name."""
+        track = Track(1, (0, 0, 10, 10))
+        for label in [7, 7, 3, 7, 7]:
+            track.votes.append((label, 50.0))
+
+        assert track.identity()[0] == 7
+
+    def test_closer_matches_weigh_more(self):
+        """Test that votes are weighted by LBPH distance."""
+        track = Track(1, (0, 0, 10, 10))
+        track.votes.extend([(1, 200.0), (1, 200.0), (2, 10.0)])
+
+        assert track.identity() == (2, 10.0)
+
+    def test_disagreement_triggers_prediction(self):
+        """Test that a prediction disagreeing with the vote is re-checked."""
+        track = Track(1, (0, 0, 10, 10))
+        track.votes.extend([(7, 40.0), (7, 40.0), (3, 40.0)])
+
+        assert track.needs_prediction()
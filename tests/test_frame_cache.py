@@ -0,0 +1,147 @@
+"""
+Tests for the shared encoded frame cache.
+"""
+
+import sys
+import os
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.capture_hub import subscribe
+from src.services.frame_cache import FrameCache, next_shared_frame
+
+
+def make_capture(value: int) -> MagicMock:
+    """Create a fake VideoCapture whose frames are filled with one value."""
+    capture = MagicMock()
+    capture.isOpened.return_value = True
+    capture.grab.side_effect = lambda: time.sleep(0.005) or True
+    capture.retrieve.side_effect = lambda: (
+        True,
+        np.full((10, 10, 3), value, dtype=np.uint8),
+    )
+    return capture
+
+
+def make_reader(key: int = 1) -> MagicMock:
+    """Create a stand-in for the reader of a camera."""
+    return MagicMock(key=key)
+
+
+class TestGetOrEncode:
+    """Tests for producing frames once per sequence."""
+
+    def test_same_sequence_is_encoded_once(self):
+        """Test that a second viewer reuses the encoded frame."""
+        cache = FrameCache()
+        reader = make_reader()
+        produce = MagicMock(return_value=b"jpeg")
+
+        assert cache.get_or_encode(reader, "reconhecimento", 5, produce) == b"jpeg"
+        assert cache.get_or_encode(reader, "reconhecimento", 5, produce) == b"jpeg"
+
+        produce.assert_called_once()
+        assert cache.get_stats()["hits"] == 1
+        assert cache.get_stats()["misses"] == 1
+
+    def test_profiles_are_cached_separately(self):
+        """Test that each output profile has its own slot."""
+        cache = FrameCache()
+        reader = make_reader()
+
+        cache.get_or_encode(reader, "a", 5, lambda: b"a")
+        assert cache.get_or_encode(reader, "b", 5, lambda: b"b") == b"b"
+        assert cache.get_stats()["misses"] == 2
+
+    def test_concurrent_viewers_wait_for_the_producer(self):
+        """Test that viewers arriving together do not encode twice."""
+        cache = FrameCache()
+        reader = make_reader()
+        calls: list[int] = []
+
+        def produce() -> bytes:
+            calls.append(1)
+            time.sleep(0.05)
+            return b"jpeg"
+
+        threads = [
+            threading.Thread(
+                target=cache.get_or_encode, args=(reader, "reconhecimento", 7, produce)
+            )
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+
+
+class TestTakeNewer:
+    """Tests for reusing frames produced by other viewers."""
+
+    def test_take_newer_returns_only_unseen_frames(self):
+        """Test that a viewer only gets frames newer than its last one."""
+        cache = FrameCache()
+        reader = make_reader()
+        cache.get_or_encode(reader, "reconhecimento", 3, lambda: b"jpeg")
+
+        assert cache.take_newer(reader, "reconhecimento", 2) == (3, b"jpeg")
+        assert cache.take_newer(reader, "reconhecimento", 3) == (3, None)
+        assert cache.take_newer(make_reader(2), "reconhecimento", 0) == (0, None)
+
+    def test_frames_of_a_previous_reader_are_not_reused(self):
+        """Test that a reopened camera does not get the old reader's frames."""
+        cache = FrameCache()
+        cache.get_or_encode(make_reader(), "reconhecimento", 500, lambda: b"old")
+        reader = make_reader()
+
+        assert cache.take_newer(reader, "reconhecimento", 0) == (0, None)
+        assert cache.get_or_encode(reader, "reconhecimento", 3, lambda: b"new") == (
+            b"new"
+        )
+        assert cache.get_stats()["slots"] == 1
+
+    def test_discard_drops_the_frames_of_a_reader(self):
+        """Test that a stopped reader's frames are dropped."""
+        cache = FrameCache()
+        reader = make_reader()
+        cache.get_or_encode(reader, "a", 1, lambda: b"a")
+        cache.get_or_encode(reader, "b", 1, lambda: b"b")
+
+        cache.discard(reader)
+
+        assert cache.get_stats()["slots"] == 0
+
+
+class TestNextSharedFrame:
+    """Tests for viewers sharing the frames of a camera."""
+
+    def test_reconnected_viewer_gets_fresh_frames(self):
+        """Test that a camera reopened after its viewers left is not stale."""
+
+        async def watch(value: int, seconds: float) -> bytes:
+            subscription = subscribe(201, lambda: make_capture(value))
+            try:
+                await asyncio.sleep(seconds)
+                while True:
+                    payload = await next_shared_frame(
+                        subscription, "reconhecimento", lambda frame: frame.tobytes()
+                    )
+                    if payload is not None:
+                        return payload[:1]
+                    await asyncio.sleep(0.005)
+            finally:
+                subscription.release()
+
+        # The first reader got far ahead before its viewer left
+        assert asyncio.run(asyncio.wait_for(watch(1, 0.3), 5)) == b"\x01"
+        assert asyncio.run(asyncio.wait_for(watch(2, 0.0), 5)) == b"\x02"
@@ -0,0 +1,211 @@
+"""
+Tests for incremental enrolment and removal of persons in the LBPH model.
+"""
+
+import sys
+import os
+from unittest.mock import MagicMock
+
+import cv2
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.infra import file_lock
+from src.services import model_store, training
+from src.services.face_dataset import FaceDataset
+from src.services.model_store import load_model
+
+
+def make_face(person_id: int, sample: int) -> np.ndarray:
+    """Create a random 220x220 face of a person."""
+    rng = np.random.default_rng(person_id * 1000 + sample)
+    return rng.integers(0, 255, (220, 220), dtype=np.uint8)
+
+
+def capture(person_id: int, count: int) -> None:
+    """Add faces of a person to the dataset like the capture does."""
+    for sample in range(1, count + 1):
+        training.face_dataset.append(person_id, sample, make_face(person_id, sample))
+
+
+def read_labels(path) -> list[int]:
+    """Labels of the samples in a saved model."""
+    return sorted(load_model(path).labels.tolist())
+
+
+@pytest.fixture
+def model_dir(tmp_path, monkeypatch):
+    """Point pictures and model files to a temporary directory."""
+    pictures = tmp_path / "pictures"
+    pictures.mkdir()
+    classifier = tmp_path / "classifierLBPH.bin"
+    monkeypatch.setattr(training, "PICTURES_DIR", pictures)
+    monkeypatch.setattr(training, "CLASSIFIER_PATH", classifier)
+    monkeypatch.setattr(model_store, "CLASSIFIER_PATH", classifier)
+    monkeypatch.setattr(
+        training, "LEGACY_CLASSIFIER_PATH", tmp_path / "classifierLBPH.yml"
+    )
+    monkeypatch.setattr(
+        training, "ENROLLED_PICTURES_PATH", tmp_path / "classifierLBPH.enrolled.json"
+    )
+    monkeypatch.setattr(training, "FACE_INDEX_PATH", tmp_path / "index.npz")
+    monkeypatch.setattr(training, "classifier_exists", classifier.exists)
+    monkeypatch.setattr(training, "recognition_service", MagicMock())
+    monkeypatch.setattr(
+        training,
+        "face_dataset",
+        FaceDataset(pictures / "faces.u8", pictures / "faces.labels"),
+    )
+    return tmp_path
+
+
+class TestEnrollPerson:
+    """Tests for adding a person without retraining."""
+
+    def test_first_person_trains_a_full_model(self, model_dir):
+        """Test that enrolling without a model trains one from every picture."""
+        capture(1, 3)
+        phases: list[str] = []
+
+        success, _ = training.enroll_person(
+            1, progress=lambda phase, percent: phases.append(phase)
+        )
+
+        assert success is True
+        assert "training" in phases
+        assert read_labels(model_dir / "classifierLBPH.bin") == [1, 1, 1]
+
+    def test_only_new_pictures_are_added(self, model_dir):
+        """Test that a new person is appended to the trained samples."""
+        capture(1, 3)
+        training.trainLBPH()
+        capture(2, 2)
+
+        success, message = training.enroll_person(2)
+
+        assert success is True
+        assert "2 imagens" in message
+        assert read_labels(model_dir / "classifierLBPH.bin") == [1, 1, 1, 2, 2]
+
+    def test_enrolling_twice_adds_nothing(self, model_dir):
+        """Test that pictures already in the model are not added again."""
+        capture(1, 2)
+        training.trainLBPH()
+
+        success, message = training.enroll_person(1)
+
+        assert success is True
+        assert "Nenhuma imagem nova" in message
+        assert read_labels(model_dir / "classifierLBPH.bin") == [1, 1]
+
+
+class TestTrainLBPHFromDataset:
+    """Tests for full training from the packed dataset."""
+
+    def test_jpeg_pictures_are_imported(self, model_dir):
+        """Test that pictures saved as JPEG by older versions are trained."""
+        for sample in (1, 2):
+            path = model_dir / "pictures" / f"person.7.{sample}.jpg"
+            cv2.imwrite(str(path), make_face(7, sample))
+        capture(1, 1)
+
+        success, message = training.trainLBPH()
+
+        assert success is True
+        assert "3 imagens" in message
+        assert read_labels(model_dir / "classifierLBPH.bin") == [1, 7, 7]
+
+    def test_training_in_chunks_reports_progress(self, model_dir, monkeypatch):
+        """Test that chunked training trains every face and reports phases."""
+        monkeypatch.setattr(training, "TRAINING_CHUNK", 2)
+        capture(1, 3)
+        capture(2, 2)
+        reports = []
+
+        success, _ = training.trainLBPH(progress=lambda *args: reports.append(args))
+
+        assert success is True
+        assert read_labels(model_dir / "classifierLBPH.bin") == [1, 1, 1, 2, 2]
+        phases = [phase for phase, _ in reports]
+        assert phases[0] == "loading"
+        assert phases.count("training") > 2
+        assert phases[-1] == "writing"
+        assert [percent for _, percent in reports] == sorted(
+            percent for _, percent in reports
+        )
+
+    def test_parallel_training_matches_opencv(self, model_dir):
+        """Test that chunks trained by several workers give OpenCV's model."""
+        capture(1, 3)
+        capture(2, 2)
+        faces, records = training.face_dataset.load()
+        expected = cv2.face.LBPHFaceRecognizer_create()
+        expected.train(list(faces), records["person_id"].astype(np.int32))
+
+        success, _ = training.trainLBPH(workers=4)
+
+        matcher = load_model(model_dir / "classifierLBPH.bin")
+        assert success is True
+        assert matcher.labels.tolist() == [1, 1, 1, 2, 2]
+        np.testing.assert_array_equal(
+            matcher.histograms(), np.vstack(expected.getHistograms())
+        )
+
+
+class TestRemovePersonFromModel:
+    """Tests for dropping a person from the model."""
+
+    def test_samples_and_pictures_are_removed(self, model_dir):
+        """Test that the other samples still predict like before."""
+        capture(1, 2)
+        capture(2, 2)
+        training.trainLBPH()
+        face = make_face(1, 2)
+
+        success, _ = training.remove_person_from_model(2)
+
+        assert success is True
+        assert read_labels(model_dir / "classifierLBPH.bin") == [1, 1]
+        assert training.face_dataset.load()[1]["person_id"].tolist() == [1, 1]
+        matcher = load_model(model_dir / "classifierLBPH.bin")
+        assert matcher.predict(face) == (1, pytest.approx(0.0))
+
+    def test_removing_the_last_person_clears_the_model(self, model_dir):
+        """Test that an empty model goes back to the untrained state."""
+        capture(1, 2)
+        training.trainLBPH()
+
+        success, _ = training.remove_person_from_model(1)
+
+        assert success is True
+        assert not (model_dir / "classifierLBPH.bin").exists()
+        assert not (model_dir / "classifierLBPH.enrolled.json").exists()
+
+
+@pytest.mark.skipif(file_lock.fcntl is None, reason="flock is not available")
+class TestModelLock:
+    """Tests for the lock shared by the workers changing the model."""
+
+    def other_worker_can_lock(self, model_dir) -> bool:
+        """Try the lock file like another process would, without waiting."""
+        with open(model_dir / "classifierLBPH.bin.lock", "a") as file:
+            try:
+                file_lock.fcntl.flock(
+                    file, file_lock.fcntl.LOCK_EX | file_lock.fcntl.LOCK_NB
+                )
+            except BlockingIOError:
+                return False
+            return True
+
+    def test_lock_file_is_held_for_the_whole_change(self, model_dir):
+        """Test that other workers wait while the model is being changed."""
+        with training.model_lock:
+            with training.model_lock:
+                assert not self.other_worker_can_lock(model_dir)
+            # Still held by the outer block of this thread
+            assert not self.other_worker_can_lock(model_dir)
+
+        assert self.other_worker_can_lock(model_dir)
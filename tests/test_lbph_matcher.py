@@ -0,0 +1,113 @@
+"""
+Tests for the vectorized LBPH matcher.
+"""
+
+import sys
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services import lbph_matcher
+from src.services.lbph_matcher import NO_MATCH, LBPHMatcher
+
+
+def make_face(seed: int) -> np.ndarray:
+    """Create a smooth random 220x220 grayscale face."""
+    rng = np.random.default_rng(seed)
+    image = cv2.resize(rng.integers(0, 255, (55, 55), dtype=np.uint8), (220, 220))
+    return cv2.GaussianBlur(image, (3, 3), 0)
+
+
+@pytest.fixture
+def trained():
+    """Train an OpenCV LBPH model on 12 faces of 4 persons."""
+    faces = [make_face(i) for i in range(12)]
+    labels = np.array([i // 3 for i in range(12)], dtype=np.int32)
+    recognizer = cv2.face.LBPHFaceRecognizer_create()
+    recognizer.train(faces, labels)
+    return recognizer, faces
+
+
+class TestHistogram:
+    """Tests for LBP histogram extraction."""
+
+    def test_matches_opencv_histograms(self, trained):
+        """Test that histograms are identical to the ones OpenCV trained on."""
+        recognizer, faces = trained
+        matcher = LBPHMatcher.from_recognizer(recognizer)
+
+        expected = np.vstack(recognizer.getHistograms())
+        assert np.array_equal(matcher.histogram(np.stack(faces)), expected)
+
+
+class TestPredict:
+    """Tests for nearest-neighbour predictions."""
+
+    def test_matches_opencv_predict(self, trained):
+        """Test that labels and distances match recognizer.predict."""
+        recognizer, faces = trained
+        matcher = LBPHMatcher.from_recognizer(recognizer)
+        rng = np.random.default_rng(0)
+        queries = [
+            cv2.add(face, rng.integers(0, 10, face.shape, dtype=np.uint8))
+            for face in faces
+        ] + [make_face(100 + i) for i in range(4)]
+
+        for query, (label, distance) in zip(queries, matcher.predict_batch(queries)):
+            expected_label, expected_distance = recognizer.predict(query)
+            assert label == expected_label
+            assert distance == pytest.approx(expected_distance, rel=1e-9)
+
+    def test_blocks_match_in_parallel(self, trained, monkeypatch):
+        """Test that splitting samples into blocks gives the same results."""
+        recognizer, faces = trained
+        expected = LBPHMatcher.from_recognizer(recognizer).predict_batch(faces)
+
+        monkeypatch.setattr(lbph_matcher, "BLOCK_SAMPLES", 5)
+        matcher = LBPHMatcher.from_recognizer(recognizer, workers=2)
+
+        assert len(matcher.blocks) == 3
+        assert matcher.predict_batch(faces) == expected
+
+    def test_lower_bounds_never_exceed_distances(self, trained):
+        """Test that the batch bounds can only rule out farther samples."""
+        recognizer, faces = trained
+        matcher = LBPHMatcher.from_recognizer(recognizer)
+        queries = matcher.histogram(np.stack([make_face(300 + i) for i in range(5)]))
+
+        lower = matcher.lower_bounds(queries)
+
+        samples = np.arange(len(matcher))
+        for query, bounds in zip(queries, lower):
+            assert np.all(bounds <= matcher.exact_distances(query, samples) + 1e-6)
+
+    def test_ties_keep_the_first_sample_like_opencv(self, trained):
+        """Test that an exact duplicate of two samples matches the first."""
+        _, faces = trained
+        recognizer = cv2.face.LBPHFaceRecognizer_create()
+        recognizer.train([faces[0], faces[1], faces[0]], np.array([5, 6, 7]))
+        matcher = LBPHMatcher.from_recognizer(recognizer)
+
+        assert matcher.predict(faces[0]) == (5, 0.0)
+        assert recognizer.predict(faces[0]) == (5, 0.0)
+
+    def test_threshold_returns_no_match(self, trained):
+        """Test that distances over the threshold are rejected like OpenCV."""
+        recognizer, faces = trained
+        recognizer.setThreshold(1.0)
+        matcher = LBPHMatcher.from_recognizer(recognizer)
+        query = make_face(200)
+
+        assert matcher.predict(query) == NO_MATCH
+        assert recognizer.predict(query)[0] == -1
+
+    def test_empty_model(self):
+        """Test that a matcher without samples never matches."""
+        matcher = LBPHMatcher(np.zeros((0, 16384), np.float32), np.zeros(0))
+
+        assert matcher.predict(make_face(1)) == NO_MATCH
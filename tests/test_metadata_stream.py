@@ -0,0 +1,102 @@
+"""
+Tests for the server-sent events with recognition metadata.
+"""
+
+import sys
+import os
+import asyncio
+import json
+import time
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services import recognition_monitor
+from src.services.metadata_stream import stream_detection_metadata
+from src.services.recognition_monitor import RecognitionMonitor
+
+
+def make_capture() -> MagicMock:
+    """Create a fake VideoCapture that delivers a new noisy frame every 5 ms."""
+    rng = np.random.default_rng(0)
+    capture = MagicMock()
+    capture.isOpened.return_value = True
+    capture.grab.side_effect = lambda: time.sleep(0.005) or True
+    capture.retrieve.side_effect = lambda: (
+        True,
+        rng.integers(0, 255, (120, 160, 3), dtype=np.uint8),
+    )
+    return capture
+
+
+@pytest.fixture
+def recognized(monkeypatch):
+    """Detect one face per frame and recognize it as person 7."""
+    service = MagicMock()
+    service.predict.return_value = (7, 42.0)
+    monkeypatch.setattr(recognition_monitor, "model_registry", MagicMock())
+    monkeypatch.setattr(recognition_monitor, "recognition_service", service)
+    monkeypatch.setattr(recognition_monitor, "sighting_writer", MagicMock())
+    monkeypatch.setattr(
+        recognition_monitor, "_detect_faces", lambda *_, **__: [(10, 20, 60, 60)]
+    )
+    monkeypatch.setattr(
+        recognition_monitor, "get_person_name", lambda person_id: "Maria"
+    )
+
+
+async def take_events(stream, count: int) -> list[bytes]:
+    """Read events from a stream, then close it."""
+    events = []
+    try:
+        async for event in stream:
+            events.append(event)
+            if len(events) == count:
+                break
+    finally:
+        await stream.aclose()
+    return events
+
+
+class TestDetectionMetadata:
+    """Tests for streaming the faces of each frame."""
+
+    def test_events_carry_the_faces_of_each_frame(self, recognized):
+        """Test that each event is compact JSON with boxes and names."""
+        monitor = RecognitionMonitor(list_cameras=list)
+        stream = stream_detection_metadata(941, make_capture, monitor)
+
+        events = asyncio.run(asyncio.wait_for(take_events(stream, 2), 5))
+
+        first, second = (
+            json.loads(event.decode()[len("data: ") :]) for event in events
+        )
+        assert first["camera_id"] == 941
+        assert second["sequence"] > first["sequence"]
+        assert first["faces"][0]["name"] == "Maria"
+        assert first["faces"][0]["box"] == [10, 20, 60, 60]
+        assert first["timestamp"] > 0
+
+    def test_closing_the_last_stream_stops_the_camera(self, recognized):
+        """Test that a camera started for viewers stops when they leave."""
+        monitor = RecognitionMonitor(list_cameras=list)
+        stream = stream_detection_metadata(942, make_capture, monitor)
+
+        asyncio.run(asyncio.wait_for(take_events(stream, 1), 5))
+
+        assert monitor.viewers == {}
+        assert 942 not in monitor.monitors
+
+    def test_camera_that_cannot_open_sends_an_error(self, recognized):
+        """Test that the stream ends with an error event."""
+        monitor = RecognitionMonitor(list_cameras=list)
+        stream = stream_detection_metadata(943, lambda: None, monitor)
+
+        events = asyncio.run(asyncio.wait_for(take_events(stream, 10), 5))
+
+        assert len(events) == 1
+        assert events[0].startswith(b"event: error\n")
@@ -0,0 +1,121 @@
+"""
+Tests for the versioned model registry.
+"""
+
+import sys
+import os
+import time
+
+import cv2
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.lbph_matcher import LBPHMatcher
+from src.services.model_registry import ModelRegistry
+from src.services.model_store import save_model
+
+
+def make_faces(count: int) -> list[np.ndarray]:
+    """Create random 64x64 grayscale faces."""
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 255, (64, 64), dtype=np.uint8) for _ in range(count)]
+
+
+def write_model(path, count: int) -> None:
+    """Train a model on random faces and save it as a binary model file."""
+    recognizer = cv2.face.LBPHFaceRecognizer_create(threshold=5000.0)
+    recognizer.train(make_faces(count), np.arange(count, dtype=np.int32))
+    save_model(LBPHMatcher.from_recognizer(recognizer, workers=1), path)
+
+
+class TestModelRegistry:
+    """Tests for loading and swapping model versions."""
+
+    def test_new_file_becomes_a_new_version(self, tmp_path):
+        """Test that a replaced model file is loaded as the next version."""
+        registry = ModelRegistry(tmp_path / "model.bin", watch_interval=0)
+        write_model(tmp_path / "model.bin", 2)
+        assert registry.reload()
+        assert registry.current().version == 1
+
+        write_model(tmp_path / "model.bin", 3)
+        assert registry.reload()
+
+        assert registry.current().version == 2
+        assert len(registry.matcher()) == 3
+        assert registry.swaps == 1
+
+    def test_unchanged_file_is_not_loaded_again(self, tmp_path):
+        """Test that reloading an unchanged file keeps the current version."""
+        registry = ModelRegistry(tmp_path / "model.bin", watch_interval=0)
+        write_model(tmp_path / "model.bin", 2)
+        first = registry.current()
+
+        assert registry.reload()
+
+        assert registry.current() is first
+        assert registry.version == 1
+
+    def test_old_version_keeps_working_after_a_swap(self, tmp_path):
+        """Test that a matcher taken before a swap still predicts."""
+        registry = ModelRegistry(tmp_path / "model.bin", watch_interval=0)
+        write_model(tmp_path / "model.bin", 2)
+        old = registry.matcher()
+
+        write_model(tmp_path / "model.bin", 4)
+        registry.reload()
+
+        assert registry.matcher() is not old
+        assert old.predict(make_faces(2)[1])[0] == 1
+
+    def test_missing_file_has_no_version(self, tmp_path):
+        """Test that a removed model leaves the registry without a matcher."""
+        registry = ModelRegistry(tmp_path / "model.bin", watch_interval=0)
+        assert registry.matcher() is None
+
+        write_model(tmp_path / "model.bin", 2)
+        assert registry.matcher() is not None
+        os.remove(tmp_path / "model.bin")
+
+        assert not registry.reload()
+        assert registry.matcher() is None
+
+    def test_watcher_picks_up_a_new_file(self, tmp_path):
+        """Test that the watcher loads a model written by someone else."""
+        registry = ModelRegistry(tmp_path / "model.bin", watch_interval=0.01)
+        write_model(tmp_path / "model.bin", 2)
+        assert registry.current().version == 1
+
+        write_model(tmp_path / "model.bin", 3)
+        deadline = time.monotonic() + 5
+        while registry.version < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert registry.version == 2
+        assert len(registry.matcher()) == 3
+
+    def test_detector_is_loaded_once_on_first_use(self, tmp_path):
+        """Test that the cascade is only read when asked for, then shared."""
+        registry = ModelRegistry(tmp_path / "model.bin", watch_interval=0)
+        assert not registry.get_memory()["detector_loaded"]
+
+        detector = registry.face_detector()
+
+        assert not detector.empty()
+        assert registry.face_detector() is detector
+        assert registry.get_memory()["detector_loaded"]
+
+    def test_memory_counts_the_model_arrays(self, tmp_path):
+        """Test that the model footprint is the size of its arrays."""
+        registry = ModelRegistry(tmp_path / "model.bin", watch_interval=0)
+        assert registry.get_memory()["model_bytes"] == 0
+        write_model(tmp_path / "model.bin", 3)
+
+        matcher = registry.matcher()
+
+        histograms = matcher.histograms()
+        assert registry.get_memory()["model_bytes"] == (
+            histograms.nbytes + matcher.labels.nbytes + matcher.sums.nbytes
+        )
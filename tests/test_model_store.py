@@ -0,0 +1,134 @@
+"""
+Tests for the binary LBPH model files.
+"""
+
+import sys
+import os
+import multiprocessing
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.infra import file_lock
+from src.services import lbph_matcher, model_store
+from src.services.lbph_matcher import LBPHMatcher
+from src.services.model_store import (
+    convert_legacy_model,
+    convert_yaml_model,
+    load_model,
+    save_model,
+)
+
+
+def make_faces(count: int) -> list[np.ndarray]:
+    """Create random 64x64 grayscale faces."""
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 255, (64, 64), dtype=np.uint8) for _ in range(count)]
+
+
+def train(count: int):
+    """Train an OpenCV LBPH recognizer on random faces."""
+    recognizer = cv2.face.LBPHFaceRecognizer_create(threshold=5000.0)
+    recognizer.train(make_faces(count), np.arange(count, dtype=np.int32) % 3)
+    return recognizer
+
+
+def convert_at_startup(start, results) -> None:
+    """Convert the legacy model like a worker starting up."""
+    start.wait()
+    results.put(convert_legacy_model())
+
+
+class TestModelStore:
+    """Tests for saving, loading and converting models."""
+
+    def test_round_trip_keeps_every_block(self, tmp_path, monkeypatch):
+        """Test that a saved model loads with the same samples and parameters."""
+        monkeypatch.setattr(lbph_matcher, "BLOCK_SAMPLES", 2)
+        matcher = LBPHMatcher.from_recognizer(train(5))
+        save_model(matcher, tmp_path / "model.bin")
+
+        loaded = load_model(tmp_path / "model.bin")
+
+        assert len(loaded.blocks) == 3
+        assert loaded.block_samples == 2
+        assert loaded.threshold == 5000.0
+        np.testing.assert_array_equal(loaded.labels, matcher.labels)
+        np.testing.assert_array_equal(loaded.histograms(), matcher.histograms())
+        face = make_faces(5)[4]
+        assert loaded.predict(face) == matcher.predict(face)
+
+    def test_converted_yaml_predicts_like_opencv(self, tmp_path):
+        """Test that a YAML model converts to the same predictions."""
+        recognizer = train(4)
+        recognizer.write(str(tmp_path / "model.yml"))
+
+        assert convert_yaml_model(tmp_path / "model.yml", tmp_path / "model.bin") == 4
+
+        loaded = load_model(tmp_path / "model.bin")
+        for face in make_faces(4):
+            label, distance = recognizer.predict(face)
+            assert loaded.predict(face) == (label, pytest.approx(distance))
+
+    def test_other_files_are_rejected(self, tmp_path):
+        """Test that a file without the magic is not loaded."""
+        (tmp_path / "model.bin").write_bytes(b"%YAML 1.0\n" + b"\0" * 64)
+
+        with pytest.raises(ValueError):
+            load_model(tmp_path / "model.bin")
+
+    def test_concurrent_saves_do_not_share_a_temporary_file(self, tmp_path):
+        """Test that workers saving at once each write a whole model."""
+        matchers = [LBPHMatcher.from_recognizer(train(count)) for count in (3, 4)]
+        errors: list[Exception] = []
+
+        def save(matcher: LBPHMatcher) -> None:
+            try:
+                for _ in range(10):
+                    save_model(matcher, tmp_path / "model.bin")
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=save, args=(m,)) for m in matchers * 2]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert len(load_model(tmp_path / "model.bin")) in (3, 4)
+        assert os.listdir(tmp_path) == ["model.bin"]
+
+    @pytest.mark.skipif(file_lock.fcntl is None, reason="flock is not available")
+    def test_legacy_model_is_converted_by_one_worker(self, tmp_path, monkeypatch):
+        """Test that workers starting together convert the YAML model once."""
+        train(4).write(str(tmp_path / "model.yml"))
+        monkeypatch.setattr(model_store, "CLASSIFIER_PATH", tmp_path / "model.bin")
+        monkeypatch.setattr(
+            model_store, "LEGACY_CLASSIFIER_PATH", tmp_path / "model.yml"
+        )
+        context = multiprocessing.get_context("fork")
+        start = context.Event()
+        results = context.Queue()
+        workers = [
+            context.Process(target=convert_at_startup, args=(start, results))
+            for _ in range(4)
+        ]
+        for worker in workers:
+            worker.start()
+        start.set()
+        for worker in workers:
+            worker.join(30)
+
+        assert sorted(results.get(timeout=5) for _ in workers) == [
+            False,
+            False,
+            False,
+            True,
+        ]
+        assert len(load_model(tmp_path / "model.bin")) == 4
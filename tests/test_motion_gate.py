@@ -0,0 +1,83 @@
+"""
+Tests for the motion gate.
+"""
+
+import sys
+import os
+from types import SimpleNamespace
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services import motion_gate
+from src.services.motion_gate import MotionGate
+
+
+def make_frame(x: int | None = None) -> np.ndarray:
+    """Create a 640x480 BGR frame with an optional bright square at x."""
+    frame = np.full((480, 640, 3), 80, dtype=np.uint8)
+    if x is not None:
+        frame[200:300, x : x + 100] = 220
+    return frame
+
+
+class TestMotionGate:
+    """Tests for static frame detection."""
+
+    def test_first_frame_checks_everything(self):
+        """Test that the first frame is searched in full."""
+        gate = MotionGate(enabled=True)
+
+        assert gate.check(make_frame()) == (0, 0, 640, 480)
+
+    def test_static_frames_are_skipped(self):
+        """Test that an unchanging scene is reported as static."""
+        gate = MotionGate(enabled=True)
+        gate.check(make_frame())
+
+        for _ in range(10):
+            assert gate.check(make_frame()) is None
+
+        assert gate.skipped == 10
+
+    def test_motion_region_contains_the_change(self):
+        """Test that the region covers the moving object only."""
+        gate = MotionGate(enabled=True)
+        gate.check(make_frame())
+
+        x, y, w, h = gate.check(make_frame(400))
+
+        assert x <= 400 and x + w >= 500
+        assert y <= 200 and y + h >= 300
+        assert w < 640
+        assert gate.limited == 1
+
+    def test_disabled_gate_checks_everything(self):
+        """Test that a disabled gate never skips frames."""
+        gate = MotionGate(enabled=False)
+        gate.check(make_frame())
+
+        assert gate.check(make_frame()) == (0, 0, 640, 480)
+        assert gate.skipped == 0
+
+    def test_slow_drift_still_refreshes_the_output(self, monkeypatch):
+        """Test that a scene brightening slowly is processed every second."""
+        clock = iter(i / 30 for i in range(10_000))
+        monkeypatch.setattr(
+            motion_gate, "time", SimpleNamespace(monotonic=lambda: next(clock))
+        )
+        gate = MotionGate(enabled=True, refresh_seconds=1.0)
+
+        checked: list[int] = []
+        for i in range(2000):
+            frame = np.full((480, 640, 3), 40 + i // 10, dtype=np.uint8)
+            if gate.check(frame) is not None:
+                checked.append(i)
+
+        # Every change is learned by the background, so none is seen as motion
+        assert gate.skipped > 1900
+        # ... but the frame at 30 fps is processed in full once a second
+        assert max(b - a for a, b in zip(checked, checked[1:])) <= 30
+        assert gate.refreshed == len(checked) - 1
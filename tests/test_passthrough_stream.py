@@ -0,0 +1,130 @@
+"""
+Tests for the plain video streams that relay MJPEG frames.
+"""
+
+import sys
+import os
+import asyncio
+from unittest.mock import MagicMock
+
+import cv2
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services import passthrough_stream
+from src.services.capture_hub import get_hub_stats
+from src.services.passthrough_stream import stream_plain_video
+
+
+def write_video(path, fourcc: str, frames: int = 30) -> str:
+    """Write a small test video with the given codec."""
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*fourcc), 10, (64, 48))
+    for i in range(frames):
+        writer.write(np.full((48, 64, 3), i * 8, dtype=np.uint8))
+    writer.release()
+    return str(path)
+
+
+async def take_frames(stream, count: int) -> list[bytes]:
+    """Read multipart frames from a stream, then close it."""
+    frames = []
+    try:
+        async for frame in stream:
+            frames.append(frame)
+            if len(frames) == count:
+                break
+    finally:
+        await stream.aclose()
+    return frames
+
+
+def jpeg_of(frame: bytes) -> bytes:
+    """Get the JPEG image inside a multipart frame."""
+    header, _, body = frame.partition(b"\r\n\r\n")
+    assert header == b"--frame\r\nContent-Type: image/jpeg"
+    return body[: -len(b"\r\n")]
+
+
+@pytest.fixture
+def raw_opens(monkeypatch):
+    """Count the captures opened in raw mode."""
+    opens = MagicMock(side_effect=passthrough_stream.get_raw_capture)
+    monkeypatch.setattr(passthrough_stream, "get_raw_capture", opens)
+    monkeypatch.setattr(passthrough_stream, "_mjpeg_cameras", {})
+    return opens
+
+
+class TestPlainVideo:
+    """Tests for streaming cameras without overlays."""
+
+    def test_mjpeg_frames_are_relayed_without_decoding(self, tmp_path, raw_opens):
+        """Test that the camera's JPEG bytes reach the viewer untouched."""
+        path = write_video(tmp_path / "camera.avi", "MJPG")
+        open_capture = MagicMock()
+        stream = stream_plain_video(951, open_capture, path)
+
+        frames = asyncio.run(asyncio.wait_for(take_frames(stream, 1), 5))
+
+        jpeg = jpeg_of(frames[0])
+        assert jpeg.startswith(b"\xff\xd8")
+        with open(path, "rb") as video:
+            assert jpeg in video.read()
+        assert cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR).shape == (
+            48,
+            64,
+            3,
+        )
+        open_capture.assert_not_called()
+        assert not [s for s in get_hub_stats() if s["camera_id"] == 951]
+
+    def test_viewers_of_a_camera_share_one_raw_reader(self, tmp_path, raw_opens):
+        """Test that concurrent viewers open the camera once, without decoding."""
+        path = write_video(tmp_path / "camera.avi", "MJPG")
+
+        async def watch() -> dict:
+            first = stream_plain_video(952, MagicMock(), path)
+            second = stream_plain_video(952, MagicMock(), path)
+            await first.__anext__()
+            await second.__anext__()
+            stats = [s for s in get_hub_stats() if s["camera_id"] == 952]
+            await first.aclose()
+            await second.aclose()
+            return stats[0]
+
+        stats = asyncio.run(asyncio.wait_for(watch(), 5))
+
+        assert raw_opens.call_count == 1
+        assert stats["raw"] is True
+        assert stats["subscribers"] == 2
+        assert stats["frames_grabbed"] > 0
+        assert stats["frames_decoded"] == 0
+
+    def test_other_codecs_are_encoded_once_opened(self, tmp_path, raw_opens):
+        """Test that non-MJPEG cameras fall back to encoding decoded frames."""
+        path = write_video(tmp_path / "camera.mp4", "mp4v")
+
+        for _ in range(2):
+            stream = stream_plain_video(953, lambda: cv2.VideoCapture(path), path)
+            frames = asyncio.run(asyncio.wait_for(take_frames(stream, 1), 5))
+            assert jpeg_of(frames[0]).startswith(b"\xff\xd8")
+
+        # The codec is remembered, so the camera is not opened raw again
+        assert raw_opens.call_count == 1
+        assert passthrough_stream._mjpeg_cameras[953] is False
+
+    def test_webcam_is_never_opened_raw(self, raw_opens):
+        """Test that sources without a URL are always decoded."""
+        capture = MagicMock()
+        capture.isOpened.return_value = True
+        capture.read.return_value = (True, np.zeros((48, 64, 3), dtype=np.uint8))
+        capture.grab.return_value = True
+        capture.retrieve.return_value = capture.read.return_value
+        stream = stream_plain_video(954, lambda: capture)
+
+        frames = asyncio.run(asyncio.wait_for(take_frames(stream, 1), 5))
+
+        assert jpeg_of(frames[0]).startswith(b"\xff\xd8")
+        raw_opens.assert_not_called()
@@ -0,0 +1,87 @@
+"""
+Tests for the person directory module.
+"""
+
+import sys
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.entities.schemas import CreateAndUpdatePerson
+from src.repositories import person_directory
+from src.repositories.person_directory import (
+    get_person_name,
+    invalidate_person_directory,
+)
+from src.repositories.person_repository import create_person, remove_person
+
+
+@pytest.fixture(autouse=True)
+def fresh_directory():
+    """Start every test with an invalidated directory."""
+    invalidate_person_directory()
+    yield
+    invalidate_person_directory()
+
+
+class TestGetPersonName:
+    """Tests for name lookups."""
+
+    def test_lookup_loads_once(self):
+        """Test that repeated lookups do not hit the database again."""
+        with patch.object(person_directory, "_load_names") as mock_load:
+            mock_load.return_value = {1: "Ana", 2: "Bruno"}
+
+            assert get_person_name(1) == "Ana"
+            assert get_person_name(2) == "Bruno"
+            assert get_person_name(3) is None
+            assert mock_load.call_count == 1
+
+    def test_invalidate_forces_reload(self):
+        """Test that invalidation reloads the names on the next lookup."""
+        with patch.object(person_directory, "_load_names") as mock_load:
+            mock_load.return_value = {1: "Ana"}
+            assert get_person_name(1) == "Ana"
+
+            mock_load.return_value = {1: "Ana Maria"}
+            invalidate_person_directory()
+
+            assert get_person_name(1) == "Ana Maria"
+            assert mock_load.call_count == 2
+
+    def test_load_error_keeps_previous_names(self):
+        """Test that a database error does not clear the directory."""
+        with patch.object(person_directory, "_load_names") as mock_load:
+            mock_load.return_value = {1: "Ana"}
+            assert get_person_name(1) == "Ana"
+
+            mock_load.side_effect = Exception("database down")
+            invalidate_person_directory()
+
+            assert get_person_name(1) == "Ana"
+
+
+class TestRepositoryInvalidation:
+    """Tests that person changes invalidate the directory."""
+
+    def test_create_person_invalidates(self):
+        """Test that creating a person invalidates the directory."""
+        session = MagicMock()
+        with patch(
+            "src.repositories.person_repository.invalidate_person_directory"
+        ) as mock_invalidate:
+            create_person(session, CreateAndUpdatePerson(person_id=1, name="Ana"))
+            mock_invalidate.assert_called_once()
+
+    def test_remove_person_invalidates(self):
+        """Test that removing a person invalidates the directory."""
+        session = MagicMock()
+        with patch(
+            "src.repositories.person_repository.invalidate_person_directory"
+        ) as mock_invalidate:
+            remove_person(session, 1)
+            mock_invalidate.assert_called_once()
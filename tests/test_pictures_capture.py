@@ -0,0 +1,87 @@
+"""
+Tests for the picture capture streams.
+"""
+
+import sys
+import os
+import asyncio
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services import pictures_capture
+from src.services.face_dataset import FaceDataset
+from src.services.pictures_capture import stream_pictures_capture_auto
+
+
+def make_face(value: int) -> np.ndarray:
+    """Create a 220x220 face filled with one value."""
+    return np.full((220, 220), value, dtype=np.uint8)
+
+
+def capture_one_face(frame, person_id, person_name, samples, *_):
+    """Save one face per frame, like a capture with a face always in view."""
+    pictures_capture.face_dataset.append(person_id, samples + 1, make_face(1))
+    return b"frame", samples + 1, 0.0
+
+
+@pytest.fixture
+def capture(monkeypatch, tmp_path):
+    """Capture person 5 from a fake camera into a temporary dataset."""
+    dataset = FaceDataset(tmp_path / "faces.u8", tmp_path / "faces.labels")
+    camera = MagicMock()
+    camera.read.return_value = (True, np.zeros((48, 64, 3), dtype=np.uint8))
+    monkeypatch.setattr(pictures_capture, "face_dataset", dataset)
+    monkeypatch.setattr(pictures_capture, "getNextID", lambda session: 5)
+    monkeypatch.setattr(
+        pictures_capture, "_get_camera_capture", lambda *_: (camera, False, None)
+    )
+    monkeypatch.setattr(
+        pictures_capture, "_process_auto_capture_frame", capture_one_face
+    )
+    monkeypatch.setattr(pictures_capture, "create_person", MagicMock())
+    monkeypatch.setattr(pictures_capture, "training_jobs", MagicMock())
+    return dataset
+
+
+async def take_frames(stream, count: int) -> None:
+    """Read some frames from a stream, then close it like a client leaving."""
+    taken = 0
+    try:
+        async for _ in stream:
+            taken += 1
+            if taken == count:
+                break
+    finally:
+        await stream.aclose()
+
+
+class TestAutoCapture:
+    """Tests for the faces of captures that do not finish."""
+
+    def test_abandoned_capture_leaves_no_faces(self, capture):
+        """Test that a client leaving mid-capture discards its faces."""
+        stream = stream_pictures_capture_auto(MagicMock(), 1, "Maria", 10)
+
+        asyncio.run(take_frames(stream, 3))
+
+        assert len(capture) == 0
+        pictures_capture.create_person.assert_not_called()
+
+    def test_stale_faces_of_the_next_id_are_dropped(self, capture):
+        """Test that a new capture does not train on faces left under its id."""
+        capture.extend([5, 5, 4], [1, 2, 1], [make_face(9)] * 3)
+        stream = stream_pictures_capture_auto(MagicMock(), 1, "Maria", 2)
+
+        asyncio.run(take_frames(stream, 10))
+
+        _, records = capture.load()
+        assert records["person_id"].tolist() == [4, 5, 5]
+        faces, _ = capture.load()
+        assert faces[1:, 0, 0].tolist() == [1, 1]
+        pictures_capture.create_person.assert_called_once()
+        pictures_capture.training_jobs.submit_enrollment.assert_called_once_with(5)
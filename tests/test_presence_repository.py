@@ -0,0 +1,166 @@
+"""
+Tests for the presence queries and hourly rollups.
+"""
+
+import sys
+import os
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.entities.models import CameraHour, PresenceHour, Sighting
+from src.infra.database import Base
+from src.repositories.presence_repository import (
+    get_camera_occupancy,
+    get_camera_presence,
+    get_person_presence,
+    rebuild_presence_rollups,
+)
+from src.repositories.sighting_repository import SightingWriter
+
+
+@pytest.fixture
+def session_factory():
+    """Create an in-memory database with the sighting and rollup tables."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(
+        engine,
+        tables=[Sighting.__table__, PresenceHour.__table__, CameraHour.__table__],
+    )
+    return sessionmaker(bind=engine)
+
+
+def at(hour: int, minute: int) -> float:
+    """Timestamp of a time on a fixed day."""
+    return datetime(2026, 3, 2, hour, minute).timestamp()
+
+
+def record(
+    session_factory, sightings: list[tuple[int, int, float]], window: float = 1.0
+) -> None:
+    """Write (person_id, camera_id, timestamp) sightings through the writer."""
+    writer = SightingWriter(
+        session_factory=session_factory,
+        window=window,
+        flush_interval=60,
+        enabled=True,
+    )
+    for person_id, camera_id, timestamp in sightings:
+        writer.record(person_id, camera_id, 50.0, (0, 0, 60, 60), at=timestamp)
+    writer.flush(everything=True)
+
+
+def read_occupancy(session_factory, camera_id: int) -> list[tuple]:
+    """Read the hourly rollup of a camera as (hour, people, sightings)."""
+    session = session_factory()
+    try:
+        return [
+            (row["hour"].hour, row["people"], row["sightings"])
+            for row in get_camera_occupancy(
+                session, camera_id, datetime(2026, 3, 2), datetime(2026, 3, 3)
+            )
+        ]
+    finally:
+        session.close()
+
+
+class TestRollups:
+    """Tests for the incrementally maintained hourly rollups."""
+
+    def test_people_and_sightings_per_hour(self, session_factory):
+        """Test that each camera-hour counts distinct people and sightings."""
+        record(
+            session_factory,
+            [
+                (1, 3, at(10, 5)),
+                (1, 3, at(10, 40)),
+                (2, 3, at(10, 50)),
+                (1, 3, at(11, 0)),
+                (1, 4, at(10, 10)),
+            ],
+        )
+
+        assert read_occupancy(session_factory, 3) == [(10, 2, 3), (11, 1, 1)]
+        assert read_occupancy(session_factory, 4) == [(10, 1, 1)]
+
+    def test_later_writes_add_to_the_same_hour(self, session_factory):
+        """Test that separate flushes update the rollup instead of replacing it."""
+        record(session_factory, [(1, 3, at(10, 5))])
+        record(session_factory, [(1, 3, at(10, 30)), (2, 3, at(10, 45))])
+
+        assert read_occupancy(session_factory, 3) == [(10, 2, 3)]
+
+    def test_rebuild_matches_incremental_rollups(self, session_factory):
+        """Test that recomputing from the sightings gives the same rollups."""
+        record(
+            session_factory,
+            [(1, 3, at(9, 0)), (2, 3, at(9, 30)), (1, 3, at(12, 15))],
+        )
+        before = read_occupancy(session_factory, 3)
+
+        session = session_factory()
+        try:
+            rebuild_presence_rollups(session)
+        finally:
+            session.close()
+
+        assert read_occupancy(session_factory, 3) == before
+
+
+class TestPresenceQueries:
+    """Tests for the time range queries over the sightings."""
+
+    def test_person_presence_in_a_time_range(self, session_factory):
+        """Test that only the person's sightings inside the range are returned."""
+        record(
+            session_factory,
+            [
+                (1, 3, at(9, 59)),
+                (1, 3, at(10, 0)),
+                (1, 4, at(11, 30)),
+                (2, 4, at(11, 0)),
+                (1, 5, at(12, 0)),
+            ],
+        )
+        session = session_factory()
+        try:
+            presence = get_person_presence(
+                session, 1, datetime(2026, 3, 2, 10), datetime(2026, 3, 2, 12), 100
+            )
+            cameras = get_camera_presence(
+                session, 4, datetime(2026, 3, 2, 10), datetime(2026, 3, 2, 12), 1
+            )
+        finally:
+            session.close()
+
+        assert [row["camera_id"] for row in presence] == [3, 4]
+        assert [row["person_id"] for row in cameras] == [2]
+
+    def test_sightings_going_on_at_the_start_are_included(self, session_factory):
+        """Test that a sighting that began before the range still counts."""
+        record(
+            session_factory,
+            [(1, 3, at(9, 58)), (1, 3, at(9, 59)), (1, 3, at(10, 1))],
+            window=300,
+        )
+        session = session_factory()
+        try:
+            start, end = datetime(2026, 3, 2, 10), datetime(2026, 3, 2, 11)
+            presence = get_person_presence(session, 1, start, end, 100, window=300)
+            cameras = get_camera_presence(session, 3, start, end, 100, window=300)
+        finally:
+            session.close()
+
+        assert len(presence) == len(cameras) == 1
+        assert presence[0]["timestamp"] == datetime(2026, 3, 2, 9, 58)
+        assert presence[0]["last_seen"] == datetime(2026, 3, 2, 10, 1)
@@ -0,0 +1,65 @@
+"""
+Tests for the bounded frame-processing pool.
+"""
+
+import sys
+import os
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services import processing
+from src.services.processing import run_in_pool
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """Use a pool of 4 threads that admits at most 2 calls at a time."""
+    executor = ThreadPoolExecutor(max_workers=4)
+    monkeypatch.setattr(processing, "_executor", executor)
+    monkeypatch.setattr(processing, "_pending", asyncio.Semaphore(2))
+    yield executor
+    executor.shutdown(wait=True)
+
+
+class TestRunInPool:
+    """Tests for running blocking work outside the event loop."""
+
+    def test_waiting_calls_are_bounded(self, pool):
+        """Test that callers beyond the bound wait before reaching the pool."""
+        release = threading.Event()
+        started: list[int] = []
+
+        def work(number: int) -> int:
+            started.append(number)
+            release.wait(5)
+            return number * 10
+
+        async def main() -> tuple[int, list[int]]:
+            tasks = [asyncio.create_task(run_in_pool(work, i)) for i in range(5)]
+            await asyncio.sleep(0.1)
+            admitted: int = len(started)
+            release.set()
+            return admitted, await asyncio.gather(*tasks)
+
+        admitted, results = asyncio.run(asyncio.wait_for(main(), 5))
+
+        assert admitted == 2
+        assert results == [0, 10, 20, 30, 40]
+
+    def test_worker_exceptions_reach_the_caller(self, pool):
+        """Test that an error in the pool is raised by the awaiting stream."""
+
+        def fail(message: str) -> None:
+            raise ValueError(message)
+
+        with pytest.raises(ValueError, match="quadro inválido"):
+            asyncio.run(run_in_pool(fail, "quadro inválido"))
+
+        # The failed call gave its slot back
+        assert asyncio.run(run_in_pool(lambda: "ok")) == "ok"
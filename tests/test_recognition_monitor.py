@@ -0,0 +1,179 @@
+"""
+Tests for the headless recognition monitor.
+"""
+
+import sys
+import os
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.infra.config import RECOGNITION_MAX_DISTANCE
+from src.services import recognition_monitor
+from src.services.recognition_monitor import CameraMonitor, RecognitionMonitor
+
+
+def make_capture() -> MagicMock:
+    """Create a fake VideoCapture that delivers a new noisy frame every 5 ms."""
+    rng = np.random.default_rng(0)
+    capture = MagicMock()
+    capture.isOpened.return_value = True
+    capture.grab.side_effect = lambda: time.sleep(0.005) or True
+    capture.retrieve.side_effect = lambda: (
+        True,
+        rng.integers(0, 255, (120, 160, 3), dtype=np.uint8),
+    )
+    capture.read.side_effect = lambda: (
+        time.sleep(0.005) or True,
+        rng.integers(0, 255, (120, 160, 3), dtype=np.uint8),
+    )
+    return capture
+
+
+def wait_until(condition, timeout: float = 2.0) -> bool:
+    """Poll a condition until it holds or the timeout expires."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.fixture
+def recognized(monkeypatch):
+    """Detect one face per frame and recognize it as person 7."""
+    registry = MagicMock()
+    service = MagicMock()
+    service.predict.return_value = (7, 42.0)
+    monkeypatch.setattr(recognition_monitor, "model_registry", registry)
+    monkeypatch.setattr(recognition_monitor, "recognition_service", service)
+    monkeypatch.setattr(recognition_monitor, "sighting_writer", MagicMock())
+    monkeypatch.setattr(
+        recognition_monitor, "_detect_faces", lambda *_, **__: [(10, 20, 60, 60)]
+    )
+    monkeypatch.setattr(
+        recognition_monitor, "get_person_name", lambda person_id: "Maria"
+    )
+    return service
+
+
+class TestCameraMonitor:
+    """Tests for the per-camera recognition loop."""
+
+    def test_faces_of_the_last_frame_are_kept(self, recognized):
+        """Test that recognized faces are available without any stream."""
+        monitor = CameraMonitor(901, MagicMock(return_value=make_capture()), fps=0)
+        monitor.start()
+        try:
+            assert wait_until(lambda: monitor.processed > 0)
+        finally:
+            monitor.stop()
+
+        latest = monitor.to_dict()["latest"]
+        face = latest["faces"][0]
+        assert (latest["width"], latest["height"]) == (160, 120)
+        assert face["person_id"] == 7
+        recognition_monitor.sighting_writer.record.assert_called_with(
+            7, 901, 42.0, (10, 20, 60, 60), at=latest["timestamp"]
+        )
+        assert face["name"] == "Maria"
+        assert face["box"] == [10, 20, 60, 60]
+
+    def test_distant_matches_are_not_recorded(self, recognized):
+        """Test that faces over the distance threshold are not stored."""
+        recognized.predict.return_value = (7, RECOGNITION_MAX_DISTANCE + 50)
+        monitor = CameraMonitor(904, MagicMock(return_value=make_capture()), fps=0)
+        monitor.start()
+        try:
+            assert wait_until(lambda: monitor.processed > 0)
+        finally:
+            monitor.stop()
+
+        recognition_monitor.sighting_writer.record.assert_not_called()
+
+    def test_fps_cap_limits_processed_frames(self, recognized):
+        """Test that no more frames than the cap are taken per second."""
+        monitor = CameraMonitor(902, MagicMock(return_value=make_capture()), fps=10)
+        monitor.start()
+        time.sleep(0.5)
+        monitor.stop()
+
+        # The capture delivers ~200 fps; 10 fps over 0.5 s is about 5 frames
+        assert 1 <= monitor.frames <= 7
+
+    def test_unopened_camera_stops_with_an_error(self):
+        """Test that a camera that cannot be opened ends the monitor."""
+        monitor = CameraMonitor(903, MagicMock(return_value=None), fps=0)
+        monitor.start()
+
+        assert wait_until(lambda: not monitor.running)
+        assert monitor.last_error == "Câmera não encontrada"
+
+
+class TestRecognitionMonitor:
+    """Tests for following the cameras that are on."""
+
+    def make_monitor(self, cameras: list) -> RecognitionMonitor:
+        """Create a monitor over a mutable list of fake cameras."""
+        return RecognitionMonitor(
+            list_cameras=lambda: list(cameras),
+            open_capture=lambda camera: lambda: make_capture(),
+            rescan_interval=60,
+        )
+
+    def test_monitors_every_camera_that_is_on(self, recognized):
+        """Test that start creates one monitor per camera."""
+        cameras = [SimpleNamespace(camera_id=911), SimpleNamespace(camera_id=912)]
+        monitor = self.make_monitor(cameras)
+        try:
+            assert monitor.start() == [911, 912]
+        finally:
+            monitor.stop()
+
+        assert monitor.get_stats()["cameras"] == []
+
+    def test_sync_follows_camera_changes(self, recognized):
+        """Test that cameras turned off are stopped and new ones started."""
+        cameras = [SimpleNamespace(camera_id=921)]
+        monitor = self.make_monitor(cameras)
+        monitor.start()
+        first = monitor.monitors[921]
+        try:
+            cameras[:] = [SimpleNamespace(camera_id=922)]
+            monitor.sync()
+
+            assert sorted(monitor.monitors) == [922]
+            assert wait_until(lambda: not first.running)
+        finally:
+            monitor.stop()
+
+    def test_fps_cap_is_applied_to_a_running_camera(self, recognized):
+        """Test that changing the cap reaches the camera monitor."""
+        monitor = self.make_monitor([SimpleNamespace(camera_id=931)])
+        monitor.start()
+        try:
+            monitor.set_fps(931, 2.0)
+
+            assert monitor.monitors[931].fps == 2.0
+        finally:
+            monitor.stop()
+
+    def test_viewers_keep_a_camera_that_is_also_monitored(self, recognized):
+        """Test that releasing a viewer does not stop a monitored camera."""
+        monitor = self.make_monitor([SimpleNamespace(camera_id=951)])
+        monitor.start()
+        try:
+            viewed = monitor.acquire(951, lambda: make_capture())
+            monitor.release(951)
+
+            assert viewed is monitor.monitors[951]
+            assert viewed.running
+        finally:
+            monitor.stop()
@@ -0,0 +1,101 @@
+"""
+Tests for the batched recognition service.
+"""
+
+import sys
+import os
+import threading
+import time
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.recognition_service import RecognitionService
+
+
+def make_face(label: int) -> np.ndarray:
+    """Create a face image whose first pixel encodes the expected label."""
+    face = np.zeros((220, 220), dtype=np.uint8)
+    face[0, 0] = label
+    return face
+
+
+def make_service(batch_size: int = 8, max_wait: float = 0.05) -> RecognitionService:
+    """Create a service with a fake matcher echoing the first pixel."""
+    registry = MagicMock()
+    service = RecognitionService(
+        batch_size=batch_size, max_wait=max_wait, registry=registry
+    )
+    registry.matcher.return_value.predict_batch.side_effect = lambda faces: [
+        (int(face[0, 0]), 10.0) for face in faces
+    ]
+    return service
+
+
+class TestRecognitionService:
+    """Tests for micro-batched recognition."""
+
+    def test_results_go_back_to_each_caller(self):
+        """Test that every caller gets the prediction of its own face."""
+        service = make_service()
+        results: dict[int, tuple[int, float]] = {}
+
+        def recognize(label: int) -> None:
+            results[label] = service.predict(make_face(label))
+
+        threads = [threading.Thread(target=recognize, args=(i,)) for i in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == {i: (i, 10.0) for i in range(20)}
+        assert service.faces == 20
+
+    def test_concurrent_faces_are_batched(self):
+        """Test that faces submitted together share batches."""
+        service = make_service(batch_size=8, max_wait=0.2)
+
+        futures = [service.submit(make_face(i)) for i in range(8)]
+        assert [f.result(timeout=2)[0] for f in futures] == list(range(8))
+
+        assert service.batches < 8
+        assert service.get_stats()["mean_batch_size"] > 1
+
+    def test_batch_size_is_respected(self):
+        """Test that a batch never exceeds the configured size."""
+        service = make_service(batch_size=3, max_wait=0.2)
+        sizes: list[int] = []
+        predict_batch = service._predict_batch
+        service._predict_batch = lambda faces: (
+            sizes.append(len(faces)) or (predict_batch(faces))
+        )
+
+        futures = [service.submit(make_face(i)) for i in range(7)]
+        for future in futures:
+            future.result(timeout=2)
+
+        assert max(sizes) <= 3
+        assert sum(sizes) == 7
+
+    def test_errors_reach_the_caller(self):
+        """Test that a failing batch raises in every waiting caller."""
+        service = make_service()
+        matcher = service.registry.matcher.return_value
+        matcher.predict_batch.side_effect = ValueError("bad face")
+
+        with pytest.raises(ValueError):
+            service.predict(make_face(1))
+
+    def test_lone_face_waits_at_most_the_deadline(self):
+        """Test that a single face is not held for a full batch."""
+        service = make_service(batch_size=64, max_wait=0.01)
+
+        start = time.perf_counter()
+        service.predict(make_face(5))
+
+        assert time.perf_counter() - start < 0.5
@@ -0,0 +1,119 @@
+"""
+Tests for the write-behind sightings store.
+"""
+
+import sys
+import os
+import time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.entities.models import CameraHour, PresenceHour, Sighting
+from src.infra.database import Base
+from src.repositories.sighting_repository import SightingWriter
+
+
+@pytest.fixture
+def session_factory():
+    """Create an in-memory database with the sighting table."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(
+        engine,
+        tables=[Sighting.__table__, PresenceHour.__table__, CameraHour.__table__],
+    )
+    return sessionmaker(bind=engine)
+
+
+def make_writer(session_factory, **kwargs) -> SightingWriter:
+    """Create a writer whose thread only flushes when asked to."""
+    options = {"batch_size": 100, "flush_interval": 60.0, "window": 10.0}
+    options.update(kwargs)
+    return SightingWriter(session_factory=session_factory, enabled=True, **options)
+
+
+def read_rows(session_factory) -> list[Sighting]:
+    """Read every stored sighting."""
+    session = session_factory()
+    try:
+        return session.query(Sighting).order_by(Sighting.sighting_id).all()
+    finally:
+        session.close()
+
+
+class TestSightingWriter:
+    """Tests for buffering, coalescing and bulk writes."""
+
+    def test_sightings_in_a_window_become_one_row(self, session_factory):
+        """Test that repeated sightings are coalesced into a single row."""
+        writer = make_writer(session_factory)
+        now = time.time()
+        writer.record(3, 1, 60.0, (0, 0, 50, 50), at=now)
+        writer.record(3, 1, 40.0, (5, 5, 50, 50), at=now + 1)
+        writer.record(3, 1, 55.0, (9, 9, 50, 50), at=now + 2)
+
+        assert writer.flush(everything=True) == 1
+
+        (row,) = read_rows(session_factory)
+        assert row.frames == 3
+        assert row.confidence == 40.0
+        assert (row.box_x, row.box_y) == (5, 5)
+        assert (row.last_seen - row.timestamp).total_seconds() == pytest.approx(2)
+
+    def test_other_people_cameras_and_windows_are_kept(self, session_factory):
+        """Test that only the same person and camera within a window coalesce."""
+        writer = make_writer(session_factory)
+        now = time.time()
+        writer.record(3, 1, 50.0, (0, 0, 50, 50), at=now)
+        writer.record(4, 1, 50.0, (0, 0, 50, 50), at=now)
+        writer.record(3, 2, 50.0, (0, 0, 50, 50), at=now)
+        writer.record(3, 1, 50.0, (0, 0, 50, 50), at=now + 11)
+
+        assert writer.flush(everything=True) == 4
+        assert writer.get_stats()["coalesced"] == 0
+
+    def test_open_windows_wait_for_the_next_flush(self, session_factory):
+        """Test that a regular flush only writes sightings whose window ended."""
+        writer = make_writer(session_factory)
+        writer.record(3, 1, 50.0, (0, 0, 50, 50), at=time.time() - 20)
+        writer.record(4, 1, 50.0, (0, 0, 50, 50))
+
+        assert writer.flush() == 1
+        assert [row.person_id for row in read_rows(session_factory)] == [3]
+        assert writer.get_stats()["pending"] == 1
+
+    def test_full_batch_is_written_in_the_background(self, session_factory):
+        """Test that reaching the batch size wakes the writer thread."""
+        writer = make_writer(session_factory, batch_size=5, window=1.0)
+        now = time.time()
+        # Each sighting closes the window of the previous one
+        for second in range(6):
+            writer.record(3, 1, 50.0, (0, 0, 50, 50), at=now + 2 * second)
+
+        deadline = time.monotonic() + 2
+        while writer.written < 5 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert writer.written >= 5
+        assert writer.flushes >= 1
+
+    def test_failed_writes_are_kept_for_the_next_flush(self, session_factory):
+        """Test that rows survive a database error."""
+        # A database without the sighting table
+        broken = make_writer(sessionmaker(bind=create_engine("sqlite://")))
+        broken.record(3, 1, 50.0, (0, 0, 50, 50))
+        assert broken.flush(everything=True) == 0
+        assert broken.get_stats()["failures"] == 1
+
+        broken.session_factory = session_factory
+        assert broken.flush() == 1
+        assert len(read_rows(session_factory)) == 1
@@ -0,0 +1,161 @@
+"""
+Tests for background training jobs.
+"""
+
+import sys
+import os
+import threading
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services import training_jobs
+from src.services.training_jobs import TrainingJobs
+
+
+def wait_for(job, status: str) -> None:
+    """Wait until a job reaches a status."""
+    deadline = time.monotonic() + 2
+    while job.status != status and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert job.status == status
+
+
+class FakeTraining:
+    """trainLBPH stand-in that blocks until released."""
+
+    def __init__(self, result=(True, "Treinamento concluído com 3 imagens.")):
+        self.result = result
+        self.calls = 0
+        self.release = threading.Event()
+
+    def __call__(self, progress=None):
+        self.calls += 1
+        progress("training", 50.0)
+        self.release.wait(2)
+        return self.result
+
+
+class FakeEnrollment(FakeTraining):
+    """enroll_person stand-in that records the persons it added."""
+
+    def __init__(self):
+        super().__init__(result=(True, "Pessoa adicionada com 3 imagens."))
+        self.persons: list[int] = []
+
+    def __call__(self, person_id, progress=None):
+        self.persons.append(person_id)
+        return super().__call__(progress)
+
+
+class TestTrainingJobs:
+    """Tests for submitting and following trainings."""
+
+    def test_job_reports_progress_and_result(self, monkeypatch):
+        """Test that a job goes from running to success with its message."""
+        fake = FakeTraining()
+        monkeypatch.setattr(training_jobs, "trainLBPH", fake)
+        jobs = TrainingJobs()
+
+        job = jobs.submit()
+        wait_for(job, "running")
+        assert job.phase == "training"
+        assert job.progress == 50.0
+
+        fake.release.set()
+        wait_for(job, "success")
+        assert job.progress == 100.0
+        assert "3 imagens" in job.to_dict()["message"]
+        assert jobs.get(job.job_id) is job
+
+    def test_submissions_are_coalesced(self, monkeypatch):
+        """Test that requests during a run share one queued job."""
+        fake = FakeTraining()
+        monkeypatch.setattr(training_jobs, "trainLBPH", fake)
+        jobs = TrainingJobs()
+
+        running = jobs.submit()
+        wait_for(running, "running")
+        queued = [jobs.submit() for _ in range(3)]
+
+        assert all(job is queued[0] for job in queued)
+        assert queued[0] is not running
+        assert queued[0].requests == 3
+
+        fake.release.set()
+        wait_for(queued[0], "success")
+        assert fake.calls == 2
+
+    def test_failed_training_is_an_error(self, monkeypatch):
+        """Test that a failed training ends the job with its message."""
+        fake = FakeTraining(result=(False, "Nenhuma imagem encontrada"))
+        fake.release.set()
+        monkeypatch.setattr(training_jobs, "trainLBPH", fake)
+        jobs = TrainingJobs()
+
+        job = jobs.submit()
+        wait_for(job, "error")
+        assert job.message == "Nenhuma imagem encontrada"
+
+    def test_unknown_job(self):
+        """Test that an unknown job ID is not found."""
+        assert TrainingJobs().get("missing") is None
+
+
+class TestEnrollmentJobs:
+    """Tests for adding persons to the model in the background."""
+
+    def test_enrollment_runs_in_the_background(self, monkeypatch):
+        """Test that submitting returns at once and the job adds the person."""
+        fake = FakeEnrollment()
+        monkeypatch.setattr(training_jobs, "enroll_person", fake)
+        jobs = TrainingJobs()
+
+        job = jobs.submit_enrollment(7)
+        assert job.to_dict()["person_id"] == 7
+        wait_for(job, "running")
+        assert job.message == "Adicionando pessoa 7 ao modelo"
+
+        fake.release.set()
+        wait_for(job, "success")
+        assert fake.persons == [7]
+        assert job.message == "Pessoa adicionada com 3 imagens."
+
+    def test_enrollments_wait_for_a_running_training(self, monkeypatch):
+        """Test that persons captured during a training are queued, not blocked."""
+        training = FakeTraining()
+        enrollment = FakeEnrollment()
+        enrollment.release.set()
+        monkeypatch.setattr(training_jobs, "trainLBPH", training)
+        monkeypatch.setattr(training_jobs, "enroll_person", enrollment)
+        jobs = TrainingJobs()
+
+        running = jobs.submit()
+        wait_for(running, "running")
+        first = jobs.submit_enrollment(1)
+        again = jobs.submit_enrollment(1)
+        second = jobs.submit_enrollment(2)
+
+        assert again is first and first.requests == 2
+        assert second is not first
+        assert first.status == second.status == "queued"
+
+        training.release.set()
+        wait_for(second, "success")
+        assert enrollment.persons == [1, 2]
+
+    def test_queued_training_covers_enrollments(self, monkeypatch):
+        """Test that an enrolment joins a full training that is still queued."""
+        fake = FakeTraining()
+        monkeypatch.setattr(training_jobs, "trainLBPH", fake)
+        jobs = TrainingJobs()
+
+        running = jobs.submit()
+        wait_for(running, "running")
+        queued = jobs.submit()
+
+        assert jobs.submit_enrollment(3) is queued
+        fake.release.set()
+        wait_for(queued, "success")
+        assert fake.calls == 2